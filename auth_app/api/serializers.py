@@ -1,9 +1,13 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
+from django.db import IntegrityError, transaction
 
+from auth_app.backends import users_by_email
+from core.instrumentation import TimedSerializerMixin
 
-class UserSerializer(serializers.ModelSerializer):
+
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for representing User objects with an
     additional computed property 'fullname' that
@@ -25,7 +29,7 @@ class UserSerializer(serializers.ModelSerializer):
         return full if full else obj.username or obj.email
 
 
-class RegistrationSerializer(serializers.ModelSerializer):
+class RegistrationSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for registering new users with validation
     of email and password, including double password entry
@@ -41,9 +45,10 @@ class RegistrationSerializer(serializers.ModelSerializer):
 
     def validate_email(self, value):
         """
-        Validates that the email is not already taken.
+        Validates that the email is not already taken,
+        ignoring case.
         """
-        if User.objects.filter(email=value).exists():
+        if users_by_email(value).exists():
             raise serializers.ValidationError('Email already exists')
         return value
 
@@ -74,7 +79,12 @@ class RegistrationSerializer(serializers.ModelSerializer):
             last_name=last_name
         )
         user.set_password(validated_data['password'])
-        user.save()
+        try:
+            with transaction.atomic():
+                user.save()
+        except IntegrityError:
+            # Registered concurrently with the same email.
+            raise serializers.ValidationError({'email': ['Email already exists']})
         return user
 
 
@@ -89,13 +99,9 @@ class CustomAuthTokenSerializer(serializers.Serializer):
     def validate(self, data):
         """
         Checks if a user with the given email exists and
-        if the password is correct.
+        if the password is correct (see auth_app.backends.EmailBackend).
         """
-        user = User.objects.filter(email=data['email']).first()
-        if not user:
-            raise serializers.ValidationError('Invalid credentials')
-
-        user = authenticate(username=user.username, password=data['password'])
+        user = authenticate(self.context.get('request'), email=data['email'], password=data['password'])
         if not user:
             raise serializers.ValidationError('Invalid credentials')
 
@@ -6,27 +6,34 @@ from rest_framework.response import Response
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework import status
 
+from auth_app.backends import get_token
+from auth_app.throttling import EmailThrottle, IPThrottle
+
 class CustomLoginView(ObtainAuthToken):
     """
     View for authenticating users via email and password.
     Uses CustomAuthTokenSerializer to validate credentials.
     On successful login, returns an auth token along with
     user information (full name, email, user ID).
+    Attempts are throttled by IP and email address.
     """
     permission_classes = [AllowAny]
     serializer_class = CustomAuthTokenSerializer
+    throttle_classes = [IPThrottle, EmailThrottle]
+    throttle_scope = 'login'
 
     def post(self, request):
         """
         Handles POST requests with login data.
-        Validates the data, creates (or retrieves) a token for the user,
+        Validates the data, retrieves (or creates) the token loaded
+        together with the user,
         and returns it along with user info.
         Returns an error status with messages if data is invalid.
         """
-        serializer = self.serializer_class(data=request.data)
+        serializer = self.serializer_class(data=request.data, context={'request': request})
         if serializer.is_valid():
             user = serializer.validated_data['user']
-            token, created = Token.objects.get_or_create(user=user)
+            token = get_token(user)
             fullname = f"{user.first_name} {user.last_name}".strip()
             return Response({
                 'token': token.key,
@@ -43,21 +50,25 @@ class RegistrationView(APIView):
     Accepts user data, validates it, and creates
     a new user upon success.
     Returns an auth token and user info afterwards.
+    Attempts are throttled by IP and email address.
     """
     permission_classes = [AllowAny]
+    throttle_classes = [IPThrottle, EmailThrottle]
+    throttle_scope = 'registration'
 
     def post(self, request):
         """
         Handles POST requests with registration data.
         Validates and saves the new user.
-        Creates (or retrieves) a token for the new user and returns
+        Creates a token for the new user and returns
         it along with user information.
         Returns an error status with details if data is invalid.
         """
         serializer = RegistrationSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
-            token, created = Token.objects.get_or_create(user=user)
+            # A new user has no token yet.
+            token = Token.objects.create(user=user)
             fullname = f"{user.first_name} {user.last_name}".strip()
 
             return Response({
@@ -0,0 +1,127 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+
+from core.cache import CacheCounters
+
+token_cache_counters = CacheCounters()
+
+# Fields of the user kept in the token cache: the flags checked on every
+# request and the name and email shown as author of new tasks and
+# comments. All others, including the password hash, are loaded from the
+# database when they are accessed.
+CACHED_USER_FIELDS = ('id', 'is_active', 'is_staff', 'is_superuser', 'email', 'first_name', 'last_name')
+
+
+def get_token_cache():
+    return caches[getattr(settings, 'TOKEN_CACHE_ALIAS', 'default')]
+
+
+def token_cache_key(key):
+    """
+    Returns the cache key of a token. The token itself is hashed
+    so it never appears in the cache backend.
+    """
+    return 'auth_token:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+def invalidate_token(key):
+    """Removes a token from the cache."""
+    get_token_cache().delete(token_cache_key(key))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Drop-in replacement for TokenAuthentication that keeps the user ID,
+    flags and name (CACHED_USER_FIELDS) of a token in the Django cache
+    framework, keyed by the hashed token, so polling clients are
+    authenticated without a database query. Neither the token nor the
+    password hash are stored in the cache; the other fields of the user
+    are deferred and loaded when a view accesses them.
+
+    Entries expire after TOKEN_CACHE_TTL seconds (default 300) and are
+    invalidated by the signal handlers in auth_app.signals when the
+    token is deleted or the user is changed or deactivated.
+    """
+
+    def authenticate_credentials(self, key):
+        cache = get_token_cache()
+        cache_key = token_cache_key(key)
+
+        values = cache.get(cache_key)
+        if values is None:
+            token_cache_counters.miss()
+            values = self.get_model().objects.filter(key=key).values_list(*self.user_lookups()).first()
+            if values is None:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+            cache.set(cache_key, values, getattr(settings, 'TOKEN_CACHE_TTL', 300))
+        else:
+            token_cache_counters.hit()
+
+        return self.credentials(key, values)
+
+    def user_lookups(self):
+        return [f'user__{name}' for name in CACHED_USER_FIELDS]
+
+    def credentials(self, key, values):
+        """
+        Returns (user, token) for the cached values of a token, with all
+        fields of the user but CACHED_USER_FIELDS deferred.
+        """
+        values = dict(zip(CACHED_USER_FIELDS, values))
+        # from_db() takes the values in the order of the model's fields.
+        names = [field.attname for field in User._meta.concrete_fields if field.attname in values]
+        user = User.from_db(DEFAULT_DB_ALIAS, names, [values[name] for name in names])
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        token = self.get_model()(key=key, user=user)
+        token._state.adding = False
+        return (user, token)
+
+    async def aauthenticate(self, request):
+        """
+        Async version of authenticate() for the async views, with the
+        same header format and errors. Returns (user, token) or None.
+        """
+        auth = get_authorization_header(request).split()
+
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+
+        if len(auth) == 1:
+            msg = _('Invalid token header. No credentials provided.')
+            raise exceptions.AuthenticationFailed(msg)
+        elif len(auth) > 2:
+            msg = _('Invalid token header. Token string should not contain spaces.')
+            raise exceptions.AuthenticationFailed(msg)
+
+        try:
+            token = auth[1].decode()
+        except UnicodeError:
+            msg = _('Invalid token header. Token string should not contain invalid characters.')
+            raise exceptions.AuthenticationFailed(msg)
+
+        return await self.aauthenticate_credentials(token)
+
+    async def aauthenticate_credentials(self, key):
+        """Async version of authenticate_credentials()."""
+        cache = get_token_cache()
+        cache_key = token_cache_key(key)
+
+        values = await cache.aget(cache_key)
+        if values is None:
+            token_cache_counters.miss()
+            values = await self.get_model().objects.filter(key=key).values_list(*self.user_lookups()).afirst()
+            if values is None:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+            await cache.aset(cache_key, values, getattr(settings, 'TOKEN_CACHE_TTL', 300))
+        else:
+            token_cache_counters.hit()
+
+        return self.credentials(key, values)
@@ -0,0 +1,49 @@
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import User
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models.functions import Lower
+from rest_framework.authtoken.models import Token
+
+
+def users_by_email(email):
+    """
+    Returns the users with the given email address, compared case
+    insensitively through the unique index on LOWER(email) (see
+    migration 0001_user_email_lower_unique).
+    """
+    return User.objects.alias(email_lower=Lower('email')).filter(email_lower=email.lower())
+
+
+def get_token(user):
+    """
+    Returns the auth token of the user, creating it if needed. Users
+    loaded by EmailBackend come with their token (or the knowledge that
+    they have none), so existing tokens need no extra query.
+    """
+    try:
+        return user.auth_token
+    except ObjectDoesNotExist:
+        return Token.objects.get_or_create(user=user)[0]
+
+
+class EmailBackend(ModelBackend):
+    """
+    Authenticates with email address and password. The user and their
+    auth token are loaded in one query, by the case insensitive email
+    index. Calls without email (e.g. the admin login with username)
+    are left to the following backends.
+    """
+
+    def authenticate(self, request, email=None, password=None, **kwargs):
+        if email is None or password is None:
+            return None
+        try:
+            user = users_by_email(email).select_related('auth_token').get()
+        except User.DoesNotExist:
+            # Run the password hasher once to reduce the timing
+            # difference between an existing and a nonexistent user.
+            User().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.3 on 2026-10-17 09:30
+
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_duplicate_emails(apps, schema_editor):
+    """Fails with the affected addresses if the index cannot be created."""
+    User = apps.get_model('auth', 'User')
+    duplicates = list(
+        User.objects.using(schema_editor.connection.alias).exclude(email='')
+        .values(email_lower=Lower('email')).annotate(count=Count('id')).filter(count__gt=1)
+        .values_list('email_lower', flat=True)[:10]
+    )
+    if duplicates:
+        raise RuntimeError(
+            'Users share an email address (ignoring case), merge or change them first: ' + ', '.join(duplicates)
+        )
+
+
+class Migration(migrations.Migration):
+    """
+    Unique index on the lowercased email of auth.User, used by
+    auth_app.backends for logins and email lookups. Blank emails
+    (e.g. of superusers created without one) are told apart by the id.
+    """
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        migrations.RunSQL(
+            "CREATE UNIQUE INDEX auth_user_email_lower_uniq "
+            "ON auth_user (LOWER(email), (CASE WHEN email = '' THEN id ELSE 0 END))",
+            'DROP INDEX auth_user_email_lower_uniq',
+        ),
+    ]
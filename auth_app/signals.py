@@ -0,0 +1,43 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from auth_app.authentication import CACHED_USER_FIELDS, invalidate_token
+
+
+def invalidate_tokens(keys):
+    """
+    Removes the tokens from the token cache right away and again after
+    the surrounding transaction commits, so a request that cached the
+    old state in between does not keep it.
+    """
+    keys = list(keys)
+
+    def invalidate():
+        for key in keys:
+            invalidate_token(key)
+
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """Removes a deleted token from the token cache."""
+    invalidate_tokens([instance.key])
+
+
+@receiver(post_save, sender=User)
+def invalidate_tokens_of_changed_user(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """
+    Removes the tokens of a changed user (e.g. deactivated) from the
+    token cache, so the cached flags are never outdated. Saves of other
+    fields only, like last_login on every login, keep them.
+    """
+    if created or raw:
+        return
+    if update_fields is not None and not set(update_fields) & set(CACHED_USER_FIELDS):
+        return
+    invalidate_tokens(Token.objects.filter(user=instance).values_list('key', flat=True))
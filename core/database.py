@@ -0,0 +1,120 @@
+import os
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+# Values of boolean environment variables that count as true.
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+
+
+def database_settings(prefix='DB', default_name=None, fallback=None):
+    """
+    Returns an entry of DATABASES configured by environment variables
+    starting with 'prefix', e.g. for the default prefix:
+
+    - DB_ENGINE: 'sqlite' (default) or 'postgresql'
+    - DB_NAME: path of the SQLite file (default 'default_name') or
+      name of the PostgreSQL database
+    - DB_USER, DB_PASSWORD, DB_HOST, DB_PORT: PostgreSQL server
+    - DB_POOL: PostgreSQL connection pool ('true' by default), sized by
+      DB_POOL_MIN_SIZE (2) and DB_POOL_MAX_SIZE (10); a request waits
+      up to DB_POOL_TIMEOUT seconds (10) for a free connection
+    - DB_CONN_MAX_AGE: seconds a connection is kept open across requests
+      (600) when not pooled; 0 opens one per request
+
+    Pooled connections are checked by the pool and persistent ones by
+    CONN_HEALTH_CHECKS before they are reused. SQLite connections get
+    the pragmas of SQLITE_PRAGMAS (see configure_sqlite()) and start
+    their transactions as writers (BEGIN IMMEDIATE), so concurrent
+    writers wait for the lock instead of failing on the upgrade.
+
+    Variables missing for 'prefix' are taken from the 'fallback' prefix
+    if given, e.g. the user and password of a replica from DB_*.
+    """
+    prefixes = (prefix, fallback) if fallback else (prefix,)
+    engine = _env(prefixes, 'ENGINE', 'sqlite').lower()
+    conn_max_age = int(_env(prefixes, 'CONN_MAX_AGE', '600'))
+
+    if engine in ('sqlite', 'sqlite3'):
+        return {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': _env(prefixes, 'NAME', default_name),
+            'CONN_MAX_AGE': conn_max_age,
+            'CONN_HEALTH_CHECKS': conn_max_age > 0,
+            'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
+        }
+
+    if engine in ('postgresql', 'postgres'):
+        config = {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': _env(prefixes, 'NAME', 'kannmind'),
+            'USER': _env(prefixes, 'USER', ''),
+            'PASSWORD': _env(prefixes, 'PASSWORD', ''),
+            'HOST': _env(prefixes, 'HOST', ''),
+            'PORT': _env(prefixes, 'PORT', ''),
+            'OPTIONS': {},
+        }
+        if _env(prefixes, 'POOL', 'true').lower() in TRUE_VALUES:
+            # Pooled connections are returned to the pool after each
+            # request, Django does not allow them to be persistent.
+            config['OPTIONS']['pool'] = {
+                'min_size': int(_env(prefixes, 'POOL_MIN_SIZE', '2')),
+                'max_size': int(_env(prefixes, 'POOL_MAX_SIZE', '10')),
+                'timeout': float(_env(prefixes, 'POOL_TIMEOUT', '10')),
+                'check': _pool_check(),
+            }
+        else:
+            config['CONN_MAX_AGE'] = conn_max_age
+            config['CONN_HEALTH_CHECKS'] = conn_max_age > 0
+        return config
+
+    raise ImproperlyConfigured(f"Unsupported {prefix}_ENGINE {engine!r}, use 'sqlite' or 'postgresql'.")
+
+
+def replica_settings(prefix='DB'):
+    """
+    Returns the DATABASES entries 'replica1' to 'replicaN' for
+    <prefix>_REPLICAS=N, each configured like database_settings() by
+    the variables <prefix>_REPLICA1_* and so on, falling back to the
+    primary's <prefix>_* (except NAME for SQLite, which is required).
+    Tests use the primary for all of them.
+    """
+    replicas = {}
+    for number in range(1, int(os.environ.get(f'{prefix}_REPLICAS', '0')) + 1):
+        replica_prefix = f'{prefix}_REPLICA{number}'
+        engine = _env((replica_prefix, prefix), 'ENGINE', 'sqlite').lower()
+        if engine.startswith('sqlite') and f'{replica_prefix}_NAME' not in os.environ:
+            raise ImproperlyConfigured(f'{replica_prefix}_NAME is required for a SQLite replica.')
+        config = database_settings(replica_prefix, fallback=prefix)
+        config['TEST'] = {'MIRROR': 'default'}
+        replicas[f'replica{number}'] = config
+    return replicas
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    Applies SQLITE_PRAGMAS to every new SQLite connection (connected
+    to connection_created by core.apps). WAL lets readers work while
+    a writer commits, busy_timeout makes writers wait for the lock.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def _env(prefixes, name, default):
+    for prefix in prefixes:
+        value = os.environ.get(f'{prefix}_{name}')
+        if value is not None:
+            return value
+    return default
+
+
+def _pool_check():
+    try:
+        from psycopg_pool import ConnectionPool
+    except ImportError:
+        raise ImproperlyConfigured('The connection pool needs psycopg_pool: pip install "psycopg[binary,pool]"')
+    return ConnectionPool.check_connection
@@ -0,0 +1,225 @@
+import contextvars
+import json
+import logging
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils.functional import SimpleLazyObject, empty
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from core.metrics import observe_request
+
+logger = logging.getLogger('core.requests')
+
+# Timings of the request being handled. Context variables are copied
+# into sync_to_async() and async_to_sync() calls, so queries of async
+# views are attributed to their request as well.
+_current = contextvars.ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """
+    Database query count and time, serializer time and total time
+    of one request, in seconds.
+    """
+    __slots__ = ('start', 'total', 'db_queries', 'db_time', 'serialize_time', '_depth')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.total = 0.0
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self._depth = 0
+
+    def finish(self):
+        self.total = time.perf_counter() - self.start
+
+    def server_timing(self):
+        """Returns the value of the Server-Timing header, durations in ms."""
+        return (
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.db_queries} queries", '
+            f'serialize;dur={self.serialize_time * 1000:.1f}, '
+            f'total;dur={self.total * 1000:.1f}'
+        )
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper counting the queries of the current request."""
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db_time += time.perf_counter() - start
+        timings.db_queries += 1
+
+
+@contextmanager
+def measure_serialization():
+    """
+    Adds the time of the block to the serializer time of the current
+    request. Nested blocks (a serializer using another) count once.
+    """
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    timings._depth += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings._depth -= 1
+        if timings._depth == 0:
+            timings.serialize_time += time.perf_counter() - start
+
+
+def _install_query_recorder(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def install():
+    """Installs the query hook once per process."""
+    connection_created.connect(_install_query_recorder, dispatch_uid='core.instrumentation')
+    for connection in connections.all(initialized_only=True):
+        _install_query_recorder(connection)
+
+
+class TimedListSerializer(serializers.ListSerializer):
+    """
+    ListSerializer of the TimedSerializerMixin serializers; its time
+    includes the query of a lazy queryset.
+    """
+
+    def to_representation(self, data):
+        with measure_serialization():
+            return super().to_representation(data)
+
+
+class TimedSerializerMixin:
+    """
+    Mixin of the API serializers adding the time of to_representation()
+    to the serializer time of the request, including the queries of
+    related objects it runs. With many=True, a plain ListSerializer is
+    turned into a TimedListSerializer.
+    """
+
+    def to_representation(self, instance):
+        with measure_serialization():
+            return super().to_representation(instance)
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        serializer = super().many_init(*args, **kwargs)
+        if type(serializer) is serializers.ListSerializer:
+            serializer.__class__ = TimedListSerializer
+        return serializer
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer adding the time spent rendering response data to the
+    serializer time of the request (REST_FRAMEWORK's renderer).
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with measure_serialization():
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class RequestMetricsMiddleware:
+    """
+    Measures every request: number and time of database queries, time
+    spent in serializers and rendering the response (see
+    TimedSerializerMixin) and total time until the view returned its
+    response (the body of streamed responses is sent later and not
+    included). The numbers are
+
+    - sent as Server-Timing header (if REQUEST_METRICS['SERVER_TIMING']),
+    - logged as JSON to the 'core.requests' logger if the request took
+      at least REQUEST_METRICS['SLOW_REQUEST_MS'] milliseconds,
+    - added to the per-route histograms exported on /metrics.
+
+    Works in sync and async mode; place it first in MIDDLEWARE so it
+    covers the other middleware as well.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        config = getattr(settings, 'REQUEST_METRICS', {})
+        self.server_timing = config.get('SERVER_TIMING', True)
+        self.slow_request_seconds = config.get('SLOW_REQUEST_MS', 500) / 1000
+        install()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.finish(request, response, timings)
+        return response
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.finish(request, response, timings)
+        return response
+
+    def finish(self, request, response, timings):
+        timings.finish()
+        match = getattr(request, 'resolver_match', None)
+        route = match.route if match is not None else 'unmatched'
+        slow = timings.total >= self.slow_request_seconds
+
+        observe_request(request.method, route, response.status_code, timings, slow)
+        if self.server_timing:
+            response['Server-Timing'] = timings.server_timing()
+        if slow:
+            self.log_slow_request(request, route, response, timings)
+
+    def log_slow_request(self, request, route, response, timings):
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'route': route,
+            'status': response.status_code,
+            'user_id': request_user_id(request),
+            'total_ms': round(timings.total * 1000, 1),
+            'db_ms': round(timings.db_time * 1000, 1),
+            'db_queries': timings.db_queries,
+            'serialize_ms': round(timings.serialize_time * 1000, 1),
+        }
+        logger.warning(json.dumps(record), extra={'request_metrics': record})
+
+
+def request_user_id(request):
+    """
+    Returns the ID of the authenticated user, or None if anonymous or
+    not authenticated (yet; DRF authenticates in the view). A lazy
+    session user that was not needed by the view is not loaded.
+    """
+    user = request.__dict__.get('user')
+    if user is None or (isinstance(user, SimpleLazyObject) and user._wrapped is empty):
+        return None
+    return user.pk
@@ -0,0 +1,36 @@
+import sqlite3
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.replicas import replica_aliases
+
+
+class Command(BaseCommand):
+    """
+    Copies the SQLite primary database to the SQLite replicas with the
+    online backup API, standing in for replication when the replica
+    router is tried locally (DB_REPLICAS=1 DB_REPLICA1_NAME=...). Until
+    the next run, the replicas show the data of this point in time.
+    """
+    help = 'Copies the SQLite primary database to the SQLite replicas.'
+
+    def handle(self, *args, **options):
+        primary = connections[DEFAULT_DB_ALIAS]
+        replicas = [alias for alias in replica_aliases() if connections[alias].vendor == 'sqlite']
+        if primary.vendor != 'sqlite' or not replicas:
+            raise CommandError('Needs a SQLite primary and SQLite replicas (DB_REPLICAS).')
+
+        source = sqlite3.connect(primary.settings_dict['NAME'])
+        try:
+            for alias in replicas:
+                connections[alias].close()
+                target = sqlite3.connect(connections[alias].settings_dict['NAME'])
+                try:
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(f'Copied to {alias}.')
+        finally:
+            source.close()
+        self.stdout.write(self.style.SUCCESS(f'Synced {len(replicas)} replicas.'))
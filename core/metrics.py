@@ -0,0 +1,231 @@
+import bisect
+import hmac
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse
+
+# Upper bounds of the histogram buckets.
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Methods recorded under their name; all others are recorded as 'other',
+# so arbitrary methods sent by clients cannot add label values.
+HTTP_METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+
+class Metric:
+    """
+    Base of the process-level metrics exported by metrics_view().
+    Values are kept per combination of label values; updates take a
+    lock, so they are safe from any thread.
+    """
+    kind = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def render(self):
+        """Returns the lines of the metric in the Prometheus text format."""
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            values = sorted((labels, self.copy(value)) for labels, value in self._values.items())
+        for labels, value in values:
+            lines += self.render_value(labels, value)
+        return lines
+
+    def copy(self, value):
+        return value
+
+    def format_labels(self, values, extra=()):
+        pairs = [*zip(self.labels, values), *extra]
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render_value(self, labels, value):
+        return [f'{self.name}{self.format_labels(labels)} {_number(value)}']
+
+
+class Histogram(Metric):
+    """
+    Histogram with fixed buckets; an observation costs one bisect
+    and a few additions.
+    """
+    kind = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=DURATION_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, labels, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def copy(self, value):
+        counts, total, count = value
+        return list(counts), total, count
+
+    def render_value(self, labels, value):
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip((*self.buckets, '+Inf'), counts):
+            cumulative += bucket_count
+            le = bound if bound == '+Inf' else _number(bound)
+            lines.append(f'{self.name}_bucket{self.format_labels(labels, [("le", le)])} {cumulative}')
+        lines.append(f'{self.name}_sum{self.format_labels(labels)} {_number(total)}')
+        lines.append(f'{self.name}_count{self.format_labels(labels)} {count}')
+        return lines
+
+
+class Collected(Metric):
+    """
+    A metric without labels whose value is kept elsewhere and read
+    from 'function' when exported, e.g. the token cache counters.
+    """
+
+    def __init__(self, name, help, function, kind='gauge'):
+        super().__init__(name, help)
+        self.function = function
+        self.kind = kind
+
+    def render(self):
+        with self._lock:
+            self._values = {(): self.function()}
+        return super().render()
+
+    def render_value(self, labels, value):
+        return [f'{self.name}{self.format_labels(labels)} {_number(value)}']
+
+
+def _number(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _token_cache(name):
+    from auth_app.authentication import token_cache_counters
+    return lambda: token_cache_counters.snapshot()[name]
+
+
+def _response_cache(name):
+    from kanban_app.response_cache import response_cache_counters
+    return lambda: response_cache_counters.snapshot()[name]
+
+
+REQUEST_LABELS = ('method', 'route')
+
+request_duration = Histogram(
+    'kannmind_http_request_duration_seconds', 'Time until the response was returned by the view.', REQUEST_LABELS,
+)
+request_db_duration = Histogram(
+    'kannmind_http_request_db_duration_seconds', 'Time spent in database queries per request.', REQUEST_LABELS,
+)
+request_serialize_duration = Histogram(
+    'kannmind_http_request_serialize_duration_seconds',
+    'Time spent in serializers and rendering per request, including the queries they run.', REQUEST_LABELS,
+)
+request_db_queries = Histogram(
+    'kannmind_http_request_db_queries', 'Number of database queries per request.', REQUEST_LABELS, QUERY_BUCKETS,
+)
+responses = Counter('kannmind_http_responses_total', 'Responses by status code.', REQUEST_LABELS + ('status',))
+slow_requests = Counter(
+    'kannmind_http_slow_requests_total', 'Requests slower than the slow request threshold.', REQUEST_LABELS,
+)
+throttled_requests = Counter(
+    'kannmind_auth_throttled_total', 'Login and registration attempts rejected by the throttles.', ('scope', 'key'),
+)
+
+METRICS = [
+    request_duration,
+    request_db_duration,
+    request_serialize_duration,
+    request_db_queries,
+    responses,
+    slow_requests,
+    throttled_requests,
+    Collected(
+        'kannmind_token_cache_hits_total', 'Token authentications answered from the cache.',
+        _token_cache('hits'), kind='counter',
+    ),
+    Collected(
+        'kannmind_token_cache_misses_total', 'Token authentications that queried the database.',
+        _token_cache('misses'), kind='counter',
+    ),
+    Collected(
+        'kannmind_response_cache_hits_total', 'Task list responses served from the response cache.',
+        _response_cache('hits'), kind='counter',
+    ),
+    Collected(
+        'kannmind_response_cache_misses_total', 'Task list responses that had to be built.',
+        _response_cache('misses'), kind='counter',
+    ),
+    Collected(
+        'kannmind_response_cache_hit_ratio', 'Share of task list responses served from the response cache.',
+        _response_cache('hit_ratio'),
+    ),
+]
+
+
+def observe_request(method, route, status, timings, slow):
+    """Records the timings of a finished request (see core.instrumentation)."""
+    labels = (method if method in HTTP_METHODS else 'other', route)
+    request_duration.observe(labels, timings.total)
+    request_db_duration.observe(labels, timings.db_time)
+    request_serialize_duration.observe(labels, timings.serialize_time)
+    request_db_queries.observe(labels, timings.db_queries)
+    responses.inc(labels + (str(status),))
+    if slow:
+        slow_requests.inc(labels)
+
+
+def render_metrics():
+    """Returns all metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in METRICS:
+        lines += metric.render()
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """
+    Exports the metrics of this process for Prometheus (GET /metrics).
+    With several worker processes each one has its own metrics, so
+    they have to be scraped per process (or aggregated by the server).
+    The scraper has to send REQUEST_METRICS['TOKEN'] as
+    'Authorization: Bearer <token>'; without a token the metrics are
+    not exported at all.
+    """
+    token = getattr(settings, 'REQUEST_METRICS', {}).get('TOKEN')
+    if not token:
+        return HttpResponse('Metrics are disabled, no token is configured.\n', status=403, content_type='text/plain')
+    header = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(header.encode(), f'Bearer {token}'.encode()):
+        return HttpResponse('Unauthorized\n', status=401, content_type='text/plain')
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE)
@@ -0,0 +1,168 @@
+import contextvars
+import random
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+
+from core.instrumentation import request_user_id
+
+# Routing state of the request being handled; None outside requests
+# (management commands, shells), whose queries all go to the primary.
+_current = contextvars.ContextVar('replica_routing', default=None)
+
+# Apps whose rows are needed right after they were written by a request
+# of a user the router cannot know yet: a new token is used by the next
+# request of the client, before it is authenticated.
+PRIMARY_APPS = {'authtoken', 'sessions'}
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def replica_aliases():
+    """Returns the aliases of the replicas: every database but 'default'."""
+    return [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+
+
+def _config():
+    return getattr(settings, 'REPLICA_ROUTING', {})
+
+
+def sticky_key(user_id):
+    return f'replica_sticky:user:{user_id}'
+
+
+def stick_to_primary(user_id):
+    """Sends the reads of the user to the primary for STICKY_SECONDS."""
+    config = _config()
+    caches[config.get('CACHE_ALIAS', 'default')].set(sticky_key(user_id), True, config.get('STICKY_SECONDS', 10))
+
+
+def is_sticky(user_id):
+    """Returns True if the user wrote within the last STICKY_SECONDS."""
+    return bool(caches[_config().get('CACHE_ALIAS', 'default')].get(sticky_key(user_id)))
+
+
+def read_from_primary():
+    """
+    Sends the remaining reads of the current request to the primary,
+    e.g. for a response whose ETag is built from versions bumped on the
+    primary (see kanban_app.versioning), which a lagging replica would
+    pair with old content.
+    """
+    routing = _current.get()
+    if routing is not None:
+        routing.replica = None
+
+
+class RequestRouting:
+    """
+    Where the reads of one request go. Requests with a safe method read
+    from one replica, chosen per request, until they write themselves
+    or their user turns out to have written recently.
+    """
+    __slots__ = ('request', 'replica', 'wrote', '_sticky_user_id')
+
+    def __init__(self, request, replicas):
+        self.request = request
+        self.replica = random.choice(replicas) if replicas and request.method in SAFE_METHODS else None
+        self.wrote = False
+        self._sticky_user_id = None
+
+    def db_for_read(self):
+        if self.replica is None or self.wrote:
+            return DEFAULT_DB_ALIAS
+        user_id = request_user_id(self.request)
+        if user_id is not None and user_id != self._sticky_user_id:
+            # Checked once per request, when the user is known.
+            self._sticky_user_id = user_id
+            if is_sticky(user_id):
+                self.replica = None
+                return DEFAULT_DB_ALIAS
+        return self.replica
+
+
+class ReplicaRouter:
+    """
+    Sends the reads of GET, HEAD and OPTIONS requests to a replica and
+    everything else to the primary ('default'):
+
+    - writes, and all reads of a request after its first write
+    - reads of other methods, outside of requests and of PRIMARY_APPS
+    - reads of users who wrote within REPLICA_ROUTING['STICKY_SECONDS'],
+      so they always see their own changes (read-your-writes); the
+      cache of REPLICA_ROUTING['CACHE_ALIAS'] has to be shared by all
+      worker processes for this
+    - reads after read_from_primary(), e.g. of versioned responses
+
+    Needs ReplicaRoutingMiddleware; without replicas it routes nothing.
+    Reads of streamed response bodies run after the middleware returned
+    and go to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        routing = _current.get()
+        if routing is None or model._meta.app_label in PRIMARY_APPS:
+            return DEFAULT_DB_ALIAS
+        return routing.db_for_read()
+
+    def db_for_write(self, model, **hints):
+        routing = _current.get()
+        if routing is not None:
+            routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get the schema by replication from the primary.
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Provides the request to ReplicaRouter and, after a request that
+    wrote (any unsafe method, or a safe one whose view wrote), keeps
+    the reads of its user on the primary for STICKY_SECONDS.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.replicas = replica_aliases()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        routing = RequestRouting(request, self.replicas)
+        token = _current.set(routing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.finish(request, routing)
+        return response
+
+    async def __acall__(self, request):
+        routing = RequestRouting(request, self.replicas)
+        token = _current.set(routing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.finish(request, routing)
+        return response
+
+    def finish(self, request, routing):
+        if not self.replicas or (request.method in SAFE_METHODS and not routing.wrote):
+            return
+        user_id = request_user_id(request)
+        if user_id is not None:
+            stick_to_primary(user_id)
+
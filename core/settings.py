@@ -10,8 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from core.cache import local_cache_settings, shared_cache_settings
+from core.database import database_settings, replica_settings
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -31,6 +35,7 @@ ALLOWED_HOSTS = []
 # Application definition
 
 INSTALLED_APPS = [
+    'core',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -44,6 +49,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.instrumentation.RequestMetricsMiddleware',
+    'core.replicas.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -76,11 +83,42 @@ WSGI_APPLICATION = 'core.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Configured by the DB_* environment variables, SQLite by default
+# (see core.database.database_settings).
 DATABASES = {
+    'default': database_settings('DB', default_name=BASE_DIR / 'db.sqlite3'),
+    **replica_settings('DB'),
+}
+
+# Reads of GET requests go to the replicas (DB_REPLICAS=N), except for
+# users who wrote within STICKY_SECONDS, as remembered in a cache shared
+# by all worker processes (see core.replicas).
+DATABASE_ROUTERS = ['core.replicas.ReplicaRouter']
+REPLICA_ROUTING = {
+    'STICKY_SECONDS': 10,
+    'CACHE_ALIAS': 'shared',
+}
+
+# Caches. State that every worker process has to see gets its own
+# shared cache, in Redis with CACHE_URL or in files below CACHE_DIR
+# (see core.cache.shared_cache_settings). Cached responses are kept per
+# process unless CACHE_URL is set (see core.cache.local_cache_settings);
+# 'default' is per process.
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'versions': shared_cache_settings('versions', default_dir=BASE_DIR / '.cache'),
+    'responses': local_cache_settings('responses'),
+    'shared': shared_cache_settings('shared', default_dir=BASE_DIR / '.cache'),
+}
+
+# Applied to every SQLite connection (see core.database.configure_sqlite).
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'busy_timeout': 5000,
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
 }
 
 
@@ -127,12 +165,113 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
 REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.instrumentation.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
      'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication'
+        'auth_app.authentication.CachedTokenAuthentication'
     ]
     }
+
+# Login by email address (see auth_app.backends); the admin login
+# with username is handled by the ModelBackend.
+AUTHENTICATION_BACKENDS = [
+    'auth_app.backends.EmailBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
+# Token buckets of login and registration attempts per IP address and
+# per email (see auth_app.throttling): CAPACITY attempts at once,
+# refilled by PER_MINUTE attempts per minute. The buckets are kept in a
+# cache shared by all worker processes, which would otherwise each allow
+# the full budget.
+AUTH_THROTTLES = {
+    'login_ip': {'CAPACITY': 30, 'PER_MINUTE': 10},
+    'login_email': {'CAPACITY': 5, 'PER_MINUTE': 1},
+    'registration_ip': {'CAPACITY': 10, 'PER_MINUTE': 0.2},
+    'registration_email': {'CAPACITY': 3, 'PER_MINUTE': 1},
+}
+AUTH_THROTTLE_CACHE_ALIAS = 'shared'
+
+# The user IDs and flags of authenticated tokens are cached in a cache
+# shared by all worker processes, so that deactivating a user or deleting
+# a token takes effect everywhere (see auth_app.authentication).
+TOKEN_CACHE_ALIAS = 'shared'
+TOKEN_CACHE_TTL = 300
+
+# Process-level cache of board owners and members used by the
+# permission checks (see kanban_app.membership).
+BOARD_ACCESS_CACHE = {
+    'MAXSIZE': 10000,
+    'TTL': 30,
+}
    
 
+
+# Maximum number of tasks per request to /api/tasks/bulk/.
+TASK_BULK_MAX_ITEMS = 5000
+
+# Maximum size in bytes of a board export posted to /api/boards/import/.
+BOARD_IMPORT_MAX_BYTES = 20 * 1024 * 1024
+
+# Version stamps behind the ETags of board detail and task list responses
+# (see kanban_app.versioning), in a cache shared by all worker processes.
+# Stamps expire after CONTENT_VERSION_TTL seconds without a change, which
+# only makes clients download the response once more.
+CONTENT_VERSION_CACHE_ALIAS = 'versions'
+CONTENT_VERSION_TTL = 24 * 60 * 60
+
+# Cached JSON bodies of the task lists of each user, valid as long as
+# the version stamps above (see kanban_app.response_cache). The bodies
+# get a cache of their own, so they cannot evict the stamps.
+TASK_LIST_CACHE = {
+    'ALIAS': 'responses',
+    'TTL': 300,
+    'MAX_BYTES': 1024 * 1024,
+}
+
+# Delta sync cursors (see kanban_app.changelog) do not move past change
+# log entries younger than this, so entries of transactions committing
+# out of ID order on PostgreSQL are not skipped. Must exceed the longest
+# transaction writing entries.
+BOARD_CHANGES_SAFETY_SECONDS = 30
+
+# Realtime board events (see kanban_app.events). The in-memory broker
+# only reaches clients connected to the same process. Browsers connect
+# with single-use tickets valid for BOARD_EVENTS_TICKET_TTL seconds,
+# kept in a shared cache (see kanban_app.api.event_stream).
+BOARD_EVENTS_BROKER = 'kanban_app.events.InMemoryBroker'
+BOARD_EVENTS_HEARTBEAT = 15
+BOARD_EVENTS_TICKET_TTL = 30
+BOARD_EVENTS_CACHE_ALIAS = 'shared'
+
+# Streamed JSON responses (see kanban_app.api.streaming): rows rendered
+# per chunk, and the task count from which a board detail is streamed.
+STREAMING_CHUNK_SIZE = 500
+STREAMING_MIN_BOARD_TASKS = 1000
+
+# Request instrumentation (see core.instrumentation): Server-Timing
+# headers, a JSON log line on 'core.requests' for requests slower than
+# SLOW_REQUEST_MS and per-route histograms on /metrics, which requires
+# 'Authorization: Bearer <TOKEN>' and is disabled without a TOKEN
+# (METRICS_TOKEN environment variable).
+REQUEST_METRICS = {
+    'SERVER_TIMING': True,
+    'SLOW_REQUEST_MS': 500,
+    'TOKEN': os.environ.get('METRICS_TOKEN'),
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.requests': {'handlers': ['console'], 'level': 'WARNING', 'propagate': False},
+    },
+}
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+# Every configured cache replaced by a cache of the test process, so
+# tests neither see nor clear the shared caches of a running server
+# (see core.cache.shared_cache_settings), and parallel test processes
+# do not share entries.
+TEST_CACHES = {
+    alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'test-{alias}'}
+    for alias in settings.CACHES
+}
+
+# No slow request log lines between the test results; password hashing
+# alone makes logins take about the default threshold.
+TEST_REQUEST_METRICS = {**settings.REQUEST_METRICS, 'SLOW_REQUEST_MS': float('inf')}
+
+
+@override_settings(CACHES=TEST_CACHES, REQUEST_METRICS=TEST_REQUEST_METRICS)
+class IsolatedTestCase(TestCase):
+    """
+    TestCase with the caches of TEST_CACHES, emptied before every test
+    (IDs of the test database, and so cache keys, are reused by the
+    following tests), and without the slow request log.
+    """
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
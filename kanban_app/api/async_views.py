@@ -0,0 +1,217 @@
+from asgiref.sync import sync_to_async
+from django.db.models import aprefetch_related_objects
+from django.http import Http404, HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from auth_app.authentication import CachedTokenAuthentication
+from kanban_app.models import Board, Comment, Task
+from kanban_app.membership import aget_board_access
+from kanban_app.versioning import aconditional_get, board_version, user_version
+from .fast_serializers import (
+    FastBoardSerializer, FastCommentResponseSerializer, FastTaskSerializer, FastTasksofBoardSerializer,
+)
+from .filters import filter_tasks
+from .pagination import CommentKeysetPagination, TaskKeysetPagination
+from .serializer import BoardDetailSerializer, BoardSerializer
+from .streaming import MIN_STREAMED_TASKS, stream_list, stream_object
+from .views import BoardsDetailView, BoardsView, TaskCommentsListCreateView, TasksAssignedToMeView, TasksReviewingView
+
+
+class AsyncReadView:
+    """
+    Base of the async versions of the read-heavy endpoints.
+    GET requests are answered by the async get() method of the
+    subclass, which loads everything with the async ORM, so a request
+    waiting for the database does not hold a worker thread when served
+    through core/asgi.py. The responses are
+    the same as those of the DRF view in 'sync_view', which still
+    handles all other methods and the browsable API.
+
+    Serializers run on the event loop, so all data they read has to be
+    loaded (annotated, prefetched or joined) beforehand. Lists are read
+    as .values() rows and built by the serializers of fast_serializers.
+    """
+    sync_view = None
+    authentication = CachedTokenAuthentication
+
+    @classmethod
+    def as_view(cls):
+        sync_view = cls.sync_view.as_view()
+        allow = ', '.join(
+            method.upper() for method in cls.sync_view.http_method_names
+            if hasattr(cls.sync_view, method) or (method == 'head' and hasattr(cls.sync_view, 'get'))
+        )
+
+        async def view(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or wants_browsable_api(request):
+                return await sync_to_async(sync_view)(request, *args, **kwargs)
+            self = cls()
+            self.allow = allow
+            return await self.dispatch(request, *args, **kwargs)
+
+        return csrf_exempt(view)
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            request = Request(request)
+            request.user = await self.authenticate(request)
+            response = await self.get(request, *args, **kwargs)
+        except (exceptions.APIException, Http404) as exc:
+            response = self.handle_exception(exc)
+        response['Allow'] = self.allow
+        response['Vary'] = 'Accept'
+        return response
+
+    async def authenticate(self, request):
+        """Returns the user of the request's token; all endpoints need one."""
+        result = await self.authentication().aauthenticate(request)
+        if result is None:
+            raise exceptions.NotAuthenticated()
+        return result[0]
+
+    async def check_board_access(self, request, board_id):
+        """Raises PermissionDenied unless the user is owner or member of the board."""
+        access = await aget_board_access(board_id, request)
+        if access is None or not access.is_member_or_owner(request.user.id):
+            raise exceptions.PermissionDenied()
+
+    def render(self, data, status=status.HTTP_200_OK, headers=None):
+        """Returns the data rendered like a DRF JSON response."""
+        return HttpResponse(
+            JSONRenderer().render(data), status=status,
+            content_type='application/json', headers=headers,
+        )
+
+    def handle_exception(self, exc):
+        """Returns the same error response as DRF's exception handler."""
+        if isinstance(exc, Http404):
+            exc = exceptions.NotFound(*exc.args)
+        headers = {}
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            headers['WWW-Authenticate'] = self.authentication.keyword
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+        return self.render(data, status=exc.status_code, headers=headers)
+
+
+class AsyncBoardsView(AsyncReadView):
+    """
+    Async version of BoardsView for listing the boards of the user (GET).
+    """
+    sync_view = BoardsView
+
+    async def get(self, request):
+        boards = Board.objects.for_user(request.user).with_stats()
+        serializer = FastBoardSerializer()
+        rows = [row async for row in serializer.values(boards)]
+        if all(serializer.has_counters(row) for row in rows):
+            return self.render(serializer.serialize(rows))
+
+        # Boards without stats row fall back to counting per board.
+        boards = [board async for board in boards]
+        data = await sync_to_async(lambda: BoardSerializer(boards, many=True).data)()
+        return self.render(data)
+
+
+class AsyncBoardsDetailView(AsyncReadView):
+    """
+    Async version of BoardsDetailView for retrieving a board (GET).
+    """
+    sync_view = BoardsDetailView
+
+    async def get(self, request, pk):
+        board = await Board.objects.with_stats().filter(pk=pk).afirst()
+        if board is None:
+            raise Http404('No Board matches the given query.')
+        await self.check_board_access(request, board.pk)
+
+        async def build_response():
+            await aprefetch_related_objects([board], 'members')
+            tasks = FastTasksofBoardSerializer()
+            rows = tasks.values(Task.objects.filter(board=board).with_comment_count().in_column_order())
+            if (board.ticket_count or 0) >= MIN_STREAMED_TASKS:
+                # The tasks of large boards are read and rendered in chunks.
+                return stream_object(request, BoardDetailSerializer(board), 'tasks', rows, child=tasks)
+
+            serializer = BoardDetailSerializer(board)
+            del serializer.fields['tasks']
+            data = serializer.data
+            data['tasks'] = tasks.serialize([row async for row in rows])
+            return self.render(data)
+
+        return await aconditional_get(request, [board_version(board.pk)], build_response)
+
+
+class AsyncTaskListView(AsyncReadView):
+    """
+    Async version of TaskListView, with the same filters, keyset
+    pagination, '304 Not Modified' answers and response cache, and the
+    tasks of the 'user_field' of the sync view.
+    Unpaginated lists are streamed (see kanban_app.api.streaming).
+    """
+    pagination_class = TaskKeysetPagination
+
+    def get_queryset(self, request):
+        return Task.objects.filter(**{self.sync_view.user_field: request.user})
+
+    async def get(self, request):
+        return await aconditional_get(
+            request, [user_version(request.user.id)], lambda: self.list(request),
+            response_cache=self.sync_view.response_cache,
+        )
+
+    async def list(self, request):
+        tasks = filter_tasks(self.get_queryset(request), request.query_params).with_comment_count()
+        serializer = FastTaskSerializer()
+
+        paginator = self.pagination_class()
+        if paginator.is_requested(request):
+            page = await paginator.apaginate_queryset(serializer.values(tasks), request)
+            return self.render(paginator.get_paginated_data(serializer.serialize(page)))
+
+        return stream_list(request, paginator.limit_unpaginated(serializer.values(tasks.in_column_order())), serializer)
+
+
+class AsyncTasksAssignedToMeView(AsyncTaskListView):
+    """
+    Async version of TasksAssignedToMeView.
+    """
+    sync_view = TasksAssignedToMeView
+
+
+class AsyncTasksReviewingView(AsyncTaskListView):
+    """
+    Async version of TasksReviewingView.
+    """
+    sync_view = TasksReviewingView
+
+
+class AsyncTaskCommentsListView(AsyncReadView):
+    """
+    Async version of TaskCommentsListCreateView for listing
+    the comments of a task (GET), with the same opt-in pagination.
+    """
+    sync_view = TaskCommentsListCreateView
+    pagination_class = CommentKeysetPagination
+
+    async def get(self, request, pk):
+        board_id = await Task.objects.filter(pk=pk).values_list('board_id', flat=True).afirst()
+        if board_id is None:
+            raise Http404('No Task matches the given query.')
+        await self.check_board_access(request, board_id)
+
+        serializer = FastCommentResponseSerializer()
+        comments = Comment.objects.filter(task_id=pk)
+        paginator = self.pagination_class()
+        if paginator.is_requested(request):
+            page = await paginator.apaginate_queryset(serializer.values(comments), request)
+            return self.render(paginator.get_paginated_data(serializer.serialize(page)))
+
+        return self.render(await serializer.aserialize(paginator.limit_unpaginated(comments.order_by('created_at', 'id'))))
+
+
+def wants_browsable_api(request):
+    """Returns True if the client asks for HTML, e.g. a browser."""
+    return 'format' in request.GET or 'text/html' in request.headers.get('Accept', '')
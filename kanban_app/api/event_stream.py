@@ -0,0 +1,172 @@
+import hashlib
+import json
+import secrets
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework import exceptions
+from rest_framework.authentication import get_authorization_header
+
+from auth_app.authentication import CachedTokenAuthentication
+from kanban_app.changelog import MAX_CHANGES, CursorExpired, change_events
+from kanban_app.events import get_broker
+from kanban_app.membership import get_board_access
+from .streaming import is_asgi
+
+RESYNC = 'event: resync\ndata: {}\n\n'
+
+
+async def board_events(request, pk):
+    """
+    Server-sent event stream of a board (GET /api/boards/<id>/events/).
+    Sends one event per logged change ('cursor', 'kind', 'id', 'deleted')
+    as soon as it is committed; clients fetch the changed data from
+    /api/boards/<id>/changes/?since=<cursor>. The event ID is the cursor:
+    a client reconnecting with Last-Event-ID (as EventSource does) first
+    gets the logged changes after it, or a 'resync' event if they are no
+    longer available.
+
+    Authenticates with the DRF token in the Authorization header or,
+    since EventSource cannot set headers, with a single-use ticket of
+    BoardEventTicketView as 'ticket' query parameter, so that tokens do
+    not end up in URLs and access logs. The stream ends when the user
+    loses access to the board or the board is deleted.
+
+    Needs an ASGI server (core/asgi.py): WSGI servers would buffer the
+    endless stream and hold a worker without sending anything, so they
+    get '501 Not Implemented' before a ticket is redeemed.
+    """
+    if not is_asgi(request):
+        return JsonResponse({
+            'detail': 'Event streams need the ASGI server; poll the changes of the board instead.',
+            'changes': f'/api/boards/{pk}/changes/',
+        }, status=501)
+
+    user_id = await sync_to_async(authenticate)(request, pk)
+    if user_id is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided or are invalid.'}, status=401)
+
+    access = await sync_to_async(get_board_access)(pk)
+    if access is None:
+        return JsonResponse({'detail': 'Not found.'}, status=404)
+    if not access.is_member_or_owner(user_id):
+        return JsonResponse({'detail': 'You do not have permission to perform this action.'}, status=403)
+
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    since = int(last_event_id) if last_event_id.isdigit() else None
+    response = StreamingHttpResponse(stream_events(pk, user_id, since), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def stream_events(board_id, user_id, since=None):
+    """
+    Yields the events of a board in the text/event-stream format, with a
+    comment line as heartbeat while nothing happens, starting with the
+    logged changes after the cursor 'since' if given. Ends the stream
+    if the user lost access to the board, checked on every heartbeat and
+    change of the board or its members, or if the client fell behind.
+    """
+    heartbeat = getattr(settings, 'BOARD_EVENTS_HEARTBEAT', 15)
+    broker = get_broker()
+    # Subscribed before the log is read, so no change is lost in between.
+    subscription = broker.subscribe(board_id)
+    try:
+        yield f'retry: {heartbeat * 1000}\n\n'
+        replayed = set()
+        if since is not None:
+            try:
+                events = await sync_to_async(change_events)(board_id, since)
+            except CursorExpired:
+                events = None
+            if events is None or len(events) > MAX_CHANGES:
+                yield RESYNC
+                return
+            for event in events:
+                replayed.add(event['cursor'])
+                yield format_event(event)
+
+        while True:
+            event = await subscription.get(timeout=heartbeat)
+            if subscription.overflowed:
+                yield RESYNC
+                return
+            if event is None:
+                if not await has_access(board_id, user_id):
+                    return
+                yield ': heartbeat\n\n'
+                continue
+            if event['cursor'] in replayed:
+                continue
+
+            yield format_event(event)
+            if event['kind'] == 'member' and event['deleted'] and event['id'] == user_id:
+                return
+            if event['kind'] in ('board', 'member') and not await has_access(board_id, user_id):
+                return
+    finally:
+        broker.unsubscribe(subscription)
+
+
+def format_event(event):
+    return f"id: {event['cursor']}\nevent: change\ndata: {json.dumps(event)}\n\n"
+
+
+async def has_access(board_id, user_id):
+    """Returns True if the board exists and the user is its owner or a member."""
+    access = await sync_to_async(get_board_access)(board_id)
+    return access is not None and access.is_member_or_owner(user_id)
+
+
+def authenticate(request, board_id):
+    """Returns the ID of the user of the request's token or ticket, or None."""
+    auth = get_authorization_header(request).split()
+    if len(auth) == 2 and auth[0].lower() == b'token':
+        try:
+            user, _ = CachedTokenAuthentication().authenticate_credentials(auth[1].decode(errors='ignore'))
+        except exceptions.AuthenticationFailed:
+            return None
+        return user.id
+
+    ticket = request.GET.get('ticket')
+    return redeem_ticket(ticket, board_id) if ticket else None
+
+
+def ticket_ttl():
+    return getattr(settings, 'BOARD_EVENTS_TICKET_TTL', 30)
+
+
+def _ticket_cache():
+    return caches[getattr(settings, 'BOARD_EVENTS_CACHE_ALIAS', 'default')]
+
+
+def _ticket_key(ticket):
+    return 'event_ticket:' + hashlib.sha256(ticket.encode()).hexdigest()
+
+
+def issue_ticket(user_id, board_id):
+    """
+    Returns a new ticket for one connection of the user to the event
+    stream of the board, valid for BOARD_EVENTS_TICKET_TTL seconds.
+    """
+    ticket = secrets.token_urlsafe(32)
+    _ticket_cache().set(_ticket_key(ticket), (user_id, board_id), ticket_ttl())
+    return ticket
+
+
+def redeem_ticket(ticket, board_id):
+    """
+    Returns the user ID of a ticket for the board and invalidates the
+    ticket, or None if it is unknown, expired or already used.
+    """
+    cache, key = _ticket_cache(), _ticket_key(ticket)
+    value = cache.get(key)
+    # delete() tells whether this call removed the entry, so only one
+    # of several concurrent requests with the same ticket gets through.
+    if value is None or not cache.delete(key):
+        return None
+    user_id, ticket_board_id = value
+    return user_id if ticket_board_id == board_id else None
@@ -0,0 +1,191 @@
+from functools import cached_property
+from operator import itemgetter
+
+from rest_framework import serializers
+
+from core.instrumentation import measure_serialization
+
+from .serializer import BoardSerializer, CommentResponseSerializer, TaskSerializer, TasksofBoardSerializer
+
+# DRF fields used for the formatting of dates, so the output follows the
+# same settings (DATE_FORMAT, DATETIME_FORMAT, TIME_ZONE) as the serializers.
+_date_field = serializers.DateField()
+_datetime_field = serializers.DateTimeField()
+
+
+class FastSerializer:
+    """
+    Read-only serializer for the hot list endpoints that builds the
+    output dicts directly from .values() rows instead of model instances.
+    The same data as the DRF serializer in 'serializes' is returned, but
+    without creating model instances and bound fields for every row.
+
+    'lookups' are the arguments of .values(); 'plan' is the list of
+    (output name, function of the row) pairs, built once per class.
+    Functions that depend on the request (the active timezone) are
+    bound once per serializer instance, so create one per request.
+    Annotations the DRF serializer falls back on (e.g. comments_count)
+    have to be present in the queryset.
+    """
+    serializes = None
+    lookups = ()
+    plan = ()
+
+    def values(self, queryset):
+        """Returns the queryset as the rows this serializer reads."""
+        return queryset.values(*self.lookups)
+
+    @cached_property
+    def bound_plan(self):
+        """Returns the plan with the request dependent functions bound."""
+        return [(name, get.bind() if hasattr(get, 'bind') else get) for name, get in self.plan]
+
+    def to_representation(self, row):
+        return {name: get(row) for name, get in self.bound_plan}
+
+    def serialize(self, rows):
+        """Returns the representation of every row."""
+        plan = self.bound_plan
+        with measure_serialization():
+            return [{name: get(row) for name, get in plan} for row in rows]
+
+    async def aserialize(self, queryset):
+        """Loads the rows of the queryset with the async ORM and serializes them."""
+        return self.serialize([row async for row in self.values(queryset)])
+
+
+def column(lookup):
+    """Returns the value of a column as is (IDs, text, annotated numbers)."""
+    return itemgetter(lookup)
+
+
+def date_column(lookup):
+    """Returns a date column formatted like serializers.DateField."""
+    to_representation = _date_field.to_representation
+    return lambda row: to_representation(row[lookup])
+
+
+class DateTimeColumn:
+    """
+    A datetime column formatted like serializers.DateTimeField, in the
+    timezone that is active when the plan is bound. Looking the timezone
+    up once instead of per row makes long comment lists much cheaper.
+    """
+
+    def __init__(self, lookup):
+        self.lookup = lookup
+
+    def bind(self):
+        lookup = self.lookup
+        field = serializers.DateTimeField(default_timezone=_datetime_field.default_timezone())
+        to_representation = field.to_representation
+        return lambda row: to_representation(row[lookup])
+
+
+def fullname(prefix):
+    """
+    Returns first and last name of a related user like
+    SimplifiedUserSerializer.get_fullname().
+    """
+    first_name, last_name = f'{prefix}__first_name', f'{prefix}__last_name'
+    return lambda row: f'{row[first_name]} {row[last_name]}'.strip()
+
+
+def user(prefix, fallback=True):
+    """
+    Returns a related user like UserSerializer (with 'fallback' to the
+    username or email for users without name) or SimplifiedUserSerializer.
+    """
+    user_id, email, username = f'{prefix}_id', f'{prefix}__email', f'{prefix}__username'
+    name = fullname(prefix)
+
+    def get(row):
+        if row[user_id] is None:
+            return None
+        full = name(row)
+        if fallback and not full:
+            full = row[username] or row[email]
+        return {'id': row[user_id], 'email': row[email], 'fullname': full}
+
+    return get
+
+
+def user_lookups(prefix, fallback=True):
+    """Returns the .values() lookups read by user()."""
+    lookups = [f'{prefix}_id', f'{prefix}__email', f'{prefix}__first_name', f'{prefix}__last_name']
+    return lookups + [f'{prefix}__username'] if fallback else lookups
+
+
+class FastBoardSerializer(FastSerializer):
+    """
+    BoardSerializer for boards annotated by Board.objects.with_stats()
+    or with_counts(). Rows without counters (no stats row) have to be
+    serialized by BoardSerializer, which counts them on demand.
+    """
+    serializes = BoardSerializer
+    counters = ['member_count', 'ticket_count', 'tasks_to_do_count', 'tasks_high_prio_count']
+    lookups = ['id', 'title', 'owner_id'] + counters
+    plan = [(name, column(name)) for name in lookups]
+
+    def has_counters(self, row):
+        """Returns True if all counters of the row were annotated."""
+        return all(row[name] is not None for name in self.counters)
+
+
+class FastTaskSerializer(FastSerializer):
+    """
+    TaskSerializer for tasks annotated by with_comment_count().
+    """
+    serializes = TaskSerializer
+    lookups = [
+        'id', 'board_id', 'title', 'description', 'status', 'priority', 'due_date', 'comments_count',
+        *user_lookups('assignee'), *user_lookups('reviewer'),
+    ]
+    plan = [
+        ('id', column('id')),
+        ('board', column('board_id')),
+        ('title', column('title')),
+        ('description', column('description')),
+        ('status', column('status')),
+        ('priority', column('priority')),
+        ('assignee', user('assignee')),
+        ('reviewer', user('reviewer')),
+        ('due_date', date_column('due_date')),
+        ('comments_count', column('comments_count')),
+    ]
+
+
+class FastTasksofBoardSerializer(FastSerializer):
+    """
+    TasksofBoardSerializer for tasks annotated by with_comment_count().
+    """
+    serializes = TasksofBoardSerializer
+    lookups = [
+        'id', 'title', 'description', 'status', 'priority', 'due_date', 'comments_count',
+        *user_lookups('assignee', fallback=False), *user_lookups('reviewer', fallback=False),
+    ]
+    plan = [
+        ('id', column('id')),
+        ('title', column('title')),
+        ('description', column('description')),
+        ('status', column('status')),
+        ('priority', column('priority')),
+        ('assignee', user('assignee', fallback=False)),
+        ('reviewer', user('reviewer', fallback=False)),
+        ('due_date', date_column('due_date')),
+        ('comments_count', column('comments_count')),
+    ]
+
+
+class FastCommentResponseSerializer(FastSerializer):
+    """
+    CommentResponseSerializer for comments.
+    """
+    serializes = CommentResponseSerializer
+    lookups = ['id', 'created_at', 'author__first_name', 'author__last_name', 'content']
+    plan = [
+        ('id', column('id')),
+        ('created_at', DateTimeColumn('created_at')),
+        ('author', fullname('author')),
+        ('content', column('content')),
+    ]
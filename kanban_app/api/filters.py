@@ -0,0 +1,45 @@
+import datetime
+
+from rest_framework.exceptions import ValidationError
+from kanban_app.models import Task
+
+
+def filter_tasks(queryset, query_params):
+    """
+    Applies the optional task list filters from the query parameters:
+    status, priority, board, due_date_from and due_date_to.
+    Raises a ValidationError for values that cannot be applied.
+    """
+    errors = {}
+
+    status_value = query_params.get('status')
+    if status_value:
+        if status_value not in Task.STATUS_CHOICES:
+            errors['status'] = f"Invalid status '{status_value}'."
+        queryset = queryset.filter(status=status_value)
+
+    priority = query_params.get('priority')
+    if priority:
+        if priority not in Task.PRIORITY_CHOICES:
+            errors['priority'] = f"Invalid priority '{priority}'."
+        queryset = queryset.filter(priority=priority)
+
+    board = query_params.get('board')
+    if board:
+        if not board.isdigit():
+            errors['board'] = 'Board must be an ID.'
+        else:
+            queryset = queryset.filter(board_id=int(board))
+
+    for param, lookup in (('due_date_from', 'due_date__gte'), ('due_date_to', 'due_date__lte')):
+        value = query_params.get(param)
+        if not value:
+            continue
+        try:
+            queryset = queryset.filter(**{lookup: datetime.date.fromisoformat(value)})
+        except ValueError:
+            errors[param] = 'Date has wrong format. Use YYYY-MM-DD.'
+
+    if errors:
+        raise ValidationError(errors)
+    return queryset
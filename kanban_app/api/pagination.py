@@ -0,0 +1,188 @@
+import base64
+import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination:
+    """
+    Cursor (keyset) pagination over a unique ordering of two fields,
+    e.g. (due_date, id). Each page is fetched with a range condition on
+    the last row of the previous page instead of an OFFSET, so loading
+    a page takes the same time no matter how deep the client has paged.
+
+    Pagination is opt-in: it is only applied if the request contains
+    the 'cursor' or the 'page_size' query parameter. Otherwise a plain
+    list is returned as before, bounded to its first 'max_unpaginated'
+    rows (see limit_unpaginated()); clients needing more have to page.
+
+    With 'bidirectional' the response also links to the previous page,
+    and 'latest' starts at the end of the list instead of its start.
+    """
+    ordering = ('due_date', 'id')
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    latest_query_param = 'latest'
+    page_size = 50
+    max_page_size = 200
+    max_unpaginated = 1000
+    bidirectional = False
+
+    def is_requested(self, request):
+        """Returns True if the client asked for a paginated response."""
+        params = request.query_params
+        names = [self.cursor_query_param, self.page_size_query_param]
+        if self.bidirectional:
+            names.append(self.latest_query_param)
+        return any(name in params for name in names)
+
+    def limit_unpaginated(self, queryset):
+        """Returns the ordered queryset of an unpaginated list, bounded."""
+        return queryset[:self.max_unpaginated]
+
+    def paginate_queryset(self, queryset, request):
+        """
+        Returns the rows of the requested page and remembers
+        the cursors of the neighbouring pages.
+        """
+        queryset, page_size = self.get_page_queryset(queryset, request)
+        return self.set_page(list(queryset), page_size)
+
+    async def apaginate_queryset(self, queryset, request):
+        """Async version of paginate_queryset() for the async views."""
+        queryset, page_size = self.get_page_queryset(queryset, request)
+        return self.set_page([row async for row in queryset], page_size)
+
+    def get_page_queryset(self, queryset, request):
+        """
+        Returns the queryset of the requested page, with one extra row
+        to tell whether there are more rows, and the page size.
+        A page before the cursor is read in reverse order.
+        """
+        self.request = request
+        first, second = self.ordering
+
+        position = self.decode_cursor(request)
+        self.has_cursor = position is not None
+        if position is None:
+            self.reverse = self.bidirectional and self.latest_query_param in request.query_params
+        else:
+            self.reverse, value, pk = position
+            lookup = 'lt' if self.reverse else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{first}__{lookup}': value}) | Q(**{first: value, f'{second}__{lookup}': pk})
+            )
+
+        if self.reverse:
+            queryset = queryset.order_by(f'-{first}', f'-{second}')
+        else:
+            queryset = queryset.order_by(first, second)
+
+        page_size = self.get_page_size(request)
+        return queryset[:page_size + 1], page_size
+
+    def set_page(self, rows, page_size):
+        """Remembers whether there are more pages and returns the page rows."""
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if self.reverse:
+            rows.reverse()
+            self.has_previous, self.has_next = has_more, self.has_cursor
+        else:
+            self.has_next, self.has_previous = has_more, self.has_cursor
+        self.first_position = self.get_position(rows[0]) if rows else None
+        self.last_position = self.get_position(rows[-1]) if rows else None
+        return rows
+
+    def get_position(self, row):
+        """Returns the ordering values of a model instance or .values() row."""
+        first, second = self.ordering
+        if isinstance(row, dict):
+            return row[first], row[second]
+        return getattr(row, first), getattr(row, second)
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_data(self, data):
+        if self.bidirectional:
+            return {'next': self.get_next_link(), 'previous': self.get_previous_link(), 'results': data}
+        return {'next': self.get_next_link(), 'results': data}
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next or self.last_position is None:
+            return None
+        return self.get_link(self.encode_cursor(self.last_position))
+
+    def get_previous_link(self):
+        if not self.has_previous or self.first_position is None:
+            return None
+        return self.get_link(self.encode_cursor(self.first_position, reverse=True))
+
+    def get_link(self, cursor):
+        url = remove_query_param(self.request.build_absolute_uri(), self.latest_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def encode_cursor(self, position, reverse=False):
+        value, pk = position
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            value = value.isoformat()
+        raw = f'{value}|{pk}'
+        if reverse:
+            raw = 'b|' + raw
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, request):
+        """
+        Returns (reverse, value, id) of the position encoded in the cursor
+        parameter, or None if the first (or with 'latest' the last) page
+        is requested. Cursors of the page before a position start with 'b|'.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode()).decode()
+            reverse = raw.startswith('b|')
+            if reverse and not self.bidirectional:
+                raise ValueError
+            value, pk = raw.removeprefix('b|').rsplit('|', 1)
+            return reverse, self.parse_value(value), int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound('Invalid cursor.')
+
+    def parse_value(self, value):
+        """Converts the ordering value of the cursor back to its Python type."""
+        return datetime.date.fromisoformat(value)
+
+
+class TaskKeysetPagination(KeysetPagination):
+    """
+    Keyset pagination for task lists ordered by (due_date, id).
+    """
+    ordering = ('due_date', 'id')
+
+
+class CommentKeysetPagination(KeysetPagination):
+    """
+    Keyset pagination for the comments of a task ordered by
+    (created_at, id) in both directions; 'latest' returns the page
+    with the newest comments, e.g. to open a long thread at its end.
+    """
+    ordering = ('created_at', 'id')
+    bidirectional = True
+
+    def parse_value(self, value):
+        return datetime.datetime.fromisoformat(value)
@@ -1,5 +1,5 @@
 from rest_framework.permissions import BasePermission
-from kanban_app.models import Board,Task
+from kanban_app.membership import board_id_of, get_board_access
 
 
 
@@ -9,7 +9,8 @@ class IsBoardMemberOrOwner(BasePermission):
     or a member of the associated board.
     """
     def has_object_permission(self, request, view, obj):
-        return request.user == obj.owner or request.user in obj.members.all()
+        access = get_board_access(board_id_of(obj), request)
+        return access is not None and access.is_member_or_owner(request.user.id)
 
 
 class IsBoardMember(BasePermission):
@@ -29,12 +30,8 @@ class IsBoardMember(BasePermission):
         if not board_id:
             return True 
 
-        try:
-            board = Board.objects.get(id=board_id)
-        except Board.DoesNotExist:
-            return False
-
-        return request.user == board.owner or request.user in board.members.all()
+        access = get_board_access(board_id, request)
+        return access is not None and access.is_member_or_owner(request.user.id)
 
     def has_object_permission(self, request, view, obj):
         """
@@ -42,8 +39,8 @@ class IsBoardMember(BasePermission):
         If the object is a child object with a 'board' attribute,
         the board is determined and membership/ownership checked.
         """
-        board = obj.board if hasattr(obj, "board") else obj
-        return request.user == board.owner or request.user in board.members.all()
+        access = get_board_access(board_id_of(obj), request)
+        return access is not None and access.is_member_or_owner(request.user.id)
 
 
 class IsTaskCreatorOrBoardOwner(BasePermission):
@@ -53,8 +50,11 @@ class IsTaskCreatorOrBoardOwner(BasePermission):
     """
 
     def has_object_permission(self, request, view, obj):
-        user = request.user
-        return user == obj.owner or user == obj.board.owner
+        user_id = request.user.id
+        if user_id == obj.owner_id:
+            return True
+        access = get_board_access(board_id_of(obj), request)
+        return access is not None and user_id == access.owner_id
 
 
 class IsBoardMemberForTask(BasePermission):
@@ -63,16 +63,12 @@ class IsBoardMemberForTask(BasePermission):
     """
 
     def has_object_permission(self, request, view, obj):
-        user = request.user
-
-        if hasattr(obj, 'task'):
-            board = obj.task.board
-        elif hasattr(obj, 'board'):
-            board = obj.board
-        else:
+        board_id = board_id_of(obj)
+        if board_id is None:
             return False
 
-        return user.id == board.owner.id or board.members.filter(id=user.id).exists()
+        access = get_board_access(board_id, request)
+        return access is not None and access.is_member_or_owner(request.user.id)
 
 
 class IsCommentAuthor(BasePermission):
@@ -81,4 +77,4 @@ class IsCommentAuthor(BasePermission):
     """
 
     def has_object_permission(self, request, view, obj):
-        return obj.author == request.user
+        return obj.author_id == request.user.id
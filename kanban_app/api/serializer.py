@@ -1,11 +1,22 @@
 from rest_framework import serializers
+from core.instrumentation import TimedSerializerMixin
 from kanban_app.models import Board,Task,Comment
 from auth_app.models import User
 from auth_app.api.serializers import UserSerializer
+from kanban_app.membership import get_board_access
 
 
 
-class SimplifiedUserSerializer(serializers.ModelSerializer):
+def comments_count(task):
+    """
+    Returns the comment count annotated by Task.objects.with_comment_count()
+    if present, otherwise counts the comments with a separate query.
+    """
+    count = getattr(task, 'comments_count', None)
+    return count if count is not None else task.comments.count()
+
+
+class SimplifiedUserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Simplified user serializer that returns only ID, email,
     and full name.
@@ -23,7 +34,7 @@ class SimplifiedUserSerializer(serializers.ModelSerializer):
         return f"{obj.first_name} {obj.last_name}".strip()
 
 
-class BoardSerializer(serializers.ModelSerializer):
+class BoardSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for representing boards including
     members, owner, and various counts
@@ -51,22 +62,30 @@ class BoardSerializer(serializers.ModelSerializer):
 
     def get_member_count(self, obj):
         """Returns the number of members."""
-        return obj.members.count()
+        return self._annotated_or(obj, 'member_count', lambda: obj.members.count())
 
     def get_ticket_count(self, obj):
         """Returns the total number of tasks in the board."""
-        return obj.tasks.count()
+        return self._annotated_or(obj, 'ticket_count', lambda: obj.tasks.count())
 
     def get_tasks_to_do_count(self, obj):
         """Returns the number of tasks with status 'to_do'."""
-        return obj.tasks.filter(status='to_do').count()
+        return self._annotated_or(obj, 'tasks_to_do_count', lambda: obj.tasks.filter(status='to_do').count())
 
     def get_tasks_high_prio_count(self, obj):
         """Returns the number of tasks with high priority."""
-        return obj.tasks.filter(priority='high').count()
+        return self._annotated_or(obj, 'tasks_high_prio_count', lambda: obj.tasks.filter(priority='high').count())
 
+    def _annotated_or(self, obj, name, fallback):
+        """
+        Returns the value annotated by Board.objects.with_stats() or
+        with_counts() if present, otherwise counts with a separate query.
+        """
+        value = getattr(obj, name, None)
+        return value if value is not None else fallback()
 
-class BoardCreateSerializer(serializers.ModelSerializer):
+
+class BoardCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for creating a board with title
     and members specified (members are write-only).
@@ -82,7 +101,7 @@ class BoardCreateSerializer(serializers.ModelSerializer):
         fields = ['title', 'members']
 
 
-class TasksofBoardSerializer(serializers.ModelSerializer):
+class TasksofBoardSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for tasks of a board including
     comment count and simplified user info
@@ -101,10 +120,20 @@ class TasksofBoardSerializer(serializers.ModelSerializer):
 
     def get_comments_count(self, obj):
         """Returns the number of comments for a task."""
-        return obj.comments.count()
+        return comments_count(obj)
+
+
+class TaskChangeSerializer(TasksofBoardSerializer):
+    """
+    Serializer for changed tasks in a delta sync response,
+    including the rank to order the task within its column.
+    """
+
+    class Meta(TasksofBoardSerializer.Meta):
+        fields = TasksofBoardSerializer.Meta.fields + ['rank']
 
 
-class BoardDetailSerializer(serializers.ModelSerializer):
+class BoardDetailSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Detailed serializer for boards with full
     user information for members and tasks.
@@ -118,7 +147,7 @@ class BoardDetailSerializer(serializers.ModelSerializer):
         fields = ['id', 'title', 'owner_id', 'members', 'tasks']
 
 
-class BoardUpdateSerializer(serializers.ModelSerializer):
+class BoardUpdateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for updating boards, showing owner and
     members as read-only fields using UserSerializer.
@@ -131,7 +160,7 @@ class BoardUpdateSerializer(serializers.ModelSerializer):
         fields = ['id', 'title', 'owner_data', 'members_data']
 
 
-class TaskCreateSerializer(serializers.ModelSerializer):
+class TaskCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for creating and updating tasks,
     expects 'assignee_id' and 'reviewer_id' as foreign key IDs.
@@ -184,7 +213,91 @@ class TaskCreateSerializer(serializers.ModelSerializer):
         return instance
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskBulkItemSerializer(serializers.Serializer):
+    """
+    Serializer for one task of a bulk create or update request.
+    Board, assignee and reviewer are plain IDs; membership is checked
+    against the cached board access instead of one query per item.
+    """
+    id = serializers.IntegerField(required=False)
+    board = serializers.IntegerField()
+    title = serializers.CharField(max_length=30)
+    description = serializers.CharField(max_length=500, allow_blank=True, required=False, default='')
+    priority = serializers.ChoiceField(choices=list(Task.PRIORITY_CHOICES.items()))
+    status = serializers.ChoiceField(choices=list(Task.STATUS_CHOICES.items()))
+    due_date = serializers.DateField()
+    assignee_id = serializers.IntegerField()
+    reviewer_id = serializers.IntegerField()
+
+    def validate(self, data):
+        """
+        Checks board access for creating (board member) or updating
+        (board member and task creator or board owner) and that assignee
+        and reviewer are members or the owner of the board.
+        """
+        request = self.context['request']
+        user_id = request.user.id
+
+        if self.partial:
+            if 'id' not in data:
+                raise serializers.ValidationError({'id': 'This field is required.'})
+            task = self.context['tasks'].get(data['id'])
+            if task is None:
+                raise serializers.ValidationError({'id': 'Task not found.'})
+            if 'board' in data and data['board'] != task.board_id:
+                raise serializers.ValidationError({'board': 'The board of a task cannot be changed.'})
+            access = get_board_access(task.board_id, request)
+            if access is None:
+                raise serializers.ValidationError({'id': 'Task not found.'})
+            if not access.is_member_or_owner(user_id):
+                raise serializers.ValidationError('You are not a member of this board.')
+            if user_id != task.owner_id and user_id != access.owner_id:
+                raise serializers.ValidationError('Only the task creator or the board owner can change this task.')
+        else:
+            access = get_board_access(data['board'], request)
+            if access is None:
+                raise serializers.ValidationError({'board': 'Board not found.'})
+            if not access.is_member(user_id):
+                raise serializers.ValidationError({'board': 'You are not a member of this board.'})
+
+        for field in ('assignee_id', 'reviewer_id'):
+            if field in data and not access.is_member_or_owner(data[field]):
+                raise serializers.ValidationError({field: 'Must be a member of the board.'})
+        return data
+
+
+class TaskMoveSerializer(serializers.Serializer):
+    """
+    Serializer for moving a task to a position in a status column:
+    directly below the task 'after' or directly above the task 'before'.
+    Without a neighbour the task is moved to the end of the column.
+    """
+    status = serializers.ChoiceField(choices=list(Task.STATUS_CHOICES.items()), required=False)
+    after = serializers.PrimaryKeyRelatedField(queryset=Task.objects.all(), required=False, allow_null=True)
+    before = serializers.PrimaryKeyRelatedField(queryset=Task.objects.all(), required=False, allow_null=True)
+
+    def validate(self, data):
+        """
+        Checks that at most one neighbour is given and that it is
+        another task in the target column of the same board.
+        """
+        task = self.context['task']
+        status = data.get('status', task.status)
+        after, before = data.get('after'), data.get('before')
+
+        if after is not None and before is not None:
+            raise serializers.ValidationError("Only one of 'after' and 'before' can be given.")
+        for field, neighbour in (('after', after), ('before', before)):
+            if neighbour is None:
+                continue
+            if neighbour.pk == task.pk:
+                raise serializers.ValidationError({field: 'A task cannot be moved next to itself.'})
+            if neighbour.board_id != task.board_id or neighbour.status != status:
+                raise serializers.ValidationError({field: 'The task must be in the target column of the same board.'})
+        return data
+
+
+class TaskSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Full task serializer including board relation,
     user info for assignees and reviewers, and comment count.
@@ -203,10 +316,22 @@ class TaskSerializer(serializers.ModelSerializer):
 
     def get_comments_count(self, obj):
         """Returns the number of comments for a task."""
-        return obj.comments.count()
+        return comments_count(obj)
 
 
-class TaskDetailSerializer(serializers.ModelSerializer):
+class TaskSearchResultSerializer(TaskSerializer):
+    """
+    Serializer for search results: a task with the relevance score
+    and the highlighted matches of its title, description and comments.
+    """
+    score = serializers.FloatField(read_only=True)
+    highlight = serializers.DictField(read_only=True)
+
+    class Meta(TaskSerializer.Meta):
+        fields = TaskSerializer.Meta.fields + ['score', 'highlight']
+
+
+class TaskDetailSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Detailed serializer for a single task
     with assignees and reviewers as nested user data.
@@ -222,7 +347,7 @@ class TaskDetailSerializer(serializers.ModelSerializer):
         ]
 
 
-class CommentCreateSerializer(serializers.ModelSerializer):
+class CommentCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for creating comments with only the content field.
     """
@@ -232,7 +357,7 @@ class CommentCreateSerializer(serializers.ModelSerializer):
         fields = ['content']
 
 
-class CommentResponseSerializer(serializers.ModelSerializer):
+class CommentResponseSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for returning comments with author's username.
     """
@@ -245,3 +370,13 @@ class CommentResponseSerializer(serializers.ModelSerializer):
     
     def get_author(self, obj):
      return f"{obj.author.first_name} {obj.author.last_name}".strip()
+
+
+class CommentChangeSerializer(CommentResponseSerializer):
+    """
+    Serializer for changed comments in a delta sync response,
+    including the task the comment belongs to.
+    """
+
+    class Meta(CommentResponseSerializer.Meta):
+        fields = CommentResponseSerializer.Meta.fields + ['task']
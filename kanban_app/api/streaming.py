@@ -0,0 +1,108 @@
+from itertools import islice
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+
+# Number of rows fetched from the database and rendered at a time.
+CHUNK_SIZE = getattr(settings, 'STREAMING_CHUNK_SIZE', 500)
+
+# Boards with at least this many tasks are streamed by the board detail.
+MIN_STREAMED_TASKS = getattr(settings, 'STREAMING_MIN_BOARD_TASKS', 1000)
+
+
+def stream_list(request, queryset, serializer, chunk_size=CHUNK_SIZE):
+    """
+    Returns a response with the rows of the queryset rendered by the
+    serializer (an instance with many=True, or a FastSerializer for
+    .values() rows) as a JSON array, rendered and sent chunk by chunk
+    while the rows are read from the database. The body is the same as
+    that of a DRF JSON response.
+
+    Requests served through core/asgi.py get an async stream; under WSGI
+    (runserver, core/wsgi.py) the rows are read by a sync iterator while
+    the server sends the response, as WSGI cannot consume async streams
+    without buffering them.
+    """
+    serializer = getattr(serializer, 'child', serializer)
+    if is_asgi(request):
+        return _response(_aarray(queryset, serializer, chunk_size))
+    return _response(_array(queryset, serializer, chunk_size))
+
+
+def stream_object(request, serializer, field_name, queryset, child=None, chunk_size=CHUNK_SIZE):
+    """
+    Returns a response with the object of the serializer, whose nested
+    list field 'field_name' (the last field) is streamed from the
+    queryset instead of being loaded up front. The rows are serialized
+    by 'child' if given (e.g. a FastSerializer), else by the field.
+    Streamed like stream_list().
+    """
+    field = serializer.fields[field_name]
+    child = child or field.child
+    if list(serializer.fields)[-1] != field_name:
+        raise ValueError(f"'{field_name}' must be the last field of {type(serializer).__name__}.")
+    del serializer.fields[field_name]
+
+    def head():
+        rendered = JSONRenderer().render(serializer.data)
+        key = JSONRenderer().render(field_name)
+        return rendered[:-1] + (b',' if len(rendered) > 2 else b'') + key + b':'
+
+    def content():
+        yield head()
+        yield from _array(queryset, child, chunk_size)
+        yield b'}'
+
+    async def acontent():
+        yield head()
+        async for chunk in _aarray(queryset, child, chunk_size):
+            yield chunk
+        yield b'}'
+
+    return _response(acontent() if is_asgi(request) else content())
+
+
+def is_asgi(request):
+    """Returns True if the (Django or DRF) request is served by an ASGI server."""
+    return isinstance(getattr(request, '_request', request), ASGIRequest)
+
+
+def _array(queryset, serializer, chunk_size):
+    """
+    Yields a JSON array of the queryset rows in chunks of chunk_size rows,
+    so only one chunk of rows is held in memory at a time.
+    """
+    rows = queryset.iterator(chunk_size=chunk_size)
+    separator = b'['
+    while chunk := list(islice(rows, chunk_size)):
+        yield separator + _render(serializer, chunk)
+        separator = b','
+    yield b']' if separator == b',' else b'[]'
+
+
+async def _aarray(queryset, serializer, chunk_size):
+    """Async version of _array()."""
+    separator = b'['
+    chunk = []
+    async for row in queryset.aiterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield separator + _render(serializer, chunk)
+            separator = b','
+            chunk = []
+    if chunk:
+        yield separator + _render(serializer, chunk)
+        separator = b','
+    yield b']' if separator == b',' else b'[]'
+
+
+def _render(serializer, rows):
+    """Returns the rows rendered as JSON, separated by commas."""
+    renderer = JSONRenderer()
+    return b','.join(renderer.render(serializer.to_representation(row)) for row in rows)
+
+
+def _response(content):
+    return StreamingHttpResponse(content, content_type='application/json')
@@ -1,16 +1,26 @@
 from django.urls import path
-from .views import BoardsView,BoardsDetailView,EmailCheckView,TaskView,TasksDetailView,TaskCommentsListCreateView,TasksAssignedToMeView,TasksReviewingView,TaskCommentDeleteView
+from .async_views import AsyncBoardsView,AsyncBoardsDetailView,AsyncTasksAssignedToMeView,AsyncTasksReviewingView,AsyncTaskCommentsListView
+from .event_stream import board_events
+from .views import EmailCheckView,TaskView,TasksDetailView,TaskCommentDeleteView,TaskBulkView,TaskMoveView,BoardChangesView,BoardEventTicketView,BoardExportView,BoardImportView,TaskSearchView
 
 
 urlpatterns = [
-    path('boards/',BoardsView.as_view()),
-    path('boards/<int:pk>/', BoardsDetailView.as_view()),
+    path('boards/',AsyncBoardsView.as_view()),
+    path('boards/import/', BoardImportView.as_view()),
+    path('boards/<int:pk>/', AsyncBoardsDetailView.as_view()),
+    path('boards/<int:pk>/changes/', BoardChangesView.as_view()),
+    path('boards/<int:pk>/events/', board_events),
+    path('boards/<int:pk>/events/ticket/', BoardEventTicketView.as_view()),
+    path('boards/<int:pk>/export/', BoardExportView.as_view()),
     path('email-check/', EmailCheckView.as_view()),
-    path('tasks/assigned-to-me/', TasksAssignedToMeView.as_view()),
-    path('tasks/reviewing/', TasksReviewingView.as_view()),
+    path('tasks/assigned-to-me/', AsyncTasksAssignedToMeView.as_view()),
+    path('tasks/reviewing/', AsyncTasksReviewingView.as_view()),
     path('tasks/', TaskView.as_view()),
+    path('tasks/bulk/', TaskBulkView.as_view()),
+    path('tasks/search/', TaskSearchView.as_view()),
     path('tasks/<int:pk>/',TasksDetailView.as_view()),
-    path('tasks/<int:pk>/comments/', TaskCommentsListCreateView.as_view()),
+    path('tasks/<int:pk>/move/', TaskMoveView.as_view()),
+    path('tasks/<int:pk>/comments/', AsyncTaskCommentsListView.as_view()),
     path('tasks/<int:pk>/comments/<int:comment_pk>/', TaskCommentDeleteView.as_view()),
 
 ]
@@ -1,18 +1,34 @@
-from django.http import Http404
+from django.conf import settings
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+from django.http import Http404, StreamingHttpResponse
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from .serializer import BoardSerializer,BoardCreateSerializer,BoardDetailSerializer,BoardUpdateSerializer,TaskCreateSerializer,TaskSerializer,TaskDetailSerializer,CommentCreateSerializer,CommentResponseSerializer
-from kanban_app.models import Board,Task,Comment
+from .serializer import BoardSerializer,BoardCreateSerializer,BoardDetailSerializer,BoardUpdateSerializer,TaskCreateSerializer,TaskSerializer,TaskDetailSerializer,CommentCreateSerializer,CommentResponseSerializer,TaskBulkItemSerializer,TaskMoveSerializer,TaskChangeSerializer,CommentChangeSerializer,TaskSearchResultSerializer
+from kanban_app.models import Board,Task,Comment,board_detail_lookups
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework import generics, status
 from django.contrib.auth.models import User
+from auth_app.api.serializers import UserSerializer
+from auth_app.backends import users_by_email
 from rest_framework.permissions import IsAuthenticated
 from django.core.validators import EmailValidator
 from rest_framework.exceptions import ValidationError
 from .permissions import IsBoardMemberOrOwner,IsBoardMember,IsTaskCreatorOrBoardOwner,IsBoardMemberForTask,IsCommentAuthor
 from rest_framework.exceptions import PermissionDenied,NotFound
+from .filters import filter_tasks
+from .event_stream import issue_ticket, ticket_ttl
+from .pagination import CommentKeysetPagination, TaskKeysetPagination
+from kanban_app.changelog import CursorExpired, get_changes, latest_cursor
+from kanban_app.membership import get_board_access
+from kanban_app.ranking import assign_ranks, move_task
+from kanban_app.response_cache import ResponseCache
+from kanban_app.search import search_tasks
+from kanban_app.signals import apply_saved_tasks, remember_task_state
+from kanban_app.transfer import ExportTooLarge, InvalidExport, export_board, import_board, limit_size
+from kanban_app.versioning import board_version, conditional_get, user_version
 
 
 
@@ -25,8 +41,7 @@ class BoardsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, format=None):
-        boards = Board.objects.filter(members=request.user) | Board.objects.filter(owner=request.user)
-        boards = boards.distinct()
+        boards = Board.objects.for_user(request.user).with_stats()
         serializer = BoardSerializer(boards, many=True)
         return Response(serializer.data)
 
@@ -34,6 +49,7 @@ class BoardsView(APIView):
         serializer = BoardCreateSerializer(data=request.data)
         if serializer.is_valid():
             board = serializer.save(owner=request.user)
+            board = Board.objects.with_stats().get(pk=board.pk)
             response_serializer = BoardSerializer(board)
             return Response(response_serializer.data, status=status.HTTP_201_CREATED)
         else:
@@ -56,8 +72,13 @@ class BoardsDetailView(generics.GenericAPIView):
 
     def get(self, request, *args, **kwargs):
         board = self.get_object()
-        serializer = BoardDetailSerializer(board)
-        return Response(serializer.data)
+
+        def build_response():
+            prefetch_related_objects([board], *board_detail_lookups())
+            serializer = BoardDetailSerializer(board)
+            return Response(serializer.data)
+
+        return conditional_get(request, [board_version(board.pk)], build_response)
 
     def patch(self, request, *args, **kwargs):
         board = self.get_object()
@@ -75,6 +96,118 @@ class BoardsDetailView(generics.GenericAPIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+class BoardChangesView(generics.GenericAPIView):
+    """
+    API view for syncing a board incrementally (GET).
+    Returns the changes since the cursor given as 'since': changed
+    board, tasks, comments and members and the IDs of deleted ones.
+    Without 'since' only the current cursor is returned; clients load
+    it before the full board and then follow the returned cursors.
+    If the changes after the cursor were compacted, 410 Gone is
+    returned and the board has to be loaded in full again.
+    Recent changes can be returned again by the next request, as the
+    cursor only moves past them after BOARD_CHANGES_SAFETY_SECONDS.
+    """
+    queryset = Board.objects.all()
+    permission_classes = [IsAuthenticated, IsBoardMemberOrOwner]
+
+    def get(self, request, *args, **kwargs):
+        board = self.get_object()
+
+        since = request.query_params.get('since')
+        if since is None:
+            return Response({'cursor': latest_cursor()})
+        if not since.isdigit():
+            return Response({'error': "'since' must be a cursor."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            changes = get_changes(board, int(since))
+        except CursorExpired:
+            return Response(
+                {'error': 'The changes since this cursor are no longer available. Load the full board.',
+                 'cursor': latest_cursor()},
+                status=status.HTTP_410_GONE
+            )
+
+        return Response({
+            'cursor': changes['cursor'],
+            'has_more': changes['has_more'],
+            'board': {'id': board.id, 'title': board.title, 'owner_id': board.owner_id} if changes['board'] else None,
+            'tasks': TaskChangeSerializer(changes['tasks'], many=True).data,
+            'comments': CommentChangeSerializer(changes['comments'], many=True).data,
+            'members': UserSerializer(changes['members'], many=True).data,
+            'deleted': changes['deleted'],
+        })
+
+
+class BoardEventTicketView(generics.GenericAPIView):
+    """
+    API view issuing a ticket for the event stream of a board (POST).
+    EventSource cannot send the token, so browsers open the stream as
+    /api/boards/<id>/events/?ticket=<ticket>; a ticket is valid for one
+    connection within BOARD_EVENTS_TICKET_TTL seconds.
+    Access rights: Only board owners or members.
+    """
+    queryset = Board.objects.all()
+    permission_classes = [IsAuthenticated, IsBoardMemberOrOwner]
+
+    def post(self, request, *args, **kwargs):
+        board = self.get_object()
+        return Response(
+            {'ticket': issue_ticket(request.user.id, board.pk), 'expires_in': ticket_ttl()},
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class BoardExportView(generics.GenericAPIView):
+    """
+    API view for exporting a board (GET) with its members, tasks and
+    comments as NDJSON, streamed while it is read from the database.
+    Access rights: Only board owners or members.
+    """
+    queryset = Board.objects.all()
+    permission_classes = [IsAuthenticated, IsBoardMemberOrOwner]
+
+    def get(self, request, *args, **kwargs):
+        board = self.get_object()
+        response = StreamingHttpResponse(export_board(board), content_type='application/x-ndjson')
+        response['Content-Disposition'] = f'attachment; filename="board-{board.pk}.ndjson"'
+        return response
+
+
+class BoardImportView(APIView):
+    """
+    API view for importing a board exported by BoardExportView (POST).
+    The NDJSON export is sent as request body and read line by line, up
+    to BOARD_IMPORT_MAX_BYTES; a new board owned by the current user is
+    created in one transaction. Members, assignees and reviewers are
+    matched by email and have to be members of the new board; tasks and
+    comments are credited to the current user at the time of the import.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, format=None):
+        if request.stream is None:
+            return Response({"error": "The request body must contain an NDJSON export."}, status=status.HTTP_400_BAD_REQUEST)
+
+        max_bytes = settings.BOARD_IMPORT_MAX_BYTES
+        too_large = Response(
+            {"error": f"The export is larger than {max_bytes} bytes."}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+        try:
+            if int(request.META.get('CONTENT_LENGTH') or 0) > max_bytes:
+                return too_large
+        except ValueError:
+            pass
+        try:
+            result = import_board(limit_size(request.stream, max_bytes), owner=request.user, trusted=False)
+        except ExportTooLarge:
+            return too_large
+        except InvalidExport as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_201_CREATED)
+
+
 class EmailCheckView(APIView):
     """
     API view to check if a given email address exists and is valid.
@@ -94,7 +227,7 @@ class EmailCheckView(APIView):
             return Response({'error': 'Invalid email format.'}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            user = User.objects.get(email=email)
+            user = users_by_email(email).get()
         except User.DoesNotExist:
             return Response({'detail': 'Email not found.'}, status=status.HTTP_404_NOT_FOUND)
         except Exception:
@@ -121,16 +254,15 @@ class TaskView(APIView):
             )
 
        
-        try:
-            board = Board.objects.get(pk=board_id)
-        except Board.DoesNotExist:
+        access = get_board_access(board_id, request)
+        if access is None:
             return Response(
                 {"detail": "404: Board nicht gefunden. Die angegebene Board-ID existiert nicht."},
                 status=status.HTTP_404_NOT_FOUND
             )
 
        
-        if request.user not in board.members.all():
+        if not access.is_member(request.user.id):
             raise PermissionDenied("403: Du bist kein Mitglied dieses Boards.")
 
        
@@ -145,6 +277,143 @@ class TaskView(APIView):
    
 
 
+class TaskBulkView(APIView):
+    """
+    API view for creating (POST) and updating (PATCH) many tasks at once.
+    Expects a list of tasks in the format of TaskBulkItemSerializer; for
+    PATCH every item needs the 'id' of the task and only the given fields
+    are changed. Either all items are saved in one transaction or none,
+    in which case a list with the errors of every item is returned.
+    """
+    permission_classes = [IsAuthenticated]
+    batch_size = 500
+
+    def post(self, request, format=None):
+        error = self.check_size(request.data)
+        if error:
+            return error
+
+        serializer = TaskBulkItemSerializer(data=request.data, many=True, context={'request': request})
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        tasks = [
+            Task(
+                board_id=item['board'],
+                title=item['title'],
+                description=item['description'],
+                priority=item['priority'],
+                status=item['status'],
+                due_date=item['due_date'],
+                assignee_id=item['assignee_id'],
+                reviewer_id=item['reviewer_id'],
+                owner=request.user,
+            )
+            for item in serializer.validated_data
+        ]
+        with transaction.atomic():
+            assign_ranks(tasks)
+            tasks = Task.objects.bulk_create(tasks, batch_size=self.batch_size)
+            apply_saved_tasks(tasks, created=True)
+
+        return Response(self.serialize(tasks), status=status.HTTP_201_CREATED)
+
+    def patch(self, request, format=None):
+        error = self.check_size(request.data)
+        if error:
+            return error
+
+        ids = self.get_ids(request.data)
+        if len(ids) != len(set(ids)):
+            return Response({"error": "Every task may only be updated once per request."}, status=status.HTTP_400_BAD_REQUEST)
+
+        tasks = Task.objects.in_bulk(ids)
+        serializer = TaskBulkItemSerializer(
+            data=request.data, many=True, partial=True,
+            context={'request': request, 'tasks': tasks},
+        )
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        changed_tasks, moved_tasks, fields = [], [], set()
+        for item in serializer.validated_data:
+            task = tasks[item.pop('id')]
+            item.pop('board', None)
+            if item.get('status', task.status) != task.status:
+                moved_tasks.append(task)
+            for attr, value in item.items():
+                setattr(task, attr, value)
+            changed_tasks.append(task)
+            fields.update(item)
+
+        with transaction.atomic():
+            if moved_tasks:
+                assign_ranks(moved_tasks)
+                fields.add('rank')
+            if fields:
+                Task.objects.bulk_update(changed_tasks, fields, batch_size=self.batch_size)
+            apply_saved_tasks(changed_tasks)
+            for task in changed_tasks:
+                remember_task_state(task)
+
+        return Response(self.serialize(changed_tasks))
+
+    def check_size(self, data):
+        """Returns an error response if the request contains too many items."""
+        max_items = getattr(settings, 'TASK_BULK_MAX_ITEMS', 5000)
+        if isinstance(data, list) and len(data) > max_items:
+            return Response(
+                {"error": f"A bulk request may contain at most {max_items} tasks."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return None
+
+    def get_ids(self, data):
+        """Returns the valid task IDs of the items of a PATCH request."""
+        if not isinstance(data, list):
+            return []
+        ids = []
+        for item in data:
+            try:
+                ids.append(int(item['id']))
+            except (TypeError, KeyError, ValueError):
+                continue
+        return ids
+
+    def serialize(self, tasks):
+        """
+        Returns the saved tasks in the format of TaskSerializer,
+        loaded with users and comment counts in one query.
+        """
+        tasks = Task.objects.filter(id__in=[task.id for task in tasks]).with_users().with_comment_count().order_by('id')
+        return TaskSerializer(tasks, many=True).data
+
+
+class TaskSearchView(APIView):
+    """
+    API view for searching tasks by text (GET /api/tasks/search/?q=).
+    Searches title, description and comments of the tasks on all boards
+    the user owns or is a member of, best matches first, with the matches
+    highlighted. 'limit' sets the number of results (default 20, max. 100).
+    """
+    permission_classes = [IsAuthenticated]
+    default_limit = 20
+    max_limit = 100
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'error': 'Search query is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        limit = request.query_params.get('limit', str(self.default_limit))
+        if not limit.isdigit() or int(limit) == 0:
+            return Response({'error': 'Limit must be a positive number.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        tasks = search_tasks(request.user, query, min(int(limit), self.max_limit))
+        serializer = TaskSearchResultSerializer(tasks, many=True)
+        return Response(serializer.data)
+
+
 class TasksDetailView(generics.GenericAPIView):
     """
     API view for retrieving details, updating (PATCH), and deleting tasks.
@@ -158,7 +427,7 @@ class TasksDetailView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated, IsBoardMember, IsTaskCreatorOrBoardOwner]
 
     def get_object(self):
-        task = generics.get_object_or_404(Task, pk=self.kwargs['pk'])
+        task = generics.get_object_or_404(Task.objects.select_related('board'), pk=self.kwargs['pk'])
         self.check_object_permissions(self.request, task.board)
         return task
 
@@ -171,17 +440,17 @@ class TasksDetailView(generics.GenericAPIView):
         task = self.get_object()
         data = request.data.copy()
 
-        if "board" in data and data["board"] != str(task.board.id):
+        if "board" in data and data["board"] != str(task.board_id):
             return Response({"error": "The board of a task cannot be changed."}, status=status.HTTP_400_BAD_REQUEST)
 
-        board_members = list(task.board.members.all()) + [task.board.owner]
+        access = get_board_access(task.board_id, request)
         assignee_id = data.get("assignee_id")
         reviewer_id = data.get("reviewer_id")
 
-        if assignee_id and not any(user.id == int(assignee_id) for user in board_members):
+        if assignee_id and not access.is_member_or_owner(int(assignee_id)):
             return Response({"error": "Assignee must be a member of the board."}, status=status.HTTP_400_BAD_REQUEST)
 
-        if reviewer_id and not any(user.id == int(reviewer_id) for user in board_members):
+        if reviewer_id and not access.is_member_or_owner(int(reviewer_id)):
             return Response({"error": "Reviewer must be a member of the board."}, status=status.HTTP_400_BAD_REQUEST)
 
         serializer = TaskCreateSerializer(task, data=data, partial=True)
@@ -197,14 +466,35 @@ class TasksDetailView(generics.GenericAPIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+class TaskMoveView(TasksDetailView):
+    """
+    API view for moving a task within its board (PATCH), optionally to
+    another status column, by writing only the rank of the moved task.
+    Access permissions are the same as for changing the task.
+    """
+    http_method_names = ['patch', 'options']
+
+    def patch(self, request, *args, **kwargs):
+        task = self.get_object()
+        serializer = TaskMoveSerializer(data=request.data, context={'task': task})
+        if serializer.is_valid():
+            move_task(task, **serializer.validated_data)
+            return Response(TaskDetailSerializer(task).data)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
 class TaskCommentsListCreateView(generics.GenericAPIView):
     """
     API view for listing and creating comments on a task.
     Access permission: Only board members of the respective task.
+    The list supports opt-in keyset pagination in both directions
+    (see CommentKeysetPagination); without it the first
+    'max_unpaginated' comments are returned.
     """
     permission_classes = [IsAuthenticated, IsBoardMemberForTask]
     serializer_class = CommentResponseSerializer
     queryset = Comment.objects.all()
+    pagination_class = CommentKeysetPagination
 
     def get_task(self, pk):
         task = generics.get_object_or_404(Task, pk=pk)
@@ -213,8 +503,15 @@ class TaskCommentsListCreateView(generics.GenericAPIView):
 
     def get(self, request, pk):
         task = self.get_task(pk)
-        comments = task.comments.order_by('created_at')
-        serializer = CommentResponseSerializer(comments, many=True)
+        comments = task.comments.select_related('author')
+
+        paginator = self.pagination_class()
+        if paginator.is_requested(request):
+            page = paginator.paginate_queryset(comments, request)
+            serializer = CommentResponseSerializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
+
+        serializer = CommentResponseSerializer(paginator.limit_unpaginated(comments.order_by('created_at', 'id')), many=True)
         return Response(serializer.data)
 
     def post(self, request, pk):
@@ -243,27 +540,54 @@ class TaskCommentDeleteView(generics.DestroyAPIView):
         return comment
 
 
-class TasksAssignedToMeView(APIView):
+class TaskListView(APIView):
     """
-    API view to retrieve all tasks assigned to the current user.
+    Base API view for the tasks of the current user in 'user_field'.
+    Supports the filters of filter_tasks() and opt-in keyset
+    pagination ordered by (due_date, id); unpaginated lists are bounded
+    (see KeysetPagination). Unchanged lists are answered with
+    '304 Not Modified' (see kanban_app.versioning), and the JSON bodies
+    of unchanged lists are served from 'response_cache'.
     """
     permission_classes = [IsAuthenticated]
+    pagination_class = TaskKeysetPagination
+    user_field = None
+    response_cache = None
+
+    def get_queryset(self):
+        return Task.objects.filter(**{self.user_field: self.request.user})
 
     def get(self, request):
-        user = request.user
-        tasks = Task.objects.filter(assignee=user)
-        serializer = TaskSerializer(tasks, many=True)
+        return conditional_get(
+            request, [user_version(request.user.id)], lambda: self.list(request),
+            response_cache=self.response_cache,
+        )
+
+    def list(self, request):
+        tasks = filter_tasks(self.get_queryset(), request.query_params)
+        tasks = tasks.with_users().with_comment_count()
+
+        paginator = self.pagination_class()
+        if paginator.is_requested(request):
+            page = paginator.paginate_queryset(tasks, request)
+            serializer = TaskSerializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
+
+        serializer = TaskSerializer(paginator.limit_unpaginated(tasks.in_column_order()), many=True)
         return Response(serializer.data)
 
 
-class TasksReviewingView(APIView):
+class TasksAssignedToMeView(TaskListView):
     """
-    API view to retrieve all tasks where the current user is a reviewer.
+    API view to retrieve all tasks assigned to the current user.
     """
-    permission_classes = [IsAuthenticated]
+    user_field = 'assignee'
+    response_cache = ResponseCache('assigned-to-me')
 
-    def get(self, request):
-        user = request.user
-        tasks = Task.objects.filter(reviewer=user)
-        serializer = TaskSerializer(tasks, many=True)
-        return Response(serializer.data)
+
+class TasksReviewingView(TaskListView):
+    """
+    API view to retrieve all tasks where the current user is a reviewer.
+    """
+    user_field = 'reviewer'
+    response_cache = ResponseCache('reviewing')
@@ -0,0 +1,213 @@
+import datetime
+import itertools
+import json
+import math
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import async_to_sync
+from django.db import connections
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+
+from kanban_app.changelog import latest_cursor
+from kanban_app.models import Board, Comment, Task
+from kanban_app.seeding import DEFAULT_PASSWORD
+from kanban_app.transfer import export_board
+
+
+class Endpoint:
+    """
+    One benchmarked request. 'path' and 'data' are either fixed or
+    functions of the BenchmarkContext, called before every request and
+    not timed, e.g. to create the task a DELETE request removes.
+    The request fails the benchmark if it does not return 'status',
+    needs more than 'max_queries' queries or its 95th percentile
+    latency is above 'max_ms' milliseconds.
+    Streamed responses are read completely unless 'consume' is False
+    (for endpoints that never end, like the event stream). Endpoints
+    with 'asgi' are sent through the ASGI handler instead of WSGI.
+    """
+
+    def __init__(self, method, path, status, max_queries, max_ms, data=None,
+                 content_type='application/json', authenticated=True, consume=True, asgi=False, name=None):
+        self.method = method
+        self.path = path
+        self.status = status
+        self.max_queries = max_queries
+        self.max_ms = max_ms
+        self.data = data
+        self.content_type = content_type
+        self.authenticated = authenticated
+        self.consume = consume
+        self.asgi = asgi
+        self.name = name or f'{method} {path if isinstance(path, str) else path.__name__}'
+
+    def prepare(self, context):
+        """Returns the path and the encoded body of the next request."""
+        path = self.path(context) if callable(self.path) else self.path
+        data = self.data(context) if callable(self.data) else self.data
+        if data is None:
+            return path, ''
+        if self.content_type == 'application/json':
+            data = json.dumps(data)
+        return path, data
+
+
+class BenchmarkContext:
+    """
+    The seeded objects the benchmarked requests refer to: the largest
+    board, its owner as the requesting user, and the task of this board
+    with the most comments. Creates fresh objects for destructive requests.
+    """
+
+    def __init__(self, data):
+        self.board = data['boards'][0]
+        self.user = self.board.owner
+        self.token = Token.objects.get_or_create(user=self.user)[0].key
+        self.members = list(self.board.members.order_by('id'))
+        self.task = next(task for task in data['tasks'] if task.board_id == self.board.id)
+        self.tasks = [task for task in data['tasks'] if task.board_id == self.board.id][:50]
+        self.cursor = latest_cursor()
+        self.export = ''.join(export_board(data['boards'][-1]))
+        self.counter = itertools.count()
+
+    def unique(self):
+        """Returns a number that is different for every call."""
+        return next(self.counter)
+
+    def task_data(self):
+        return {
+            'board': self.board.id,
+            'title': f'Benchmark task {self.unique()}',
+            'description': 'Created by the benchmark',
+            'status': 'to_do',
+            'priority': 'medium',
+            'due_date': (datetime.date.today() + datetime.timedelta(days=7)).isoformat(),
+            'assignee_id': self.members[0].id,
+            'reviewer_id': self.members[-1].id,
+        }
+
+    def new_task(self):
+        data = self.task_data()
+        return Task.objects.create(
+            board=self.board, title=data['title'], status='to_do', priority='medium', due_date=data['due_date'],
+            assignee_id=data['assignee_id'], reviewer_id=data['reviewer_id'], owner=self.user,
+        )
+
+    def new_board(self):
+        return Board.objects.create(title=f'Benchmark board {self.unique()}', owner=self.user)
+
+    def new_comment(self):
+        return Comment.objects.create(task=self.task, author=self.user, content='Benchmark comment')
+
+
+def get_endpoints():
+    """
+    Returns the benchmarked requests: every URL of kanban_app.api.urls
+    and auth_app.api.urls with each method it supports. The budgets
+    leave room above the numbers measured on SQLite; login and
+    registration are dominated by password hashing.
+    """
+    board = lambda c: f'/api/boards/{c.board.id}/'
+    task = lambda c: f'/api/tasks/{c.task.id}/'
+    comments = lambda c: f'/api/tasks/{c.task.id}/comments/'
+    return [
+        Endpoint('GET', '/api/boards/', 200, 2, 50),
+        Endpoint('POST', '/api/boards/', 201, 14, 100,
+                 data=lambda c: {'title': f'Board {c.unique()}', 'members': [user.id for user in c.members[:3]]}),
+        Endpoint('GET', board, 200, 4, 1000, name='GET /api/boards/<id>/'),
+        Endpoint('PATCH', board, 200, 10, 100, data=lambda c: {'title': f'Board {c.unique()}'},
+                 name='PATCH /api/boards/<id>/'),
+        Endpoint('DELETE', lambda c: f'/api/boards/{c.new_board().id}/', 204, 10, 100, name='DELETE /api/boards/<id>/'),
+        Endpoint('GET', lambda c: f'/api/boards/{c.board.id}/changes/?since={c.cursor}', 200, 4, 100,
+                 name='GET /api/boards/<id>/changes/'),
+        Endpoint('GET', lambda c: f'/api/boards/{c.board.id}/events/', 200, 1, 50, consume=False, asgi=True,
+                 name='GET /api/boards/<id>/events/'),
+        Endpoint('POST', lambda c: f'/api/boards/{c.board.id}/events/ticket/', 201, 2, 50,
+                 name='POST /api/boards/<id>/events/ticket/'),
+        Endpoint('GET', lambda c: f'/api/boards/{c.board.id}/export/', 200, 8, 2000,
+                 name='GET /api/boards/<id>/export/'),
+        Endpoint('POST', '/api/boards/import/', 201, 20, 1000, data=lambda c: c.export,
+                 content_type='application/x-ndjson'),
+        Endpoint('GET', lambda c: f'/api/email-check/?email={c.members[-1].email}', 200, 2, 50,
+                 name='GET /api/email-check/'),
+        Endpoint('GET', '/api/tasks/assigned-to-me/', 200, 2, 500),
+        Endpoint('GET', '/api/tasks/assigned-to-me/?page_size=50', 200, 2, 100),
+        Endpoint('GET', '/api/tasks/reviewing/', 200, 2, 500),
+        Endpoint('POST', '/api/tasks/', 201, 12, 100, data=lambda c: c.task_data()),
+        Endpoint('POST', '/api/tasks/bulk/', 201, 8, 500, data=lambda c: [c.task_data() for _ in range(50)]),
+        Endpoint('PATCH', '/api/tasks/bulk/', 200, 8, 500,
+                 data=lambda c: [{'id': task.id, 'priority': 'high' if c.unique() % 2 else 'low'} for task in c.tasks]),
+        Endpoint('GET', '/api/tasks/search/?q=login%20rev', 200, 4, 200),
+        Endpoint('GET', task, 200, 4, 50, name='GET /api/tasks/<id>/'),
+        Endpoint('PATCH', task, 200, 12, 100, data=lambda c: {'title': f'Task {c.unique()}'},
+                 name='PATCH /api/tasks/<id>/'),
+        Endpoint('DELETE', lambda c: f'/api/tasks/{c.new_task().id}/', 204, 8, 100, name='DELETE /api/tasks/<id>/'),
+        Endpoint('PATCH', lambda c: f'/api/tasks/{c.task.id}/move/', 200, 9, 100, data={'status': 'to_do'},
+                 name='PATCH /api/tasks/<id>/move/'),
+        Endpoint('GET', comments, 200, 3, 500, name='GET /api/tasks/<id>/comments/'),
+        Endpoint('GET', lambda c: f'/api/tasks/{c.task.id}/comments/?latest&page_size=50', 200, 3, 100,
+                 name='GET /api/tasks/<id>/comments/?latest'),
+        Endpoint('POST', comments, 201, 6, 100, data={'content': 'Benchmark comment'},
+                 name='POST /api/tasks/<id>/comments/'),
+        Endpoint('DELETE', lambda c: f'/api/tasks/{c.task.id}/comments/{c.new_comment().id}/', 204, 8, 100,
+                 name='DELETE /api/tasks/<id>/comments/<id>/'),
+        Endpoint('POST', '/api/registration/', 201, 6, 3000, authenticated=False,
+                 data=lambda c: {'fullname': 'Bench Mark', 'email': f'benchmark-{c.unique()}@example.com',
+                                 'password': DEFAULT_PASSWORD, 'repeated_password': DEFAULT_PASSWORD}),
+        Endpoint('POST', '/api/login/', 200, 2, 3000, authenticated=False,
+                 data=lambda c: {'email': c.user.email, 'password': DEFAULT_PASSWORD}),
+    ]
+
+
+def run(endpoint, context, iterations, warmup=2):
+    """
+    Sends the request of the endpoint 'warmup' times unmeasured (to fill
+    the caches) and 'iterations' times measured, in-process through the
+    full middleware stack. Returns the latencies in milliseconds, the
+    query counts and the unexpected status codes of the measured requests.
+    """
+    client = AsyncClient() if endpoint.asgi else Client()
+    send = async_to_sync(_send_asgi) if endpoint.asgi else _send_wsgi
+    headers = {'Authorization': f'Token {context.token}'} if endpoint.authenticated else {}
+    latencies, queries, errors = [], [], []
+    for i in range(warmup + iterations):
+        path, data = endpoint.prepare(context)
+        with ExitStack() as stack:
+            # Queries are counted on the primary and the replicas.
+            captured = [stack.enter_context(CaptureQueriesContext(connection)) for connection in connections.all()]
+            start = time.perf_counter()
+            response = send(client, endpoint, path, data, headers)
+            elapsed = time.perf_counter() - start
+        response.close()
+        if i < warmup:
+            continue
+        latencies.append(elapsed * 1000)
+        queries.append(sum(len(context) for context in captured))
+        if response.status_code != endpoint.status:
+            errors.append(response.status_code)
+    return latencies, queries, errors
+
+
+def _send_wsgi(client, endpoint, path, data, headers):
+    response = client.generic(endpoint.method, path, data, content_type=endpoint.content_type, headers=headers)
+    if response.streaming and endpoint.consume:
+        b''.join(response)
+    return response
+
+
+async def _send_asgi(client, endpoint, path, data, headers):
+    response = await client.generic(
+        endpoint.method, path, data, content_type=endpoint.content_type, headers=headers,
+    )
+    if response.streaming and endpoint.consume:
+        b''.join([chunk async for chunk in response.streaming_content])
+    return response
+
+
+def percentile(values, percent):
+    """Returns the percentile of the values by the nearest-rank method."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(percent / 100 * len(ordered)) - 1, 0)]
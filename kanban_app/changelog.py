@@ -0,0 +1,195 @@
+import datetime
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from kanban_app.events import change_event, publish_changes
+from kanban_app.models import Board, BoardChange, Comment, Task
+
+# Maximum number of log entries returned by one delta sync request.
+MAX_CHANGES = getattr(settings, 'BOARD_CHANGES_PAGE_SIZE', 1000)
+
+# Entries younger than this are returned, but cursors do not move past
+# them (see get_changes()).
+SAFETY_SECONDS = getattr(settings, 'BOARD_CHANGES_SAFETY_SECONDS', 30)
+
+
+class CursorExpired(Exception):
+    """
+    Raised if the entries after a cursor were already compacted,
+    so the client has to load the full board again.
+    """
+
+
+def record_changes(board_id, kind, object_ids, deleted=False):
+    """Appends one entry per object to the change log of a board."""
+    _record(
+        BoardChange(board_id=board_id, kind=kind, object_id=object_id, deleted=deleted)
+        for object_id in object_ids
+    )
+
+
+def record_comment_change(board_id, comment_id, task_id, deleted=False):
+    """
+    Appends a changed or deleted comment and an upsert of its task,
+    whose comment count changed, with a single insert.
+    """
+    _record([
+        BoardChange(board_id=board_id, kind='comment', object_id=comment_id, deleted=deleted),
+        BoardChange(board_id=board_id, kind='task', object_id=task_id),
+    ])
+
+
+def record_task_changes(tasks):
+    """Appends upserts of the given (bulk written) tasks to the log."""
+    _record(BoardChange(board_id=task.board_id, kind='task', object_id=task.pk) for task in tasks)
+
+
+def record_member_changes(user, deleted=False):
+    """
+    Appends a change of the user to the log of every board the user
+    is a member of, e.g. on removal or a changed name.
+    """
+    board_ids = Board.members.through.objects.filter(user=user).values_list('board_id', flat=True)
+    _record(
+        BoardChange(board_id=board_id, kind='member', object_id=user.pk, deleted=deleted)
+        for board_id in board_ids
+    )
+
+
+def _record(changes):
+    """
+    Writes the log entries and publishes them as realtime events
+    (see kanban_app.events) once the transaction has committed.
+    """
+    changes = BoardChange.objects.bulk_create(changes, batch_size=1000)
+    if changes:
+        transaction.on_commit(lambda: publish_changes(changes))
+
+
+def latest_cursor():
+    """
+    Returns the cursor of the latest change of all boards that is older
+    than SAFETY_SECONDS (see get_changes()).
+    """
+    cursor = (
+        BoardChange.objects.filter(created_at__lt=_safety_cutoff()).order_by('-id')
+        .values_list('id', flat=True).first()
+    )
+    if cursor is None:
+        # Only recent entries: the cursor before the oldest of them.
+        oldest = BoardChange.objects.aggregate(cursor=Min('id'))['cursor']
+        cursor = oldest - 1 if oldest else 0
+    return cursor
+
+
+def get_changes(board, since, limit=MAX_CHANGES):
+    """
+    Returns the changes of a board after the cursor 'since':
+    the current state of changed objects and the IDs of deleted ones.
+    Several changes of the same object are returned once.
+    Raises CursorExpired if entries after the cursor were compacted.
+
+    IDs are assigned on insert, not on commit, so on PostgreSQL an entry
+    with a smaller ID can become visible after a larger one. The returned
+    cursor therefore stops before the first entry younger than
+    SAFETY_SECONDS: such entries are returned again by the next request,
+    until no transaction started before them can still be in flight.
+    """
+    check_cursor(since)
+
+    entries = list(
+        BoardChange.objects.filter(board=board, id__gt=since).order_by('id')
+        .values_list('id', 'kind', 'object_id', 'deleted', 'created_at')[:limit + 1]
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    cutoff = _safety_cutoff()
+    cursor, held_back = max(since, 0), False
+    latest = {}
+    for entry_id, kind, object_id, deleted, created_at in entries:
+        latest[(kind, object_id)] = deleted
+        held_back = held_back or created_at >= cutoff
+        if not held_back:
+            cursor = entry_id
+    changed = {kind: set() for kind in BoardChange.KIND_CHOICES}
+    deleted = {kind: set() for kind in BoardChange.KIND_CHOICES}
+    for (kind, object_id), is_deleted in latest.items():
+        (deleted if is_deleted else changed)[kind].add(object_id)
+
+    tasks = list(
+        Task.objects.filter(board=board, id__in=changed['task']).with_users().with_comment_count().order_by('id')
+    )
+    comments = list(
+        Comment.objects.filter(task__board=board, id__in=changed['comment']).select_related('author').order_by('id')
+    )
+    members = list(board.members.filter(id__in=changed['member']).order_by('id'))
+
+    # Objects that were changed and deleted later without a log entry
+    # (e.g. deleted together with their task) are reported as deleted.
+    deleted['task'] |= changed['task'] - {task.id for task in tasks}
+    deleted['comment'] |= changed['comment'] - {comment.id for comment in comments}
+    deleted['member'] |= changed['member'] - {member.id for member in members}
+
+    return {
+        'cursor': cursor,
+        # A held back cursor would return the same page again.
+        'has_more': has_more and not held_back,
+        'board': board if changed['board'] else None,
+        'tasks': tasks,
+        'comments': comments,
+        'members': members,
+        'deleted': {
+            'tasks': sorted(deleted['task']),
+            'comments': sorted(deleted['comment']),
+            'members': sorted(deleted['member']),
+        },
+    }
+
+
+def change_events(board_id, since, limit=MAX_CHANGES):
+    """
+    Returns the log entries of a board after the cursor 'since' as
+    events (see kanban_app.events.change_event()), oldest first. At most
+    limit + 1 entries are returned, so callers can tell if there are more.
+    Raises CursorExpired if entries after the cursor were compacted.
+    """
+    check_cursor(since)
+    changes = (
+        BoardChange.objects.filter(board_id=board_id, id__gt=since).order_by('id')
+        .only('id', 'board_id', 'kind', 'object_id', 'deleted')[:limit + 1]
+    )
+    return [change_event(change) for change in changes]
+
+
+def check_cursor(since):
+    """Raises CursorExpired if entries after the cursor were compacted."""
+    oldest = BoardChange.objects.aggregate(cursor=Min('id'))['cursor']
+    if oldest is not None and since < oldest - 1:
+        raise CursorExpired
+
+
+def compact(before):
+    """
+    Deletes the log entries created before the given time and those of
+    deleted boards. The newest entry is always kept, since the oldest
+    remaining entry marks which cursors can still be synced.
+    Returns the number of deleted entries.
+    """
+    newest = BoardChange.objects.aggregate(cursor=Max('id'))['cursor'] or 0
+    deleted, _ = BoardChange.objects.filter(created_at__lt=before, id__lt=newest).delete()
+    orphans, _ = BoardChange.objects.exclude(board_id__in=Board.objects.values('id')).filter(id__lt=newest).delete()
+    return deleted + orphans
+
+
+def _safety_cutoff():
+    return timezone.now() - datetime.timedelta(seconds=SAFETY_SECONDS)
+
+
+def member_user_ids(board):
+    """Returns the IDs of the current members of a board."""
+    return list(User.objects.filter(member_boards=board).values_list('id', flat=True))
@@ -0,0 +1,123 @@
+import asyncio
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class Subscription:
+    """
+    Subscription of one client connection to the events of a board.
+    Events are put into a bounded queue on the subscriber's event loop;
+    if the client cannot keep up, the subscription is marked as
+    overflowed and the stream tells the client to resync.
+    """
+
+    def __init__(self, board_id, maxsize):
+        self.board_id = board_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def deliver(self, event):
+        """Puts an event into the queue. Must run on the subscriber's loop."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout):
+        """Returns the next event, or None if none arrived within the timeout."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class InMemoryBroker:
+    """
+    Fan-out of board events to the subscribers in this process.
+    Publishing is thread-safe and can be called from sync code
+    (e.g. signal handlers in a sync view); events are handed to the
+    event loop of each subscriber. With several processes a broker
+    backed by a shared message bus has to be configured instead.
+    """
+
+    def __init__(self, queue_size=None):
+        self.queue_size = queue_size or getattr(settings, 'BOARD_EVENTS_QUEUE_SIZE', 100)
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, board_id):
+        """Registers a new subscription. Must be called on an event loop."""
+        subscription = Subscription(board_id, self.queue_size)
+        with self._lock:
+            self._subscriptions.setdefault(board_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.board_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.board_id]
+
+    def publish(self, board_id, events):
+        """Delivers the events to all subscribers of the board."""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(board_id, ()))
+        for subscription in subscriptions:
+            for event in events:
+                try:
+                    subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+                except RuntimeError:
+                    # The subscriber's loop is closed; it unsubscribes on its own.
+                    break
+
+    def subscriber_count(self, board_id=None):
+        with self._lock:
+            if board_id is not None:
+                return len(self._subscriptions.get(board_id, ()))
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """
+    Returns the broker configured by BOARD_EVENTS_BROKER (dotted path,
+    default kanban_app.events.InMemoryBroker), created once per process.
+    """
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                path = getattr(settings, 'BOARD_EVENTS_BROKER', 'kanban_app.events.InMemoryBroker')
+                _broker = import_string(path)()
+    return _broker
+
+
+def change_event(change):
+    """Returns the event of a logged BoardChange entry."""
+    return {
+        'cursor': change.id,
+        'kind': change.kind,
+        'id': change.object_id,
+        'deleted': change.deleted,
+    }
+
+
+def publish_changes(changes):
+    """
+    Publishes logged BoardChange entries as events of their boards.
+    Called after the transaction that wrote them has committed.
+    """
+    by_board = {}
+    for change in changes:
+        by_board.setdefault(change.board_id, []).append(change_event(change))
+    broker = get_broker()
+    for board_id, events in by_board.items():
+        broker.publish(board_id, events)
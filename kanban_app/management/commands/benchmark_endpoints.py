@@ -0,0 +1,97 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings, setup_databases, teardown_databases
+
+from kanban_app.benchmark import BenchmarkContext, get_endpoints, percentile, run
+from kanban_app.seeding import seed
+
+
+class Command(BaseCommand):
+    """
+    Benchmarks every API endpoint in-process: creates a separate test
+    database, seeds it (see kanban_app.seeding), sends each request a
+    number of times through the full middleware stack and reports the
+    latency percentiles and query counts. Fails if an endpoint returns
+    an unexpected status or exceeds its query or latency budget (see
+    kanban_app.benchmark.get_endpoints). The test database is dropped
+    afterwards and a private in-memory cache is used, so neither the
+    data nor the shared cache are touched.
+    """
+    help = 'Benchmarks all API endpoints against query and latency budgets.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200, help='Number of seeded users.')
+        parser.add_argument('--boards', type=int, default=40, help='Number of seeded boards.')
+        parser.add_argument('--tasks', type=int, default=20000, help='Number of seeded tasks.')
+        parser.add_argument('--comments', type=int, default=40000, help='Number of seeded comments.')
+        parser.add_argument('--skew', type=float, default=1.0, help='Skew of the seeded data (see seed_data).')
+        parser.add_argument('--iterations', type=int, default=20, help='Measured requests per endpoint.')
+        parser.add_argument(
+            '--latency-factor', type=float, default=1.0,
+            help='Multiplies the latency budgets, e.g. for slower machines; 0 disables them.',
+        )
+        parser.add_argument('--only', help='Only benchmark endpoints whose name contains this text.')
+
+    def handle(self, *args, **options):
+        endpoints = [endpoint for endpoint in get_endpoints() if not options['only'] or options['only'] in endpoint.name]
+        if not endpoints:
+            raise CommandError(f"No endpoint matches {options['only']!r}.")
+        if options['iterations'] < 1:
+            raise CommandError('At least one iteration is needed.')
+
+        # Empty caches of this process stand in for the shared ones.
+        caches = {
+            alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'benchmark-{alias}'}
+            for alias in settings.CACHES
+        }
+        # The slow request log would repeat what the benchmark reports,
+        # and the login throttles would reject the repeated requests.
+        metrics = {**getattr(settings, 'REQUEST_METRICS', {}), 'SLOW_REQUEST_MS': float('inf')}
+        # Replicas mirror the test database (see core.database.replica_settings).
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            with override_settings(
+                CACHES=caches, ALLOWED_HOSTS=['testserver'], REQUEST_METRICS=metrics, AUTH_THROTTLES={},
+            ):
+                failures = self.benchmark(endpoints, options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+        if failures:
+            raise CommandError(f"{len(failures)} endpoints over budget: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS(f'All {len(endpoints)} endpoints are within their budgets.'))
+
+    def benchmark(self, endpoints, options):
+        """Seeds the test database, runs the endpoints and returns the names of the failed ones."""
+        data = seed(
+            users=options['users'], boards=options['boards'], tasks=options['tasks'],
+            comments=options['comments'], skew=options['skew'],
+        )
+        context = BenchmarkContext(data)
+        self.stdout.write(
+            f"Seeded {options['users']} users, {options['boards']} boards, {options['tasks']} tasks and "
+            f"{options['comments']} comments; the largest board has {context.board.tasks.count()} tasks."
+        )
+        self.stdout.write(f"{'':4} {'endpoint':42} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'queries':>8}")
+
+        failures = []
+        for endpoint in endpoints:
+            latencies, queries, errors = run(endpoint, context, options['iterations'])
+            p95 = percentile(latencies, 95)
+            max_ms = endpoint.max_ms * options['latency_factor']
+            problems = []
+            if errors:
+                problems.append(f'status {errors[0]} instead of {endpoint.status}')
+            if max(queries) > endpoint.max_queries:
+                problems.append(f'{max(queries)} queries > {endpoint.max_queries}')
+            if max_ms and p95 > max_ms:
+                problems.append(f'p95 {p95:.1f} ms > {max_ms:.0f} ms')
+
+            self.stdout.write(
+                f"{'FAIL' if problems else 'OK':4} {endpoint.name:42} {percentile(latencies, 50):8.1f} {p95:8.1f} "
+                f"{percentile(latencies, 99):8.1f} {max(latencies):8.1f} {max(queries):8}"
+                + (f"  ({'; '.join(problems)})" if problems else '')
+            )
+            if problems:
+                failures.append(endpoint.name)
+        return failures
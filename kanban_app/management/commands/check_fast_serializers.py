@@ -0,0 +1,125 @@
+import datetime
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from kanban_app.api.fast_serializers import (
+    FastBoardSerializer, FastCommentResponseSerializer, FastTaskSerializer, FastTasksofBoardSerializer,
+)
+from kanban_app.models import Board, Comment, Task
+from kanban_app.seeding import BATCH_SIZE, seed
+from .check_query_plans import RollbackSeed
+
+
+class Command(BaseCommand):
+    """
+    Seeds a temporary data set, serializes it with every fast serializer
+    and with the DRF serializer it replaces, and fails if the rendered
+    JSON differs. Afterwards both are timed (query and serialization)
+    and the speedup is reported. The seeded data is rolled back.
+    FastSerializerTests compares a smaller data set in the test suite.
+    """
+    help = 'Verifies that the fast serializers return the same JSON as the DRF serializers and benchmarks them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=5000, help='Number of tasks to seed.')
+        parser.add_argument('--comments', type=int, default=5000, help='Number of comments to seed.')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per serializer; the fastest is reported.')
+
+    def handle(self, *args, **options):
+        failures = []
+        try:
+            with transaction.atomic():
+                self.seed(options['tasks'], options['comments'])
+                for label, fast, queryset, instances in self.get_checks():
+                    drf = lambda: fast.serializes(instances.all(), many=True).data
+                    values = lambda: fast.serialize(fast.values(queryset))
+
+                    expected, actual = JSONRenderer().render(drf()), JSONRenderer().render(values())
+                    if expected != actual:
+                        failures.append(label)
+                        self.stdout.write(f'FAIL {label}')
+                        self.stdout.write(f'       DRF:  {self.first_difference(expected, actual)[0]}')
+                        self.stdout.write(f'       fast: {self.first_difference(expected, actual)[1]}')
+                        continue
+
+                    drf_time = self.measure(drf, options['repeat'])
+                    fast_time = self.measure(values, options['repeat'])
+                    self.stdout.write(
+                        f'OK   {label}: {len(expected)} bytes, DRF {drf_time * 1000:.1f} ms, '
+                        f'fast {fast_time * 1000:.1f} ms ({drf_time / fast_time:.1f}x)'
+                    )
+                raise RollbackSeed
+        except RollbackSeed:
+            pass
+
+        if failures:
+            raise CommandError(f"Fast serializers differ from DRF: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS('All fast serializers return the same JSON as DRF.'))
+
+    def get_checks(self):
+        """
+        Returns (label, fast serializer, queryset, DRF queryset) with the
+        querysets of the endpoints that use the serializer.
+        """
+        tasks = Task.objects.with_comment_count()
+        comments = Comment.objects.order_by('created_at', 'id')
+        return [
+            ('BoardSerializer', FastBoardSerializer(),
+             Board.objects.with_stats().order_by('id'), Board.objects.with_stats().order_by('id')),
+            ('TaskSerializer', FastTaskSerializer(),
+             tasks.order_by('due_date', 'id'), tasks.with_users().order_by('due_date', 'id')),
+            ('TasksofBoardSerializer', FastTasksofBoardSerializer(),
+             tasks.in_column_order(), tasks.with_users().in_column_order()),
+            ('CommentResponseSerializer', FastCommentResponseSerializer(),
+             comments, comments.select_related('author')),
+        ]
+
+    def measure(self, function, repeat):
+        """Returns the shortest of 'repeat' runs of the function in seconds."""
+        best = None
+        for _ in range(max(repeat, 1)):
+            start = time.perf_counter()
+            function()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def first_difference(self, expected, actual):
+        """Returns both renderings around the first byte where they differ."""
+        index = next((i for i, (a, b) in enumerate(zip(expected, actual)) if a != b), min(len(expected), len(actual)))
+        start = max(index - 60, 0)
+        return expected[start:index + 60], actual[start:index + 60]
+
+    def seed(self, task_count, comment_count):
+        """
+        Creates a data set with kanban_app.seeding and varies it, so
+        every branch of the serializers is compared: users without
+        (user)name or with a blank name, titles with quotes and HTML,
+        descriptions with line breaks and comments with timestamps at
+        both ends of a second.
+        """
+        rng = random.Random(42)
+        data = seed(users=20, boards=10, tasks=task_count, comments=comment_count, prefix='fast-check')
+
+        users = data['users']
+        users[0].username = ''
+        users[1].first_name, users[1].last_name = ' ', ''
+        User.objects.bulk_update(users[:2], ['username', 'first_name', 'last_name'])
+
+        tasks = data['tasks']
+        for task in tasks:
+            task.title = f'{task.title} "quoted" <b>'
+            task.description = rng.choice(['', 'Beschreibung mit Umlauten äöü', 'Line\nbreak'])
+        Task.objects.bulk_update(tasks, ['title', 'description'], batch_size=BATCH_SIZE)
+
+        now = timezone.now()
+        comments = list(Comment.objects.filter(task__in=tasks).only('id'))
+        for comment in comments:
+            comment.created_at = now - datetime.timedelta(seconds=rng.randint(0, 10 ** 6), microseconds=rng.choice([0, 1, 999999]))
+        Comment.objects.bulk_update(comments, ['created_at'], batch_size=BATCH_SIZE)
@@ -0,0 +1,104 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from kanban_app.api.views import TaskCommentsListCreateView, TasksAssignedToMeView, TasksReviewingView
+from kanban_app.models import Board, BoardStats, Comment, Task
+from kanban_app.seeding import seed
+
+
+class RollbackSeed(Exception):
+    """Raised to roll back the seeded data after the plans were checked."""
+
+
+class Command(BaseCommand):
+    """
+    Seeds a temporary data set, runs EXPLAIN for the main query of
+    every endpoint and fails if one of them scans the whole task or
+    comment table instead of using an index.
+    Works on SQLite and PostgreSQL. The seeded data is rolled back.
+    """
+    help = 'Verifies with EXPLAIN that the main endpoint queries use an index.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=20000, help='Number of tasks to seed.')
+        parser.add_argument('--comments', type=int, default=20000, help='Number of comments to seed.')
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            raise CommandError(f'Unsupported database vendor: {connection.vendor}')
+
+        failures = []
+        try:
+            with transaction.atomic():
+                user, board, task = self.seed(options['tasks'], options['comments'])
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE')
+                for label, queryset, table in self.get_checks(user, board, task):
+                    plan = queryset.explain()
+                    ok = self.uses_index(plan, table)
+                    self.stdout.write(f"{'OK  ' if ok else 'FAIL'} {label}")
+                    for line in plan.splitlines():
+                        self.stdout.write(f'       {line.strip()}')
+                    if not ok:
+                        failures.append(label)
+                raise RollbackSeed
+        except RollbackSeed:
+            pass
+
+        if failures:
+            raise CommandError(f"Queries without index on {connection.vendor}: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS(f'All queries use an index on {connection.vendor}.'))
+
+    def get_checks(self, user, board, task):
+        """
+        Returns (label, queryset, table) of the queries the endpoints run,
+        with the table that has to be read through an index.
+        """
+        tasks, comments = Task._meta.db_table, Comment._meta.db_table
+        boards = Board.objects.for_user(user).with_stats()
+        board_tasks = Task.objects.filter(board=board).with_comment_count()
+        checks = [
+            ('GET /api/boards/', boards, BoardStats._meta.db_table),
+            ('GET /api/boards/<id>/ (tasks)', board_tasks.in_column_order(), tasks),
+            ('board tasks by status', board_tasks.filter(status='to_do'), tasks),
+            ('board tasks by priority', board_tasks.filter(priority='high'), tasks),
+        ]
+        for view in (TasksAssignedToMeView, TasksReviewingView):
+            user_tasks = Task.objects.filter(**{view.user_field: user}).with_comment_count()
+            checks += [
+                (f'{view.__name__}', user_tasks.in_column_order(), tasks),
+                (f'{view.__name__} (paginated)', user_tasks.order_by(*view.pagination_class.ordering), tasks),
+            ]
+        checks.append((
+            'GET /api/tasks/<id>/comments/',
+            Comment.objects.filter(task=task).order_by(*TaskCommentsListCreateView.pagination_class.ordering),
+            comments,
+        ))
+        return checks
+
+    def uses_index(self, plan, table):
+        """
+        Returns True if the plan reads the table through an index
+        and never scans it sequentially.
+        """
+        if connection.vendor == 'postgresql':
+            if re.search(rf'Seq Scan on {table}\b', plan):
+                return False
+            return re.search(rf'Index (Only )?Scan (Backward )?using \w+ on {table}\b|Bitmap Heap Scan on {table}\b', plan) is not None
+
+        lines = [line for line in plan.splitlines() if re.search(rf'\b{table}\b', line)]
+        if any(re.search(rf'\bSCAN {table}\b', line) and 'INDEX' not in line for line in lines):
+            return False
+        return any('USING' in line and 'INDEX' in line for line in lines)
+
+    def seed(self, task_count, comment_count):
+        """
+        Creates users, boards with members, tasks and comments with
+        kanban_app.seeding. Returns the owner of the largest board, the
+        board and the task with the most comments.
+        """
+        data = seed(users=50, boards=40, tasks=task_count, comments=comment_count, prefix='plan-check')
+        board = data['boards'][0]
+        return board.owner, board, data['tasks'][0]
@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from kanban_app.changelog import compact
+
+
+class Command(BaseCommand):
+    """
+    Deletes old entries of the board change log. Clients whose sync
+    cursor is older than the kept entries load their board in full.
+    """
+    help = 'Deletes board change log entries older than the retention period.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=float, default=7, help='Keep the changes of this many days (default 7).')
+
+    def handle(self, *args, **options):
+        deleted = compact(timezone.now() - timedelta(days=options['days']))
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} change log entries.'))
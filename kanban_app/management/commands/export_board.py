@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from kanban_app.models import Board
+from kanban_app.transfer import export_board
+
+
+class Command(BaseCommand):
+    """
+    Writes a board with its members, tasks and comments as NDJSON,
+    to be loaded again with the import_board command.
+    """
+    help = 'Exports a board with its members, tasks and comments as NDJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('board', type=int, help='ID of the board to export.')
+        parser.add_argument('--output', '-o', help='File to write to (default: standard output).')
+
+    def handle(self, *args, **options):
+        try:
+            board = Board.objects.get(pk=options['board'])
+        except Board.DoesNotExist:
+            raise CommandError(f"Board {options['board']} does not exist.")
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                output.writelines(export_board(board))
+            self.stderr.write(self.style.SUCCESS(f"Exported board {board.pk} to {options['output']}."))
+        else:
+            for line in export_board(board):
+                self.stdout.write(line, ending='')
@@ -0,0 +1,39 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from auth_app.backends import users_by_email
+from kanban_app.transfer import InvalidExport, import_board
+
+
+class Command(BaseCommand):
+    """
+    Creates a new board from an NDJSON export of the export_board command
+    or the export endpoint. Users are matched by email and must exist.
+    """
+    help = 'Imports a board exported as NDJSON into a new board.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help="NDJSON file to import, or '-' for standard input.")
+        parser.add_argument('--owner', help='Email of the owner of the new board (default: the exported owner).')
+
+    def handle(self, *args, **options):
+        owner = None
+        if options['owner']:
+            owner = users_by_email(options['owner']).first()
+            if owner is None:
+                raise CommandError(f"No user with the email {options['owner']}.")
+
+        try:
+            if options['file'] == '-':
+                result = import_board(sys.stdin, owner=owner)
+            else:
+                with open(options['file'], encoding='utf-8') as lines:
+                    result = import_board(lines, owner=owner)
+        except (InvalidExport, OSError) as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported board {result['id']} with {result['members']} members, "
+            f"{result['tasks']} tasks and {result['comments']} comments."
+        ))
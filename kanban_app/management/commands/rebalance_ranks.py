@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from kanban_app.models import Task
+from kanban_app.ranking import MIN_RANK_GAP, is_dense, rebalance_column
+
+
+class Command(BaseCommand):
+    """
+    Rebalances the task ranks of status columns that became too dense
+    through repeated moves between the same neighbours. Meant to be run
+    periodically in the background (e.g. by cron); moves also rebalance
+    a column on their own if there is no free rank left.
+    """
+    help = 'Rebalances the task ranks of dense status columns.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-gap', type=int, default=MIN_RANK_GAP,
+                            help='Rebalance columns with neighbours closer than this.')
+        parser.add_argument('--all', action='store_true', help='Rebalance every column.')
+        parser.add_argument('--board', type=int, action='append', help='Limit to the given board ID (repeatable).')
+
+    def handle(self, *args, **options):
+        tasks = Task.objects.all()
+        if options['board']:
+            tasks = tasks.filter(board_id__in=options['board'])
+
+        columns = tasks.order_by('board_id', 'status').values_list('board_id', 'status').distinct()
+        rebalanced = 0
+        for board_id, status in columns.iterator():
+            if not options['all']:
+                ranks = list(
+                    Task.objects.filter(board_id=board_id, status=status).order_by('rank').values_list('rank', flat=True)
+                )
+                if not is_dense(ranks, options['min_gap']):
+                    continue
+            count = rebalance_column(board_id, status)
+            rebalanced += 1
+            self.stdout.write(f'Board {board_id}, {status}: rebalanced {count} tasks.')
+
+        self.stdout.write(self.style.SUCCESS(f'Rebalanced {rebalanced} columns.'))
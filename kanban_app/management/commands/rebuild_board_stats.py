@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from kanban_app.models import Board, BoardStats
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the denormalized BoardStats counters from the tasks and
+    memberships, or only verifies them with --check.
+    """
+    help = 'Rebuilds or verifies the BoardStats counters of all boards.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Only report boards with missing or wrong counters and exit with an error if there are any.',
+        )
+        parser.add_argument('--board', type=int, action='append', help='Limit to the given board ID (repeatable).')
+
+    def handle(self, *args, **options):
+        boards = Board.objects.all()
+        if options['board']:
+            boards = boards.filter(id__in=options['board'])
+
+        if not options['check']:
+            count = BoardStats.rebuild(boards)
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt the stats of {count} boards.'))
+            return
+
+        expected = BoardStats.compute(boards)
+        stored = {
+            row.pop('board_id'): row
+            for row in BoardStats.objects.filter(board_id__in=expected).values('board_id', *BoardStats.COUNTERS)
+        }
+        wrong = 0
+        for board_id, counters in expected.items():
+            if stored.get(board_id) != counters:
+                wrong += 1
+                self.stdout.write(f'Board {board_id}: stored {stored.get(board_id)}, expected {counters}')
+
+        if wrong:
+            raise CommandError(f'{wrong} of {len(expected)} boards have wrong stats. Run rebuild_board_stats to fix them.')
+        self.stdout.write(self.style.SUCCESS(f'The stats of all {len(expected)} boards are correct.'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from kanban_app.search import install_index
+
+
+class Command(BaseCommand):
+    """
+    Recreates the full-text index of tasks and comments from their rows.
+    On SQLite this also restores the triggers, which are dropped when a
+    migration rebuilds the task or comment table.
+    """
+    help = 'Recreates the full-text search index of tasks and comments.'
+
+    def handle(self, *args, **options):
+        install_index(connection)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt the search index ({connection.vendor}).'))
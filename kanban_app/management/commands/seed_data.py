@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from kanban_app.seeding import DEFAULT_PASSWORD, seed
+
+
+class Command(BaseCommand):
+    """
+    Fills the database with generated users, boards, tasks and comments
+    with a realistic skew (see kanban_app.seeding), e.g. to try the API
+    or profile queries with a large data set.
+    """
+    help = 'Generates users, boards, tasks and comments with a realistic skew.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100, help='Number of users.')
+        parser.add_argument('--boards', type=int, default=20, help='Number of boards.')
+        parser.add_argument('--tasks', type=int, default=10000, help='Number of tasks.')
+        parser.add_argument('--comments', type=int, default=20000, help='Number of comments.')
+        parser.add_argument(
+            '--skew', type=float, default=1.0,
+            help='Exponent of the Zipf distribution of boards, tasks and comments; 0 distributes uniformly.',
+        )
+        parser.add_argument('--prefix', default='seed', help="Prefix of the user emails ('<prefix>-<n>@example.com').")
+        parser.add_argument('--password', default=DEFAULT_PASSWORD, help='Password of the users.')
+        parser.add_argument('--random-seed', type=int, default=0, help='Seed of the random generator.')
+
+    def handle(self, *args, **options):
+        if options['users'] < 2 or options['boards'] < 1:
+            raise CommandError('At least 2 users and 1 board are needed.')
+        if options['skew'] < 0:
+            raise CommandError('The skew must not be negative.')
+
+        data = seed(
+            users=options['users'], boards=options['boards'], tasks=options['tasks'], comments=options['comments'],
+            skew=options['skew'], prefix=options['prefix'], password=options['password'],
+            random_seed=options['random_seed'],
+        )
+        largest = data['boards'][0]
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(data['users'])} users, {len(data['boards'])} boards, {len(data['tasks'])} tasks "
+            f"and {data['comments']} comments. The largest board is {largest.id}, owned by {largest.owner.email}."
+        ))
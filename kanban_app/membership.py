@@ -0,0 +1,174 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import transaction
+
+from kanban_app.models import Board
+
+
+class BoardAccess(NamedTuple):
+    """
+    Owner and member IDs of a board, used for all permission checks.
+    """
+    owner_id: int
+    member_ids: frozenset
+
+    def is_member(self, user_id):
+        """Returns True if the user is a member of the board."""
+        return user_id in self.member_ids
+
+    def is_member_or_owner(self, user_id):
+        """Returns True if the user is the owner or a member of the board."""
+        return user_id == self.owner_id or user_id in self.member_ids
+
+
+class BoardAccessCache:
+    """
+    Thread-safe process-level LRU cache of board ID to BoardAccess
+    with a time to live. Entries are invalidated by the signal handlers
+    in kanban_app.signals; the TTL bounds how long other processes can
+    see outdated memberships.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, board_id):
+        with self._lock:
+            entry = self._entries.get(board_id)
+            if entry is None:
+                return None
+            expires, access = entry
+            if expires < time.monotonic():
+                del self._entries[board_id]
+                return None
+            self._entries.move_to_end(board_id)
+            return access
+
+    def set(self, board_id, access):
+        with self._lock:
+            self._entries[board_id] = (time.monotonic() + self.ttl, access)
+            self._entries.move_to_end(board_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, board_id):
+        with self._lock:
+            self._entries.pop(board_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_config = getattr(settings, 'BOARD_ACCESS_CACHE', {})
+board_access_cache = BoardAccessCache(
+    maxsize=_config.get('MAXSIZE', 10000),
+    ttl=_config.get('TTL', 30),
+)
+
+
+def get_board_access(board_id, request=None):
+    """
+    Returns the BoardAccess of a board, or None if the board does not exist.
+    Results are memoized on the request and in the process-level cache,
+    otherwise owner and members are loaded with a single query.
+    """
+    try:
+        board_id = int(board_id)
+    except (TypeError, ValueError):
+        return None
+
+    memo = _request_memo(request)
+    if board_id in memo:
+        return memo[board_id]
+
+    access = board_access_cache.get(board_id)
+    if access is None:
+        access = _load_access(board_id, list(_access_rows(board_id)))
+
+    memo[board_id] = access
+    return access
+
+
+async def aget_board_access(board_id, request=None):
+    """
+    Async version of get_board_access() for the async views.
+    """
+    try:
+        board_id = int(board_id)
+    except (TypeError, ValueError):
+        return None
+
+    memo = _request_memo(request)
+    if board_id in memo:
+        return memo[board_id]
+
+    access = board_access_cache.get(board_id)
+    if access is None:
+        access = _load_access(board_id, [row async for row in _access_rows(board_id)])
+
+    memo[board_id] = access
+    return access
+
+
+def board_id_of(obj):
+    """
+    Returns the board ID of a board, a task or a comment.
+    """
+    if isinstance(obj, Board):
+        return obj.pk
+    if hasattr(obj, 'board_id'):
+        return obj.board_id
+    if hasattr(obj, 'task'):
+        return obj.task.board_id
+    return None
+
+
+def invalidate_board_access(board_id=None):
+    """
+    Removes a board (or, without board_id, all boards) from the cache.
+    It is invalidated right away and again after the surrounding
+    transaction commits, so no request can cache the state in between.
+    """
+    def invalidate():
+        if board_id is None:
+            board_access_cache.clear()
+        else:
+            board_access_cache.delete(board_id)
+
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+def _access_rows(board_id):
+    """Returns one (owner_id, member_id) row per member of the board."""
+    return Board.objects.filter(pk=board_id).values_list('owner_id', 'members')
+
+
+def _load_access(board_id, rows):
+    """Builds the BoardAccess from its rows and caches it."""
+    if not rows:
+        return None
+    access = BoardAccess(
+        owner_id=rows[0][0],
+        member_ids=frozenset(member_id for _, member_id in rows if member_id is not None),
+    )
+    board_access_cache.set(board_id, access)
+    return access
+
+
+def _request_memo(request):
+    if request is None:
+        return {}
+    memo = getattr(request, '_board_access_memo', None)
+    if memo is None:
+        memo = {}
+        request._board_access_memo = memo
+    return memo
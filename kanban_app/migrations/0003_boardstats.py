@@ -0,0 +1,56 @@
+# Generated by Django 5.2.3 on 2026-10-17 01:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def create_board_stats(apps, schema_editor):
+    """Creates the stats rows of all existing boards."""
+    Board = apps.get_model('kanban_app', 'Board')
+    BoardStats = apps.get_model('kanban_app', 'BoardStats')
+    Membership = Board.members.through
+
+    member_counts = dict(
+        Membership.objects.values_list('board_id').annotate(count=Count('id')).order_by()
+    )
+    boards = Board.objects.annotate(
+        ticket_count=Count('tasks'),
+        tasks_to_do_count=Count('tasks', filter=Q(tasks__status='to_do')),
+        tasks_high_prio_count=Count('tasks', filter=Q(tasks__priority='high')),
+    ).values_list('id', 'ticket_count', 'tasks_to_do_count', 'tasks_high_prio_count')
+
+    BoardStats.objects.bulk_create(
+        (
+            BoardStats(
+                board_id=board_id,
+                member_count=member_counts.get(board_id, 0),
+                ticket_count=ticket_count,
+                tasks_to_do_count=to_do_count,
+                tasks_high_prio_count=high_prio_count,
+            )
+            for board_id, ticket_count, to_do_count, high_prio_count in boards
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban_app', '0002_task_comment_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoardStats',
+            fields=[
+                ('board', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='kanban_app.board')),
+                ('member_count', models.PositiveIntegerField(default=0)),
+                ('ticket_count', models.PositiveIntegerField(default=0)),
+                ('tasks_to_do_count', models.PositiveIntegerField(default=0)),
+                ('tasks_high_prio_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_board_stats, migrations.RunPython.noop),
+    ]
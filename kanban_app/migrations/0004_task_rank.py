@@ -0,0 +1,49 @@
+# Generated by Django 5.2.3 on 2026-10-17 01:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def rank_existing_tasks(apps, schema_editor):
+    """
+    Ranks the existing tasks of every status column in the order
+    they were created, with the default gap between them.
+    """
+    Task = apps.get_model('kanban_app', 'Task')
+    gap = 1 << 16
+
+    tasks, positions = [], {}
+    for task in Task.objects.order_by('board_id', 'status', 'id').only('id', 'board_id', 'status').iterator(chunk_size=2000):
+        column = (task.board_id, task.status)
+        positions[column] = positions.get(column, 0) + 1
+        task.rank = positions[column] * gap
+        tasks.append(task)
+        if len(tasks) >= 2000:
+            Task.objects.bulk_update(tasks, ['rank'])
+            tasks = []
+    Task.objects.bulk_update(tasks, ['rank'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban_app', '0003_boardstats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='rank',
+            field=models.BigIntegerField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['board', 'status', 'rank'], name='task_board_status_rank_idx'),
+        ),
+        migrations.RunPython(rank_existing_tasks, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_board_status_idx',
+        ),
+    ]
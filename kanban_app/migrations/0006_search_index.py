@@ -0,0 +1,90 @@
+# Generated by Django 5.2.3 on 2026-10-17 02:05
+
+from django.db import migrations
+
+# The statements are part of the migration, so it keeps creating this
+# version of the index when kanban_app.search changes later.
+SQLITE_INSTALL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS kanban_app_task_fts USING fts5(title, description, "
+    "content='kanban_app_task', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER kanban_app_task_fts_ai AFTER INSERT ON kanban_app_task BEGIN "
+    "INSERT INTO kanban_app_task_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER kanban_app_task_fts_ad AFTER DELETE ON kanban_app_task BEGIN "
+    "INSERT INTO kanban_app_task_fts(kanban_app_task_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER kanban_app_task_fts_au AFTER UPDATE OF title, description ON kanban_app_task BEGIN "
+    "INSERT INTO kanban_app_task_fts(kanban_app_task_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO kanban_app_task_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "INSERT INTO kanban_app_task_fts(kanban_app_task_fts) VALUES ('rebuild')",
+
+    "CREATE VIRTUAL TABLE IF NOT EXISTS kanban_app_comment_fts USING fts5(content, "
+    "content='kanban_app_comment', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER kanban_app_comment_fts_ai AFTER INSERT ON kanban_app_comment BEGIN "
+    "INSERT INTO kanban_app_comment_fts(rowid, content) VALUES (new.id, new.content); END",
+    "CREATE TRIGGER kanban_app_comment_fts_ad AFTER DELETE ON kanban_app_comment BEGIN "
+    "INSERT INTO kanban_app_comment_fts(kanban_app_comment_fts, rowid, content) "
+    "VALUES ('delete', old.id, old.content); END",
+    "CREATE TRIGGER kanban_app_comment_fts_au AFTER UPDATE OF content ON kanban_app_comment BEGIN "
+    "INSERT INTO kanban_app_comment_fts(kanban_app_comment_fts, rowid, content) "
+    "VALUES ('delete', old.id, old.content); "
+    "INSERT INTO kanban_app_comment_fts(rowid, content) VALUES (new.id, new.content); END",
+    "INSERT INTO kanban_app_comment_fts(kanban_app_comment_fts) VALUES ('rebuild')",
+]
+
+SQLITE_UNINSTALL = [
+    'DROP TRIGGER IF EXISTS kanban_app_task_fts_ai',
+    'DROP TRIGGER IF EXISTS kanban_app_task_fts_ad',
+    'DROP TRIGGER IF EXISTS kanban_app_task_fts_au',
+    'DROP TABLE IF EXISTS kanban_app_task_fts',
+    'DROP TRIGGER IF EXISTS kanban_app_comment_fts_ai',
+    'DROP TRIGGER IF EXISTS kanban_app_comment_fts_ad',
+    'DROP TRIGGER IF EXISTS kanban_app_comment_fts_au',
+    'DROP TABLE IF EXISTS kanban_app_comment_fts',
+]
+
+POSTGRESQL_INSTALL = [
+    "CREATE INDEX IF NOT EXISTS task_search_idx ON kanban_app_task USING gin "
+    "(to_tsvector('simple', COALESCE(title, '') || ' ' || COALESCE(description, '')))",
+    "CREATE INDEX IF NOT EXISTS comment_search_idx ON kanban_app_comment USING gin "
+    "(to_tsvector('simple', COALESCE(content, '')))",
+]
+
+POSTGRESQL_UNINSTALL = [
+    'DROP INDEX IF EXISTS task_search_idx',
+    'DROP INDEX IF EXISTS comment_search_idx',
+]
+
+
+def run(statements):
+    """
+    Returns a RunPython function executing the statements of the
+    connection's vendor; other databases are searched without index.
+    """
+    def execute(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return execute
+
+
+class Migration(migrations.Migration):
+    """
+    Full-text index of tasks and comments: FTS5 tables kept in sync by
+    triggers on SQLite, GIN indexes over tsvector expressions on
+    PostgreSQL (see kanban_app.search).
+
+    SQLite drops the triggers when a later migration rebuilds the task
+    or comment table (e.g. to alter a column); the kanban_app.W001 check
+    reports this, and the rebuild_search_index command restores them.
+    """
+
+    dependencies = [
+        ('kanban_app', '0005_boardchange'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({'sqlite': SQLITE_INSTALL, 'postgresql': POSTGRESQL_INSTALL}),
+            run({'sqlite': SQLITE_UNINSTALL, 'postgresql': POSTGRESQL_UNINSTALL}),
+        ),
+    ]
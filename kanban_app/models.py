@@ -1,7 +1,93 @@
 from django.db import models
+from django.db.models import Count, F, IntegerField, OuterRef, Prefetch, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 
 
+class BoardQuerySet(models.QuerySet):
+    """
+    Custom queryset for boards with helpers for the board list endpoint.
+    """
+
+    def for_user(self, user):
+        """
+        Returns all boards where the user is the owner or a member.
+        Membership is resolved through a subquery so that no join on
+        the members table multiplies the rows of the result.
+        """
+        member_board_ids = Board.members.through.objects.filter(user=user).values('board_id')
+        return self.filter(Q(owner=user) | Q(id__in=member_board_ids))
+
+    def with_counts(self):
+        """
+        Annotates every board with the counters shown in the board list
+        (members, tickets, to-do tasks, high priority tasks), so they are
+        computed in the same query instead of one query per board and counter.
+        """
+        member_count = Board.members.through.objects.filter(
+            board_id=OuterRef('pk')
+        ).order_by().values('board_id').annotate(count=Count('id')).values('count')
+
+        return self.annotate(
+            member_count=Coalesce(Subquery(member_count, output_field=IntegerField()), 0),
+            ticket_count=Count('tasks'),
+            tasks_to_do_count=Count('tasks', filter=Q(tasks__status='to_do')),
+            tasks_high_prio_count=Count('tasks', filter=Q(tasks__priority='high')),
+        )
+
+    def with_stats(self):
+        """
+        Annotates every board with the counters of its BoardStats row.
+        This is a single indexed join, independent of the number of tasks.
+        Boards without a stats row get None and are counted on demand.
+        """
+        return self.annotate(
+            member_count=F('stats__member_count'),
+            ticket_count=F('stats__ticket_count'),
+            tasks_to_do_count=F('stats__tasks_to_do_count'),
+            tasks_high_prio_count=F('stats__tasks_high_prio_count'),
+        )
+
+    def with_details(self):
+        """
+        Prefetches everything the board detail view renders,
+        see board_detail_lookups().
+        """
+        return self.prefetch_related(*board_detail_lookups())
+
+
+def board_detail_lookups():
+    """
+    Returns the prefetch lookups for everything the board detail view
+    renders: the members and all tasks including assignee, reviewer and
+    comment count. The number of queries stays fixed regardless of the
+    board size.
+    """
+    return [
+        'members',
+        Prefetch('tasks', queryset=Task.objects.with_users().with_comment_count().in_column_order()),
+    ]
+
+
+class TaskQuerySet(models.QuerySet):
+    """
+    Custom queryset for tasks with helpers to avoid per-row queries
+    when serializing lists of tasks.
+    """
+
+    def with_users(self):
+        """Joins assignee and reviewer into the same query."""
+        return self.select_related('assignee', 'reviewer')
+
+    def with_comment_count(self):
+        """Annotates every task with the number of its comments."""
+        return self.annotate(comments_count=Count('comments'))
+
+    def in_column_order(self):
+        """Orders the tasks by board, status column and rank within the column."""
+        return self.order_by('board', 'status', 'rank', 'id')
+
+
 class Board(models.Model):
     """
     Represents a Kanban board where tasks are organized.
@@ -14,7 +100,8 @@ class Board(models.Model):
     title = models.CharField(max_length=30)
     members = models.ManyToManyField(User, related_name='member_boards')
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='boards')
-    
+
+    objects = BoardQuerySet.as_manager()
 
     def __str__(self):
         return self.title
@@ -34,6 +121,7 @@ class Task(models.Model):
         owner (User): The user who created the task.
         assignees (ForeignKey[User]): Users assigned to work on the task.
         reviewers (ForeignKey[User]): Users assigned to review the task.
+        rank (int): Position of the task within its status column (see kanban_app.ranking).
     """
 
     PRIORITY_CHOICES = {
@@ -51,13 +139,69 @@ class Task(models.Model):
 
     title = models.CharField(max_length=30)
     description = models.TextField(max_length=500, blank=True)
-    board = models.ForeignKey(Board, on_delete=models.CASCADE,related_name='tasks')
+    board = models.ForeignKey(Board, on_delete=models.CASCADE,related_name='tasks', db_index=False)
     priority = models.CharField(max_length=10, choices=PRIORITY_CHOICES.items())
     status = models.CharField(max_length=30, choices=STATUS_CHOICES.items())
     due_date = models.DateField()
-    assignee = models.ForeignKey(User,on_delete=models.CASCADE, related_name='assigned_tasks')
-    reviewer = models.ForeignKey(User,on_delete=models.CASCADE, related_name='reviewed_tasks')
+    assignee = models.ForeignKey(User,on_delete=models.CASCADE, related_name='assigned_tasks', db_index=False)
+    reviewer = models.ForeignKey(User,on_delete=models.CASCADE, related_name='reviewed_tasks', db_index=False)
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='owned_tasks',null=True, blank=True,)
+    rank = models.BigIntegerField(null=True, editable=False)
+
+    # Attributes shown in task lists and board details, see listed_state().
+    LISTED_FIELDS = (
+        'board_id', 'title', 'description', 'status', 'priority', 'due_date', 'assignee_id', 'reviewer_id', 'rank',
+    )
+
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        # The composite indexes replace the single column foreign key
+        # indexes of board, assignee and reviewer (they share the prefix).
+        indexes = [
+            models.Index(fields=['board', 'status', 'rank'], name='task_board_status_rank_idx'),
+            models.Index(fields=['board', 'priority'], name='task_board_priority_idx'),
+            models.Index(fields=['assignee', 'due_date', 'id'], name='task_assignee_due_idx'),
+            models.Index(fields=['reviewer', 'due_date', 'id'], name='task_reviewer_due_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Remembers the loaded state the save signals compare against
+        (see kanban_app.signals), if its fields were loaded:
+
+        - _stats_state: to update BoardStats by the difference.
+        - _column_state: to rank a task moved to another column.
+        - _user_state: to bump the task lists of the previous
+          assignee and reviewer.
+        - _listed_state: so saves without a listed change keep
+          the versions.
+        """
+        instance = super().from_db(db, field_names, values)
+        if all(name in instance.__dict__ for name in ('board_id', 'status', 'priority')):
+            instance._stats_state = instance.stats_state()
+        if all(name in instance.__dict__ for name in ('board_id', 'status')):
+            instance._column_state = (instance.board_id, instance.status)
+        if all(name in instance.__dict__ for name in ('assignee_id', 'reviewer_id')):
+            instance._user_state = (instance.assignee_id, instance.reviewer_id)
+        if all(name in instance.__dict__ for name in cls.LISTED_FIELDS):
+            instance._listed_state = instance.listed_state()
+        return instance
+
+    def stats_state(self):
+        """
+        Returns the board and the counters of BoardStats this task
+        contributes to: (board_id, is to do, is high priority).
+        """
+        return self.board_id, self.status == 'to_do', self.priority == 'high'
+
+    def listed_state(self):
+        """
+        Returns the values of the fields shown in task lists and board
+        details (the rank orders them).
+        """
+        return tuple(getattr(self, name) for name in self.LISTED_FIELDS)
 
     def __str__(self):
         return self.title
@@ -73,7 +217,127 @@ class Comment(models.Model):
         content (str): The textual content of the comment.
         created_at (datetime): Timestamp when the comment was created.
     """
-    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="comments")
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="comments", db_index=False)
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     content = models.TextField(max_length=1000)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        # Replaces the single column index of task (shared prefix).
+        indexes = [
+            models.Index(fields=['task', 'created_at', 'id'], name='comment_task_created_idx'),
+        ]
+
+
+class BoardStats(models.Model):
+    """
+    Denormalized counters of a board shown in the board list.
+    Kept up to date incrementally by the signal handlers in
+    kanban_app.signals and rebuilt by the rebuild_board_stats command.
+
+    Attributes:
+        board (Board): The board the counters belong to.
+        member_count (int): Number of members.
+        ticket_count (int): Number of tasks.
+        tasks_to_do_count (int): Number of tasks with status 'to_do'.
+        tasks_high_prio_count (int): Number of tasks with priority 'high'.
+    """
+    board = models.OneToOneField(Board, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    member_count = models.PositiveIntegerField(default=0)
+    ticket_count = models.PositiveIntegerField(default=0)
+    tasks_to_do_count = models.PositiveIntegerField(default=0)
+    tasks_high_prio_count = models.PositiveIntegerField(default=0)
+
+    COUNTERS = ['member_count', 'ticket_count', 'tasks_to_do_count', 'tasks_high_prio_count']
+
+    @classmethod
+    def apply(cls, board_id, **deltas):
+        """
+        Adds the given deltas to the counters of a board in a single
+        UPDATE with F-expressions, so concurrent writers never lose updates.
+        """
+        deltas = {name: delta for name, delta in deltas.items() if delta}
+        if deltas:
+            cls.objects.filter(board_id=board_id).update(
+                **{name: F(name) + delta for name, delta in deltas.items()}
+            )
+
+    @classmethod
+    def apply_task_states(cls, states, sign):
+        """
+        Adds (sign=1) or removes (sign=-1) the given task states
+        (see Task.stats_state) with one UPDATE per affected board.
+        """
+        deltas = {}
+        for board_id, to_do, high_prio in states:
+            board_deltas = deltas.setdefault(board_id, [0, 0, 0])
+            board_deltas[0] += sign
+            board_deltas[1] += sign if to_do else 0
+            board_deltas[2] += sign if high_prio else 0
+
+        for board_id, (tickets, to_do, high_prio) in deltas.items():
+            cls.apply(board_id, ticket_count=tickets, tasks_to_do_count=to_do, tasks_high_prio_count=high_prio)
+
+    @classmethod
+    def compute(cls, boards):
+        """
+        Returns the correct counters for the given boards
+        as a dict of board ID to counter values.
+        """
+        rows = boards.with_counts().values('id', *cls.COUNTERS)
+        return {row.pop('id'): row for row in rows}
+
+    @classmethod
+    def rebuild(cls, boards):
+        """
+        Recomputes the counters of the given boards from the tasks
+        and memberships, creating missing stats rows.
+        """
+        counters = cls.compute(boards)
+        rows = [cls(board_id=board_id, **values) for board_id, values in counters.items()]
+        existing = set(cls.objects.filter(board_id__in=counters).values_list('board_id', flat=True))
+        cls.objects.bulk_create([row for row in rows if row.board_id not in existing], batch_size=1000)
+        cls.objects.bulk_update([row for row in rows if row.board_id in existing], cls.COUNTERS, batch_size=1000)
+        return len(rows)
+
+    def __str__(self):
+        return f'Stats of {self.board}'
+
+
+class BoardChange(models.Model):
+    """
+    Append-only log of changes to the contents of a board, used by
+    clients to sync incrementally (see kanban_app.changelog).
+    The ID of an entry serves as sync cursor.
+
+    Attributes:
+        board (Board): The board whose contents changed.
+        kind (str): Kind of the changed object. Choices: Board, Task, Comment, Member.
+        object_id (int): ID of the changed task, comment, member (user) or board.
+        deleted (bool): True if the object was deleted or the member removed.
+        created_at (datetime): Timestamp of the change.
+    """
+
+    KIND_CHOICES = {
+        "board": "BOARD",
+        "task": "TASK",
+        "comment": "COMMENT",
+        "member": "MEMBER",
+    }
+
+    # No database constraint: entries are still written while a board is
+    # deleted (cascading task deletions). They are removed afterwards by
+    # kanban_app.signals and by the compact_board_changes command.
+    board = models.ForeignKey(Board, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name='+')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES.items())
+    object_id = models.BigIntegerField()
+    deleted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['board', 'id'], name='boardchange_board_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"{'Deleted' if self.deleted else 'Changed'} {self.kind} {self.object_id} of board {self.board_id}"
@@ -0,0 +1,118 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+
+from kanban_app.changelog import record_task_changes
+from kanban_app.models import Task
+from kanban_app.versioning import bump_task_versions
+
+# Distance between the ranks of neighbouring tasks after (re)balancing.
+RANK_GAP = getattr(settings, 'TASK_RANK_GAP', 1 << 16)
+
+# Columns with a smaller distance between two neighbours are rebalanced
+# by the rebalance_ranks command.
+MIN_RANK_GAP = getattr(settings, 'TASK_MIN_RANK_GAP', 16)
+
+
+def next_rank(board_id, status):
+    """
+    Returns the rank for a task appended to the end of a status column.
+    Uses the (board, status, rank) index, so it is a single index lookup.
+    """
+    last = Task.objects.filter(board_id=board_id, status=status).aggregate(rank=Max('rank'))['rank']
+    return RANK_GAP if last is None else last + RANK_GAP
+
+
+def assign_ranks(tasks):
+    """
+    Appends the given unsaved or moved tasks to the end of their columns,
+    with one query per (board, status) column instead of one per task.
+    """
+    last_ranks = {}
+    for task in tasks:
+        column = (task.board_id, task.status)
+        if column not in last_ranks:
+            last_ranks[column] = next_rank(*column) - RANK_GAP
+        last_ranks[column] += RANK_GAP
+        task.rank = last_ranks[column]
+
+
+def move_task(task, status=None, after=None, before=None):
+    """
+    Moves a task within its board, optionally to another status column,
+    directly below the task 'after' or directly above the task 'before'.
+    Without a neighbour the task is appended to the end of the column.
+    Only the moved task is written; the column is rebalanced first if
+    there is no free rank between the neighbours.
+    """
+    status = status or task.status
+    with transaction.atomic():
+        rank = rank_between_neighbours(task, status, after, before)
+        if rank is None:
+            rebalance_column(task.board_id, status)
+            if after is not None:
+                after.refresh_from_db(fields=['rank'])
+            if before is not None:
+                before.refresh_from_db(fields=['rank'])
+            rank = rank_between_neighbours(task, status, after, before)
+
+        task.status = status
+        task.rank = rank
+        task.save(update_fields=['status', 'rank'])
+    return task
+
+
+def rank_between_neighbours(task, status, after, before):
+    """
+    Returns a free rank for the task at the requested position,
+    or None if the neighbours have no free rank between them.
+    """
+    column = Task.objects.filter(board_id=task.board_id, status=status).exclude(pk=task.pk)
+
+    if after is not None:
+        lower = after.rank
+        upper = column.filter(rank__gt=lower).order_by('rank').values_list('rank', flat=True).first()
+        if upper is None:
+            return lower + RANK_GAP
+    elif before is not None:
+        upper = before.rank
+        lower = column.filter(rank__lt=upper).order_by('-rank').values_list('rank', flat=True).first()
+        if lower is None:
+            return upper - RANK_GAP
+    else:
+        last = column.aggregate(rank=Max('rank'))['rank']
+        return RANK_GAP if last is None else last + RANK_GAP
+
+    if upper - lower < 2:
+        return None
+    return (lower + upper) // 2
+
+
+def rebalance_column(board_id, status):
+    """
+    Spreads the ranks of a status column evenly with RANK_GAP between them,
+    keeping the current order. Returns the number of tasks in the column.
+    """
+    tasks = list(
+        Task.objects.filter(board_id=board_id, status=status).order_by('rank', 'id')
+        .only('id', 'board_id', 'rank', 'assignee_id', 'reviewer_id')
+    )
+    for position, task in enumerate(tasks, start=1):
+        task.rank = position * RANK_GAP
+    Task.objects.bulk_update(tasks, ['rank'], batch_size=1000)
+    record_task_changes(tasks)
+    bump_task_versions(
+        board_ids=[board_id],
+        user_ids=[user_id for task in tasks for user_id in (task.assignee_id, task.reviewer_id)],
+    )
+    return len(tasks)
+
+
+def is_dense(ranks, min_gap=MIN_RANK_GAP):
+    """
+    Returns True if the ordered ranks of a column contain unranked tasks
+    or two neighbours closer than min_gap.
+    """
+    if any(rank is None for rank in ranks):
+        return True
+    return any(upper - lower < min_gap for lower, upper in zip(ranks, ranks[1:]))
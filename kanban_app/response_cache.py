@@ -0,0 +1,116 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, StreamingHttpResponse
+
+from core.cache import CacheCounters
+
+_config = getattr(settings, 'TASK_LIST_CACHE', {})
+
+# Hit/miss counters of all response caches in this process.
+response_cache_counters = CacheCounters()
+
+
+class ResponseCache:
+    """
+    Caches the rendered JSON bodies of GET responses in the Django cache
+    framework, keyed by a name (the list type), the user and the ETag
+    built by kanban_app.versioning. The ETag covers the path, the query
+    string and the version stamps of the response, so a bumped version
+    makes the old entries unreachable instead of deleting them; they
+    expire after TTL seconds. Bodies larger than MAX_BYTES are not cached.
+
+    Used through conditional_get(..., response_cache=...), which only
+    asks for the body after the versions did not answer the request
+    with '304 Not Modified'.
+    """
+
+    def __init__(self, name, alias=None, ttl=None, max_bytes=None):
+        self.name = name
+        self.alias = alias or _config.get('ALIAS', 'default')
+        self.ttl = ttl if ttl is not None else _config.get('TTL', 300)
+        self.max_bytes = max_bytes if max_bytes is not None else _config.get('MAX_BYTES', 1024 * 1024)
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def key(self, request, etag):
+        digest = etag.strip('"')
+        return f'response:{self.name}:{request.user.id}:{digest}'
+
+    def get_response(self, request, etag, build_response):
+        """
+        Returns the cached response, or the response of build_response()
+        whose body is cached once it is rendered. Only JSON is cached;
+        other renderers (the browsable API) always build the response.
+        """
+        renderer = getattr(request, 'accepted_renderer', None)
+        if renderer is not None and renderer.format != 'json':
+            return build_response()
+
+        key = self.key(request, etag)
+        content = self.cache.get(key)
+        if content is not None:
+            response_cache_counters.hit()
+            return _response(content)
+
+        response_cache_counters.miss()
+        response = build_response()
+        if hasattr(response, 'add_post_render_callback') and not response.is_rendered:
+            response.add_post_render_callback(lambda rendered: self.store(key, rendered))
+        else:
+            self.store(key, response)
+        return response
+
+    async def aget_response(self, request, etag, build_response):
+        """
+        Async version of get_response(); build_response is a coroutine
+        function. Streamed responses are cached after the last chunk
+        was sent.
+        """
+        key = self.key(request, etag)
+        content = await self.cache.aget(key)
+        if content is not None:
+            response_cache_counters.hit()
+            return _response(content)
+
+        response_cache_counters.miss()
+        response = await build_response()
+        if response.status_code != 200:
+            return response
+        if isinstance(response, StreamingHttpResponse):
+            store_stream = self._astore_stream if response.is_async else self._store_stream
+            response.streaming_content = store_stream(key, response.streaming_content)
+        elif len(response.content) <= self.max_bytes:
+            await self.cache.aset(key, response.content, self.ttl)
+        return response
+
+    def store(self, key, response):
+        if response.status_code == 200 and not response.streaming and len(response.content) <= self.max_bytes:
+            self.cache.set(key, response.content, self.ttl)
+
+    def _store_stream(self, key, chunks):
+        """Passes the chunks through and caches them once all were sent."""
+        body, size = [], 0
+        for chunk in chunks:
+            size += len(chunk)
+            if size <= self.max_bytes:
+                body.append(chunk)
+            yield chunk
+        if size <= self.max_bytes:
+            self.cache.set(key, b''.join(body), self.ttl)
+
+    async def _astore_stream(self, key, chunks):
+        """Async version of _store_stream()."""
+        body, size = [], 0
+        async for chunk in chunks:
+            size += len(chunk)
+            if size <= self.max_bytes:
+                body.append(chunk)
+            yield chunk
+        if size <= self.max_bytes:
+            await self.cache.aset(key, b''.join(body), self.ttl)
+
+
+def _response(content):
+    return HttpResponse(content, content_type='application/json')
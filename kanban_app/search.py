@@ -0,0 +1,256 @@
+import html
+import re
+
+from django.core.checks import Tags, Warning, register
+from django.db import connection, connections
+from django.db.models import Q
+
+from kanban_app.models import Board, Comment, Task
+
+# Markers put around matches by the database, replaced by <mark> tags
+# after the text was HTML-escaped.
+START, STOP = '\ue000', '\ue001'
+
+# Comment snippets returned per task.
+MAX_COMMENT_HIGHLIGHTS = 3
+
+TASK_TABLE = Task._meta.db_table
+COMMENT_TABLE = Comment._meta.db_table
+TASK_FTS = f'{TASK_TABLE}_fts'
+COMMENT_FTS = f'{COMMENT_TABLE}_fts'
+
+# Text search configuration and indexed expressions on PostgreSQL. The
+# queries have to use the same expressions for the indexes to be used.
+PG_CONFIG = 'simple'
+PG_TASK_VECTOR = "to_tsvector('" + PG_CONFIG + "', COALESCE({0}title, '') || ' ' || COALESCE({0}description, ''))"
+PG_COMMENT_VECTOR = "to_tsvector('" + PG_CONFIG + "', COALESCE({0}content, ''))"
+
+
+def install_index(connection):
+    """
+    Creates the full-text index of tasks and comments, or recreates it
+    with all rows. On SQLite these are FTS5 tables kept in sync by
+    triggers; on PostgreSQL GIN indexes over tsvector expressions.
+    Other databases are searched without index. Migration 0006 creates
+    the same index with its own copy of the statements.
+
+    SQLite drops the triggers when a later migration rebuilds the task
+    or comment table; check_search_triggers() reports this, and the
+    rebuild_search_index command calls this function to restore them.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for table, fts, columns in ((TASK_TABLE, TASK_FTS, ['title', 'description']),
+                                        (COMMENT_TABLE, COMMENT_FTS, ['content'])):
+                for statement in _sqlite_index_statements(table, fts, columns):
+                    cursor.execute(statement)
+        elif connection.vendor == 'postgresql':
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS task_search_idx ON {TASK_TABLE} "
+                f"USING gin ({PG_TASK_VECTOR.format('')})"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS comment_search_idx ON {COMMENT_TABLE} "
+                f"USING gin ({PG_COMMENT_VECTOR.format('')})"
+            )
+
+
+@register(Tags.database)
+def check_search_triggers(app_configs, databases=None, **kwargs):
+    """
+    Reports SQLite databases whose FTS5 tables lost their triggers, so
+    that changed tasks and comments would no longer be found. Runs with
+    'check --database' and before 'migrate'.
+    """
+    errors = []
+    for alias in databases or ():
+        connection = connections[alias]
+        if connection.vendor != 'sqlite':
+            continue
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+            names = {name for name, in cursor.fetchall()}
+        missing = [
+            f'{fts}_{suffix}' for fts in (TASK_FTS, COMMENT_FTS) if fts in names
+            for suffix in ('ai', 'ad', 'au') if f'{fts}_{suffix}' not in names
+        ]
+        if missing:
+            errors.append(Warning(
+                f"The search index of database {alias!r} is missing the triggers {', '.join(missing)}, "
+                "probably dropped when a migration rebuilt the table.",
+                hint='Run manage.py rebuild_search_index.',
+                id='kanban_app.W001',
+            ))
+    return errors
+
+
+def uninstall_index(connection):
+    """Removes the full-text index created by install_index()."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for fts in (TASK_FTS, COMMENT_FTS):
+                for suffix in ('ai', 'ad', 'au'):
+                    cursor.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+                cursor.execute(f'DROP TABLE IF EXISTS {fts}')
+        elif connection.vendor == 'postgresql':
+            cursor.execute('DROP INDEX IF EXISTS task_search_idx')
+            cursor.execute('DROP INDEX IF EXISTS comment_search_idx')
+
+
+def _sqlite_index_statements(table, fts, columns):
+    """
+    Returns the statements for an external content FTS5 table over the
+    columns of a table, its triggers and the initial fill.
+    """
+    names = ', '.join(columns)
+    new = ', '.join(f'new.{column}' for column in columns)
+    old = ', '.join(f'old.{column}' for column in columns)
+    delete = f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old});"
+    insert = f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({names}, content='{table}', "
+        f"content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        f'DROP TRIGGER IF EXISTS {fts}_ai',
+        f'DROP TRIGGER IF EXISTS {fts}_ad',
+        f'DROP TRIGGER IF EXISTS {fts}_au',
+        f'CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN {insert} END',
+        f'CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN {delete} END',
+        f'CREATE TRIGGER {fts}_au AFTER UPDATE OF {names} ON {table} BEGIN {delete} {insert} END',
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def search_tasks(user, query, limit=20):
+    """
+    Returns the tasks of the boards the user owns or is a member of whose
+    title, description or comments match all words of the query (the
+    last one as prefix), best matches first. Every task gets a 'score'
+    and a 'highlight' dict with the HTML-escaped title, description
+    snippet and matching comment snippets, matches wrapped in <mark>.
+    """
+    words = re.findall(r'\w+', query)
+    if not words:
+        return []
+
+    if connection.vendor == 'sqlite':
+        task_hits, comment_hits = _search_sqlite(user, words, limit)
+    elif connection.vendor == 'postgresql':
+        task_hits, comment_hits = _search_postgresql(user, words, limit)
+    else:
+        task_hits, comment_hits = _search_without_index(user, words, limit)
+
+    results = {}
+    for task_id, score, title, description in task_hits:
+        results[task_id] = {'score': score, 'title': title, 'description': description, 'comments': []}
+    for task_id, score, comment_id, content in comment_hits:
+        result = results.setdefault(task_id, {'score': score, 'title': None, 'description': None, 'comments': []})
+        result['score'] = max(result['score'], score)
+        if len(result['comments']) < MAX_COMMENT_HIGHLIGHTS:
+            result['comments'].append({'id': comment_id, 'content': _highlight(content)})
+
+    ranked = sorted(results.items(), key=lambda item: (-item[1]['score'], item[0]))[:limit]
+    tasks = Task.objects.filter(id__in=[task_id for task_id, _ in ranked]).with_users().with_comment_count().in_bulk()
+    found = []
+    for task_id, result in ranked:
+        task = tasks.get(task_id)
+        if task is None:
+            continue
+        task.score = result['score']
+        task.highlight = {
+            'title': _highlight(result['title']) if result['title'] is not None else html.escape(task.title),
+            'description': _highlight(result['description']) if result['description'] is not None else None,
+            'comments': result['comments'],
+        }
+        found.append(task)
+    return found
+
+
+def _accessible_boards_sql():
+    members = Board.members.through._meta.db_table
+    return (
+        f'SELECT id FROM {Board._meta.db_table} WHERE owner_id = %s '
+        f'UNION SELECT board_id FROM {members} WHERE user_id = %s'
+    )
+
+
+def _search_sqlite(user, words, limit):
+    """
+    Searches the FTS5 tables. bm25() is lower for better matches,
+    so its negation is used as score; titles weigh more than descriptions.
+    """
+    match = ' '.join(f'"{word}"' for word in words) + '*'
+    boards = _accessible_boards_sql()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT {TASK_FTS}.rowid, -bm25({TASK_FTS}, 4.0, 1.0), "
+            f"highlight({TASK_FTS}, 0, %s, %s), snippet({TASK_FTS}, 1, %s, %s, '…', 24) "
+            f"FROM {TASK_FTS} JOIN {TASK_TABLE} t ON t.id = {TASK_FTS}.rowid "
+            f"WHERE {TASK_FTS} MATCH %s AND t.board_id IN ({boards}) "
+            f"ORDER BY bm25({TASK_FTS}, 4.0, 1.0) LIMIT %s",
+            [START, STOP, START, STOP, match, user.id, user.id, limit],
+        )
+        task_hits = cursor.fetchall()
+        cursor.execute(
+            f"SELECT c.task_id, -bm25({COMMENT_FTS}), c.id, snippet({COMMENT_FTS}, 0, %s, %s, '…', 24) "
+            f"FROM {COMMENT_FTS} JOIN {COMMENT_TABLE} c ON c.id = {COMMENT_FTS}.rowid "
+            f"JOIN {TASK_TABLE} t ON t.id = c.task_id "
+            f"WHERE {COMMENT_FTS} MATCH %s AND t.board_id IN ({boards}) "
+            f"ORDER BY bm25({COMMENT_FTS}) LIMIT %s",
+            [START, STOP, match, user.id, user.id, limit * MAX_COMMENT_HIGHLIGHTS],
+        )
+        comment_hits = cursor.fetchall()
+    return task_hits, comment_hits
+
+
+def _search_postgresql(user, words, limit):
+    """
+    Searches with the GIN indexed tsvector expressions; highlights are
+    only computed for the rows of the returned page.
+    """
+    query = ' & '.join(words) + ':*'
+    boards = _accessible_boards_sql()
+    task_vector, comment_vector = PG_TASK_VECTOR.format('t.'), PG_COMMENT_VECTOR.format('c.')
+    options = f'StartSel={START}, StopSel={STOP}'
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT hit.id, hit.score, "
+            f"ts_headline('{PG_CONFIG}', hit.title, hit.query, %s), "
+            f"ts_headline('{PG_CONFIG}', hit.description, hit.query, %s) "
+            f"FROM (SELECT t.id, t.title, t.description, q.query, ts_rank({task_vector}, q.query) AS score "
+            f"FROM {TASK_TABLE} t, to_tsquery('{PG_CONFIG}', %s) AS q(query) "
+            f"WHERE {task_vector} @@ q.query AND t.board_id IN ({boards}) "
+            f"ORDER BY score DESC LIMIT %s) AS hit",
+            [options + ', HighlightAll=true', options + ', MaxFragments=2', query, user.id, user.id, limit],
+        )
+        task_hits = cursor.fetchall()
+        cursor.execute(
+            f"SELECT hit.task_id, hit.score, hit.id, ts_headline('{PG_CONFIG}', hit.content, hit.query, %s) "
+            f"FROM (SELECT c.id, c.task_id, c.content, q.query, ts_rank({comment_vector}, q.query) AS score "
+            f"FROM {COMMENT_TABLE} c JOIN {TASK_TABLE} t ON t.id = c.task_id, to_tsquery('{PG_CONFIG}', %s) AS q(query) "
+            f"WHERE {comment_vector} @@ q.query AND t.board_id IN ({boards}) "
+            f"ORDER BY score DESC LIMIT %s) AS hit",
+            [options + ', MaxFragments=2', query, user.id, user.id, limit * MAX_COMMENT_HIGHLIGHTS],
+        )
+        comment_hits = cursor.fetchall()
+    return task_hits, comment_hits
+
+
+def _search_without_index(user, words, limit):
+    """Fallback for other databases: case-insensitive substring search."""
+    tasks = Task.objects.filter(board__in=Board.objects.for_user(user))
+    comments = Comment.objects.filter(task__in=tasks)
+    for word in words:
+        tasks = tasks.filter(Q(title__icontains=word) | Q(description__icontains=word))
+        comments = comments.filter(content__icontains=word)
+    pattern = re.compile('|'.join(re.escape(word) for word in words), re.IGNORECASE)
+    mark = lambda text: pattern.sub(lambda match: START + match.group() + STOP, text)
+    task_hits = [(task_id, 1.0, mark(title), mark(description))
+                 for task_id, title, description in tasks.values_list('id', 'title', 'description')[:limit]]
+    comment_hits = [(task_id, 1.0, comment_id, mark(content))
+                    for task_id, comment_id, content in comments.values_list('task_id', 'id', 'content')[:limit]]
+    return task_hits, comment_hits
+
+
+def _highlight(text):
+    """HTML-escapes a text and turns the match markers into <mark> tags."""
+    return html.escape(text).replace(START, '<mark>').replace(STOP, '</mark>')
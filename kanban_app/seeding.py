@@ -0,0 +1,130 @@
+import datetime
+import itertools
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from kanban_app.models import Board, BoardStats, Comment, Task
+from kanban_app.ranking import assign_ranks
+
+# Rows written to the database at a time.
+BATCH_SIZE = 1000
+
+# Password of all seeded users.
+DEFAULT_PASSWORD = 'seed-password'
+
+FIRST_NAMES = ['Anna', 'Ben', 'Clara', 'David', 'Emma', 'Felix', 'Greta', 'Jörg', 'Lena', 'Noah', '']
+LAST_NAMES = ['Müller', 'Schmidt', 'Weber', 'Fischer', 'Wagner', 'Becker', 'Hoffmann', '']
+WORDS = [
+    'login', 'page', 'fix', 'deploy', 'review', 'database', 'migration', 'api', 'cache', 'design',
+    'invoice', 'export', 'search', 'mobile', 'layout', 'release', 'test', 'docs', 'refactor', 'bug',
+]
+
+# Weights of the choices of new tasks; most tasks of a board are done.
+STATUS_WEIGHTS = {'to_do': 3, 'progress': 2, 'review': 1, 'done': 5}
+PRIORITY_WEIGHTS = {'low': 3, 'medium': 5, 'high': 2}
+
+
+def skewed_choices(rng, population, k, skew):
+    """
+    Returns k random elements of the population where the element at
+    rank r is chosen with a weight of 1 / (r + 1) ** skew (Zipf's law),
+    so the first elements are picked far more often. A skew of 0 picks
+    uniformly.
+    """
+    weights = itertools.accumulate(1 / (rank + 1) ** skew for rank in range(len(population)))
+    return rng.choices(population, cum_weights=list(weights), k=k)
+
+
+def seed(users=100, boards=20, tasks=10000, comments=20000, skew=1.0, prefix='seed',
+         password=DEFAULT_PASSWORD, random_seed=0):
+    """
+    Creates users, boards, tasks and comments with a realistic skew:
+    a few users own most boards, a few boards have most members and
+    tasks, a few members get most of the tasks of a board and a few
+    tasks get most comments. The boards, tasks and users are ordered
+    from the most to the least active, e.g. boards[0] is the largest
+    board and tasks[0] the task with the most comments.
+
+    Users are named '<prefix>-<n>@example.com' with the given password.
+    The rows are bulk created in one transaction, so the signal handlers
+    do not run; the board stats are rebuilt at the end.
+    Returns a dict with the lists of created users, boards and tasks
+    and the number of comments.
+    """
+    rng = random.Random(random_seed)
+    start = User.objects.filter(username__startswith=f'{prefix}-').count()
+    password = make_password(password)
+
+    with transaction.atomic():
+        created_users = User.objects.bulk_create(
+            (User(
+                username=f'{prefix}-{start + i}@example.com',
+                email=f'{prefix}-{start + i}@example.com',
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                password=password,
+            ) for i in range(users)),
+            batch_size=BATCH_SIZE,
+        )
+
+        owners = skewed_choices(rng, created_users, boards, skew)
+        created_boards = Board.objects.bulk_create(
+            (Board(title=f'{rng.choice(WORDS).title()} board {i}', owner=owner) for i, owner in enumerate(owners)),
+            batch_size=BATCH_SIZE,
+        )
+
+        max_members = min(users, 50)
+        board_members = {}
+        for rank, board in enumerate(created_boards):
+            size = max(2, round(max_members / (rank + 1) ** skew))
+            members = {board.owner, *skewed_choices(rng, created_users, size, skew)}
+            board_members[board.id] = sorted(members, key=lambda user: user.id)
+        Board.members.through.objects.bulk_create(
+            (Board.members.through(board_id=board_id, user=user)
+             for board_id, members in board_members.items() for user in members),
+            batch_size=BATCH_SIZE,
+        )
+
+        today = datetime.date.today()
+        statuses, status_weights = zip(*STATUS_WEIGHTS.items())
+        priorities, priority_weights = zip(*PRIORITY_WEIGHTS.items())
+        new_tasks = []
+        for board in skewed_choices(rng, created_boards, tasks, skew):
+            members = board_members[board.id]
+            assignee, reviewer = skewed_choices(rng, members, 2, skew)
+            new_tasks.append(Task(
+                board=board,
+                title=' '.join(rng.sample(WORDS, 3)).capitalize()[:30],
+                description=' '.join(rng.choices(WORDS, k=rng.randint(0, 30))),
+                status=rng.choices(statuses, status_weights)[0],
+                priority=rng.choices(priorities, priority_weights)[0],
+                due_date=today + datetime.timedelta(days=rng.randint(-60, 120)),
+                assignee=assignee,
+                reviewer=reviewer,
+                owner=rng.choice(members),
+            ))
+        assign_ranks(new_tasks)
+        created_tasks = Task.objects.bulk_create(new_tasks, batch_size=BATCH_SIZE)
+        rng.shuffle(created_tasks)
+
+        now = timezone.now()
+        commented_tasks = skewed_choices(rng, created_tasks, comments, skew)
+        for offset in range(0, comments, BATCH_SIZE):
+            batch = commented_tasks[offset:offset + BATCH_SIZE]
+            new_comments = [
+                Comment(task=task, author=rng.choice(board_members[task.board_id]), content=' '.join(rng.choices(WORDS, k=8)))
+                for task in batch
+            ]
+            Comment.objects.bulk_create(new_comments)
+            # created_at is set on insert; spread the comments over the last 90 days.
+            for comment in new_comments:
+                comment.created_at = now - datetime.timedelta(seconds=rng.randint(0, 90 * 24 * 3600))
+            Comment.objects.bulk_update(new_comments, ['created_at'])
+
+        BoardStats.rebuild(Board.objects.filter(id__in=[board.id for board in created_boards]))
+
+    return {'users': created_users, 'boards': created_boards, 'tasks': created_tasks, 'comments': comments}
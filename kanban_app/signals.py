@@ -0,0 +1,379 @@
+from django.contrib.auth.models import User
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from kanban_app.changelog import (
+    member_user_ids, record_changes, record_comment_change, record_member_changes, record_task_changes,
+)
+from kanban_app.membership import invalidate_board_access
+from kanban_app.models import Board, BoardChange, BoardStats, Comment, Task
+from kanban_app.ranking import next_rank
+from kanban_app.versioning import board_version, bump_task_versions, bump_versions
+
+BoardMembership = Board.members.through
+
+# Fields of users shown in the responses of their boards and tasks.
+LISTED_USER_FIELDS = ('email', 'first_name', 'last_name')
+
+
+@receiver(post_save, sender=Board)
+def create_board_stats(sender, instance, created, raw=False, **kwargs):
+    """Creates the empty stats row of a new board."""
+    if created and not raw:
+        BoardStats.objects.create(board=instance)
+
+
+@receiver(post_save, sender=Board)
+@receiver(post_delete, sender=Board)
+def invalidate_board_access_on_board_change(sender, instance, created=False, **kwargs):
+    """Drops the cached owner and members of a changed or deleted board."""
+    if not created:
+        invalidate_board_access(instance.pk)
+
+
+@receiver(m2m_changed, sender=BoardMembership)
+def invalidate_board_access_on_members_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Drops the cached members of boards whose memberships changed."""
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        invalidate_board_access(instance.pk)
+    elif pk_set:
+        for board_id in pk_set:
+            invalidate_board_access(board_id)
+    else:
+        invalidate_board_access()
+
+
+@receiver(pre_save, sender=Task)
+def rank_task(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Appends new tasks, and tasks saved completely after they were moved
+    to another board or status column, to the end of their column.
+    Saves with update_fields set the rank explicitly if they include
+    'rank' (as move_task() does) and are only ranked without one.
+    """
+    if raw or (update_fields is not None and 'rank' not in update_fields):
+        return
+
+    column_state = getattr(instance, '_column_state', None)
+    moved = column_state is not None and column_state != (instance.board_id, instance.status)
+    if instance.rank is None or (moved and update_fields is None):
+        instance.rank = next_rank(instance.board_id, instance.status)
+
+
+@receiver(post_save, sender=Task)
+def apply_task_save(sender, instance, created, raw=False, **kwargs):
+    """Updates the counters, versions and change log of a saved task."""
+    if not raw:
+        apply_saved_tasks([instance], created)
+
+
+@receiver(post_delete, sender=Task)
+def update_board_stats_on_task_delete(sender, instance, **kwargs):
+    """Removes the deleted task from the counters of its board."""
+    BoardStats.apply_task_states([instance.stats_state()], -1)
+
+
+@receiver(m2m_changed, sender=BoardMembership)
+def remember_removed_memberships(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    For remove(), pk_set holds every given ID, including those without
+    a membership, so the memberships that will actually be deleted are
+    looked up before the deletion (see changed_pks()).
+    """
+    if action != 'pre_remove':
+        return
+    if reverse:
+        rows = BoardMembership.objects.filter(user=instance, board_id__in=pk_set).values_list('board_id', flat=True)
+    else:
+        rows = BoardMembership.objects.filter(board=instance, user_id__in=pk_set).values_list('user_id', flat=True)
+    instance._removed_membership_pks = set(rows)
+
+
+@receiver(m2m_changed, sender=BoardMembership)
+def update_board_stats_on_members_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Updates the member count when memberships are added, removed or cleared,
+    from the board side (board.members) as well as from the user side
+    (user.member_boards). For add, pk_set only contains the rows that were
+    actually inserted; for remove, the deleted rows come from changed_pks().
+    """
+    pk_set = changed_pks(instance, action, pk_set)
+    if action in ('post_add', 'post_remove') and pk_set:
+        sign = 1 if action == 'post_add' else -1
+        if reverse:
+            for board_id in pk_set:
+                BoardStats.apply(board_id, member_count=sign)
+        else:
+            BoardStats.apply(instance.pk, member_count=sign * len(pk_set))
+    elif action == 'pre_clear':
+        if reverse:
+            remove_memberships_of_user(instance)
+        else:
+            BoardStats.objects.filter(board_id=instance.pk).update(member_count=0)
+
+
+@receiver(pre_delete, sender=User)
+def update_board_stats_on_user_delete(sender, instance, **kwargs):
+    """
+    Memberships of a deleted user are removed by the cascade, which sends
+    no m2m_changed signal, so they are subtracted here. pre_delete runs in
+    the same transaction as the deletion.
+    """
+    remove_memberships_of_user(instance)
+    invalidate_board_access()
+    bump_versions_showing_user(instance)
+
+
+@receiver(post_delete, sender=Task)
+def bump_versions_on_task_delete(sender, instance, **kwargs):
+    """Bumps the versions of the deleted task's board and task lists."""
+    user_ids = [instance.assignee_id, instance.reviewer_id, *getattr(instance, '_user_state', ())]
+    bump_task_versions(board_ids=[instance.board_id], user_ids=user_ids)
+
+
+@receiver(post_save, sender=Task)
+def remember_saved_task_state(sender, instance, update_fields=None, **kwargs):
+    """
+    Remembers the saved state for the next save of the same instance.
+    Connected last, so the receivers above still see the previous state.
+    """
+    remember_task_state(instance, update_fields)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_versions_on_comment_change(sender, instance, created=False, raw=False, **kwargs):
+    """
+    Bumps the versions of the responses showing the comment count of the
+    task: its board and the task lists of its assignee and reviewer.
+    Edited comments do not change the count.
+    """
+    if raw or (kwargs['signal'] is post_save and not created):
+        return
+    if Comment.task.is_cached(instance):
+        task = instance.task
+        board_id, assignee_id, reviewer_id = task.board_id, task.assignee_id, task.reviewer_id
+    else:
+        row = Task.objects.filter(pk=instance.task_id).values_list('board_id', 'assignee_id', 'reviewer_id').first()
+        if row is None:
+            return
+        board_id, assignee_id, reviewer_id = row
+    bump_task_versions(board_ids=[board_id], user_ids=[assignee_id, reviewer_id])
+
+
+@receiver(post_save, sender=Board)
+@receiver(post_delete, sender=Board)
+def bump_version_on_board_change(sender, instance, created=False, raw=False, **kwargs):
+    """Bumps the version of a changed or deleted board."""
+    if not created and not raw:
+        bump_versions([board_version(instance.pk)])
+
+
+@receiver(m2m_changed, sender=BoardMembership)
+def bump_versions_on_members_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Bumps the versions of boards whose members changed."""
+    if action == 'pre_clear' and reverse:
+        board_ids = BoardMembership.objects.filter(user=instance).values_list('board_id', flat=True)
+        bump_versions([board_version(board_id) for board_id in board_ids])
+    elif not action.startswith('post_'):
+        return
+    elif not reverse:
+        bump_versions([board_version(instance.pk)])
+    elif pk_set:
+        bump_versions([board_version(board_id) for board_id in pk_set])
+
+
+@receiver(pre_save, sender=User)
+def remember_listed_user_change(sender, instance, raw=False, update_fields=None, using=None, **kwargs):
+    """
+    Remembers whether the save of an existing user changes one of the
+    LISTED_USER_FIELDS, so that e.g. logins, which only save last_login,
+    neither bump versions nor fill the change logs.
+    """
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not set(update_fields) & set(LISTED_USER_FIELDS):
+        instance._listed_user_changed = False
+        return
+    stored = User.objects.using(using).filter(pk=instance.pk).values_list(*LISTED_USER_FIELDS).first()
+    instance._listed_user_changed = stored != tuple(getattr(instance, name) for name in LISTED_USER_FIELDS)
+
+
+@receiver(post_save, sender=User)
+def bump_user_versions(sender, instance, created, raw=False, **kwargs):
+    """
+    Bumps the versions of the responses showing the changed name or
+    email of the user (see bump_versions_showing_user()). Deleted users
+    are handled by update_board_stats_on_user_delete.
+    """
+    if not created and not raw and getattr(instance, '_listed_user_changed', True):
+        bump_versions_showing_user(instance)
+
+
+@receiver(post_delete, sender=Task)
+def log_task_delete(sender, instance, origin=None, **kwargs):
+    """Appends a deleted task to the change log of its board."""
+    if not deleted_with(origin, Board):
+        record_changes(instance.board_id, 'task', [instance.pk], deleted=True)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def log_comment_change(sender, instance, raw=False, origin=None, **kwargs):
+    """
+    Appends a changed or deleted comment and its task, whose comment
+    count changed, to the change log of the board. Comments deleted
+    together with their task or board are covered by that deletion.
+    """
+    if raw or deleted_with(origin, Board, Task):
+        return
+    if Comment.task.is_cached(instance):
+        board_id = instance.task.board_id
+    else:
+        board_id = Task.objects.filter(pk=instance.task_id).values_list('board_id', flat=True).first()
+        if board_id is None:
+            return
+    record_comment_change(board_id, instance.pk, instance.task_id, deleted=kwargs['signal'] is post_delete)
+
+
+@receiver(post_save, sender=Board)
+def log_board_change(sender, instance, created, raw=False, **kwargs):
+    """Appends a changed board (e.g. its title) to its change log."""
+    if not created and not raw:
+        record_changes(instance.pk, 'board', [instance.pk])
+
+
+@receiver(post_delete, sender=Board)
+def delete_board_changes(sender, instance, **kwargs):
+    """
+    Removes the change log of a deleted board, including the entries
+    written while its tasks were deleted by the cascade.
+    """
+    BoardChange.objects.filter(board_id=instance.pk).delete()
+
+
+@receiver(m2m_changed, sender=BoardMembership)
+def log_members_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Appends added and removed members to the change log of the board."""
+    pk_set = changed_pks(instance, action, pk_set)
+    if action in ('post_add', 'post_remove') and pk_set:
+        deleted = action == 'post_remove'
+        if reverse:
+            for board_id in pk_set:
+                record_changes(board_id, 'member', [instance.pk], deleted=deleted)
+        else:
+            record_changes(instance.pk, 'member', pk_set, deleted=deleted)
+    elif action == 'pre_clear':
+        if reverse:
+            record_member_changes(instance, deleted=True)
+        else:
+            record_changes(instance.pk, 'member', member_user_ids(instance), deleted=True)
+
+
+@receiver(post_save, sender=User)
+def log_user_change(sender, instance, created, raw=False, **kwargs):
+    """Appends a changed user to the change log of all their boards."""
+    if not created and not raw and getattr(instance, '_listed_user_changed', True):
+        record_member_changes(instance)
+
+
+@receiver(pre_delete, sender=User)
+def log_user_delete(sender, instance, **kwargs):
+    """Appends the removal of a deleted user to the logs of their boards."""
+    record_member_changes(instance, deleted=True)
+
+
+def apply_saved_tasks(tasks, created=False):
+    """
+    Applies the saves of the tasks to the counters of their boards
+    (by the difference to the state remembered when they were loaded
+    or last saved, see Task.from_db()), to the change log and to the
+    versions of their boards and task lists. Saves that change none of
+    the listed fields (e.g. only the owner) keep the versions.
+
+    Called by apply_task_save() for every saved task. bulk_create() and
+    bulk_update() send no signals; their callers call this and then
+    remember_task_state() for every task.
+    """
+    removed, added, unknown_board_ids = [], [], set()
+    board_ids, user_ids = set(), set()
+    for task in tasks:
+        state = task.stats_state()
+        if created:
+            added.append(state)
+        elif not hasattr(task, '_stats_state'):
+            unknown_board_ids.add(task.board_id)
+        elif task._stats_state != state:
+            removed.append(task._stats_state)
+            added.append(state)
+        if created or getattr(task, '_listed_state', None) != task.listed_state():
+            board_ids.add(task.board_id)
+            user_ids.update((task.assignee_id, task.reviewer_id, *getattr(task, '_user_state', ())))
+
+    BoardStats.apply_task_states(removed, -1)
+    BoardStats.apply_task_states(added, 1)
+    if unknown_board_ids:
+        BoardStats.rebuild(Board.objects.filter(id__in=unknown_board_ids))
+    record_task_changes(tasks)
+    bump_task_versions(board_ids=board_ids, user_ids=user_ids)
+
+
+def remember_task_state(task, update_fields=None):
+    """
+    Remembers the saved state of the task for its next save. After a
+    save of some fields only, the listed fields in the database are
+    unknown, so the next save bumps the versions in any case.
+    """
+    task._stats_state = task.stats_state()
+    task._column_state = (task.board_id, task.status)
+    task._user_state = (task.assignee_id, task.reviewer_id)
+    if update_fields is None:
+        task._listed_state = task.listed_state()
+    else:
+        task.__dict__.pop('_listed_state', None)
+
+
+def deleted_with(origin, *models):
+    """
+    Returns True if the deletion started at an instance or queryset
+    of one of the models, e.g. a task deleted with its board.
+    """
+    if origin is None:
+        return False
+    return getattr(origin, 'model', type(origin)) in models
+
+
+def changed_pks(instance, action, pk_set):
+    """
+    Returns the IDs of the memberships changed by an m2m_changed action:
+    pk_set, or for post_remove the memberships that actually existed.
+    """
+    if action == 'post_remove':
+        return getattr(instance, '_removed_membership_pks', pk_set)
+    return pk_set
+
+
+def bump_versions_showing_user(user):
+    """
+    Bumps the versions of the responses that show the user: the boards
+    the user owns, is a member of or has tasks on, and the task lists of
+    everyone sharing a task with the user. Responses of other boards and
+    users keep their versions.
+    """
+    board_ids = set(Board.objects.filter(owner=user).values_list('id', flat=True))
+    board_ids.update(BoardMembership.objects.filter(user=user).values_list('board_id', flat=True))
+    user_ids = {user.pk}
+    tasks = Task.objects.filter(Q(assignee=user) | Q(reviewer=user))
+    for board_id, assignee_id, reviewer_id in tasks.values_list('board_id', 'assignee_id', 'reviewer_id'):
+        board_ids.add(board_id)
+        user_ids.update((assignee_id, reviewer_id))
+    bump_task_versions(board_ids, user_ids)
+
+
+def remove_memberships_of_user(user):
+    """Subtracts the user from the member count of all their boards."""
+    for board_id in BoardMembership.objects.filter(user=user).values_list('board_id', flat=True):
+        BoardStats.apply(board_id, member_count=-1)
@@ -1,3 +1,854 @@
-from django.test import TestCase
+import datetime
+import json
+import os
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.http import HttpResponse
+from django.test import AsyncClient, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from core import instrumentation, replicas
+from core.cache import check_shared_caches, local_cache_settings, shared_cache_aliases
+from core.database import database_settings, replica_settings
+from core.instrumentation import RequestTimings
+from core.replicas import ReplicaRouter, RequestRouting
+from core.testing import IsolatedTestCase
+from kanban_app.api.event_stream import redeem_ticket
+from kanban_app.api.pagination import TaskKeysetPagination
+from kanban_app.api.serializer import BoardSerializer
+from kanban_app.benchmark import BenchmarkContext, get_endpoints, percentile, run
+from kanban_app.changelog import get_changes, latest_cursor
+from kanban_app.management.commands import check_fast_serializers, check_query_plans
+from kanban_app.membership import BoardAccessCache, board_access_cache, get_board_access
+from kanban_app.models import Board, BoardChange, BoardStats, Comment, Task
+from kanban_app.search import check_search_triggers, install_index, search_tasks
+from kanban_app.seeding import seed
+from kanban_app.versioning import board_version, conditional_get, get_versions, user_version
+
+
+def create_user(name):
+    return User.objects.create_user(username=name, email=f'{name}@example.com', password='pw', first_name=name.title())
+
+
+def create_task(board, **fields):
+    defaults = {
+        'title': 'Task', 'priority': 'medium', 'status': 'to_do',
+        'due_date': datetime.date(2026, 1, 1), 'owner': board.owner,
+    }
+    return Task.objects.create(board=board, **{**defaults, **fields})
+
+
+def ndjson(*records):
+    return ''.join(json.dumps(record) + '\n' for record in records)
+
+
+class BoardImportTests(IsolatedTestCase):
+    """Imports through the API must not act in the name of other users."""
+
+    def setUp(self):
+        super().setUp()
+        self.importer = create_user('importer')
+        self.member = create_user('member')
+        self.outsider = create_user('outsider')
+        self.client = APIClient()
+        self.client.force_authenticate(self.importer)
+
+    def export(self, *records):
+        return ndjson(
+            {'type': 'board', 'format': 1, 'id': 1, 'title': 'Imported', 'owner': 10},
+            {'type': 'user', 'id': 10, 'email': 'OUTSIDER@example.com'},
+            {'type': 'user', 'id': 11, 'email': 'member@example.com'},
+            {'type': 'member', 'user': 11},
+            *records,
+        )
+
+    def task(self, **fields):
+        return {
+            'type': 'task', 'id': 1, 'title': 'T', 'description': '', 'priority': 'low', 'status': 'to_do',
+            'due_date': '2026-01-01', 'assignee_id': 11, 'reviewer_id': 11, 'owner_id': 10, 'rank': None,
+            **fields,
+        }
+
+    def post(self, body):
+        return self.client.post('/api/boards/import/', data=body, content_type='application/x-ndjson')
+
+    def test_tasks_and_comments_are_credited_to_the_importer(self):
+        comment = {'type': 'comment', 'id': 1, 'task_id': 1, 'author_id': 10, 'content': 'Hi', 'created_at': '2001-01-01T00:00:00+00:00'}
+        response = self.post(self.export(self.task(), comment))
+
+        self.assertEqual(response.status_code, 201, response.content)
+        board = Board.objects.get(pk=response.json()['id'])
+        self.assertEqual(board.owner, self.importer)
+        task = board.tasks.get()
+        self.assertEqual((task.owner, task.assignee), (self.importer, self.member))
+        comment = Comment.objects.get(task=task)
+        self.assertEqual(comment.author, self.importer)
+        self.assertGreater(comment.created_at.year, 2001)
+
+    def test_non_member_assignees_and_reviewers_are_rejected(self):
+        for field in ('assignee_id', 'reviewer_id'):
+            response = self.post(self.export(self.task(**{field: 10})))
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('not a member', response.json()['error'])
+        self.assertFalse(Board.objects.filter(title='Imported').exists())
+
+    def test_emails_are_matched_ignoring_case(self):
+        response = self.post(self.export())
+        self.assertEqual(response.status_code, 201, response.content)
+
+    @override_settings(BOARD_IMPORT_MAX_BYTES=200)
+    def test_body_size_is_capped(self):
+        response = self.post(self.export(*(self.task(id=number) for number in range(1, 5))))
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(Board.objects.filter(title='Imported').exists())
+
+
+class TaskRankTests(IsolatedTestCase):
+    """Moved tasks keep the rank computed for them."""
+
+    def setUp(self):
+        super().setUp()
+        self.owner = create_user('owner')
+        self.board = Board.objects.create(title='Board', owner=self.owner)
+        self.board.members.add(self.owner)
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def create_task(self, title, status):
+        return create_task(self.board, title=title, status=status, assignee=self.owner, reviewer=self.owner)
+
+    def test_move_keeps_a_rank_equal_to_the_previous_one(self):
+        b = self.create_task('B', 'progress')
+        c = self.create_task('C', 'progress')
+        a = self.create_task('A', 'to_do')
+        self.assertEqual(a.rank, b.rank)
+        b.delete()
+
+        response = self.client.patch(f'/api/tasks/{a.pk}/move/', {'status': 'progress', 'before': c.pk}, format='json')
+
+        self.assertEqual(response.status_code, 200, response.content)
+        a.refresh_from_db()
+        self.assertLess(a.rank, c.rank)
+
+    def test_status_change_appends_to_the_new_column(self):
+        first = self.create_task('First', 'progress')
+        task = self.create_task('Task', 'to_do')
+
+        response = self.client.patch(f'/api/tasks/{task.pk}/', {'status': 'progress'}, format='json')
+
+        self.assertEqual(response.status_code, 200, response.content)
+        task.refresh_from_db()
+        self.assertGreater(task.rank, first.rank)
+
+
+class MembershipSignalTests(IsolatedTestCase):
+    """Member counts and change logs only follow memberships that changed."""
+
+    def setUp(self):
+        super().setUp()
+        self.owner = create_user('owner')
+        self.member = create_user('member')
+        self.outsider = create_user('outsider')
+        self.board = Board.objects.create(title='Board', owner=self.owner)
+        self.board.members.add(self.member)
+
+    def member_count(self):
+        return BoardStats.objects.get(board=self.board).member_count
+
+    def test_removing_non_members_keeps_the_count(self):
+        self.board.members.remove(self.outsider)
+        self.board.members.remove(self.outsider)
+        self.outsider.member_boards.remove(self.board)
+
+        self.assertEqual(self.member_count(), 1)
+        self.assertFalse(BoardChange.objects.filter(kind='member', object_id=self.outsider.pk).exists())
+
+    def test_removing_members_updates_the_count(self):
+        self.board.members.remove(self.member, self.outsider)
+
+        self.assertEqual(self.member_count(), 0)
+        self.assertTrue(BoardChange.objects.filter(kind='member', object_id=self.member.pk, deleted=True).exists())
+
+
+class BoardQueryCountTests(IsolatedTestCase):
+    """Board list and detail run the same queries for any number of boards and tasks."""
+
+    def setUp(self):
+        super().setUp()
+        self.owner = create_user('owner')
+        self.member = create_user('member')
+        self.board = Board.objects.create(title='Board', owner=self.owner)
+        self.board.members.add(self.member)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.create(user=self.owner).key)
+        self.client.get('/api/boards/')
+
+    def count_queries(self, path):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path, {'format': 'json'})
+        self.assertEqual(response.status_code, 200)
+        return response.json(), len(queries)
+
+    def add_tasks(self, board, count):
+        for _ in range(count):
+            task = create_task(board, priority='high', assignee=self.member, reviewer=self.owner)
+            Comment.objects.create(task=task, author=self.member, content='Hi')
+
+    def test_board_list_counts_without_queries_per_board(self):
+        self.add_tasks(self.board, 1)
+        _, one_board = self.count_queries('/api/boards/')
+
+        for number in range(5):
+            board = Board.objects.create(title=f'Board {number}', owner=self.owner)
+            board.members.add(self.member)
+            self.add_tasks(board, 2)
+        boards, six_boards = self.count_queries('/api/boards/')
+
+        self.assertEqual(six_boards, one_board)
+        self.assertEqual(
+            [(board['member_count'], board['ticket_count'], board['tasks_to_do_count'], board['tasks_high_prio_count'])
+             for board in boards],
+            [(1, 1, 1, 1)] + [(1, 2, 2, 2)] * 5,
+        )
+
+    def test_board_detail_runs_a_fixed_number_of_queries(self):
+        path = f'/api/boards/{self.board.pk}/'
+        self.client.get(path)
+        self.add_tasks(self.board, 1)
+        _, one_task = self.count_queries(path)
+
+        self.add_tasks(self.board, 10)
+        board, eleven_tasks = self.count_queries(path)
+
+        self.assertEqual(eleven_tasks, one_task)
+        self.assertEqual(len(board['tasks']), 11)
+        self.assertEqual({task['comments_count'] for task in board['tasks']}, {1})
+        self.assertEqual({task['assignee']['id'] for task in board['tasks']}, {self.member.pk})
+
+
+class MembershipCacheTests(IsolatedTestCase):
+    """Board access is cached per process, expires and follows membership changes."""
+
+    def setUp(self):
+        super().setUp()
+        board_access_cache.clear()
+        self.owner = create_user('owner')
+        self.member = create_user('member')
+        self.board = Board.objects.create(title='Board', owner=self.owner)
+        self.board.members.add(self.member)
+
+    def test_access_is_loaded_once_and_memoized_on_the_request(self):
+        request = RequestFactory().get('/')
+        with self.assertNumQueries(1):
+            access = get_board_access(self.board.pk, request)
+            self.assertIs(get_board_access(self.board.pk, request), access)
+        with self.assertNumQueries(0):
+            self.assertTrue(get_board_access(self.board.pk).is_member(self.member.pk))
+        self.assertTrue(access.is_member_or_owner(self.owner.pk))
+        self.assertFalse(access.is_member(self.owner.pk))
+
+    def test_entries_expire_after_the_ttl(self):
+        cache = BoardAccessCache(maxsize=10, ttl=30)
+        with mock.patch('kanban_app.membership.time.monotonic', return_value=100):
+            cache.set(1, 'access')
+        with mock.patch('kanban_app.membership.time.monotonic', return_value=129):
+            self.assertEqual(cache.get(1), 'access')
+        with mock.patch('kanban_app.membership.time.monotonic', return_value=131):
+            self.assertIsNone(cache.get(1))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = BoardAccessCache(maxsize=2, ttl=30)
+        cache.set(1, 'first')
+        cache.set(2, 'second')
+        cache.get(1)
+        cache.set(3, 'third')
+
+        self.assertEqual([cache.get(1), cache.get(2), cache.get(3)], ['first', None, 'third'])
+
+    def test_membership_and_owner_changes_invalidate_the_entry(self):
+        outsider = create_user('outsider')
+        get_board_access(self.board.pk)
+
+        self.board.members.add(outsider)
+        self.assertTrue(get_board_access(self.board.pk).is_member(outsider.pk))
+
+        outsider.member_boards.remove(self.board)
+        self.assertFalse(get_board_access(self.board.pk).is_member(outsider.pk))
+
+        self.board.owner = outsider
+        self.board.save()
+        self.assertEqual(get_board_access(self.board.pk).owner_id, outsider.pk)
+
+
+class TaskBulkTests(IsolatedTestCase):
+    """Bulk requests save all items or none, with the effects of single saves."""
+
+    def setUp(self):
+        super().setUp()
+        self.owner = create_user('owner')
+        self.member = create_user('member')
+        self.board = Board.objects.create(title='Board', owner=self.owner)
+        self.board.members.add(self.owner, self.member)
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def item(self, **fields):
+        return {
+            'board': self.board.pk, 'title': 'Bulk', 'priority': 'low', 'status': 'to_do',
+            'due_date': '2026-01-01', 'assignee_id': self.member.pk, 'reviewer_id': self.owner.pk, **fields,
+        }
+
+    def stats(self):
+        stats = BoardStats.objects.get(board=self.board)
+        return stats.ticket_count, stats.tasks_to_do_count, stats.tasks_high_prio_count
+
+    def test_create_counts_logs_and_ranks_the_tasks(self):
+        versions = get_versions([board_version(self.board.pk), user_version(self.member.pk)])
+
+        response = self.client.post('/api/tasks/bulk/', [self.item(), self.item(priority='high')], format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.stats(), (2, 2, 1))
+        self.assertEqual(BoardChange.objects.filter(kind='task').count(), 2)
+        first, second = Task.objects.order_by('id').values_list('rank', flat=True)
+        self.assertLess(first, second)
+        self.assertNotEqual(get_versions([board_version(self.board.pk), user_version(self.member.pk)]), versions)
+
+    def test_invalid_item_saves_nothing(self):
+        response = self.client.post('/api/tasks/bulk/', [self.item(), self.item(assignee_id=0)], format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()[1], {'assignee_id': ['Must be a member of the board.']})
+        self.assertFalse(Task.objects.exists())
+        self.assertEqual(self.stats(), (0, 0, 0))
+
+    def test_update_applies_the_differences(self):
+        task = create_task(self.board, assignee=self.member, reviewer=self.owner)
+        other = create_task(self.board, assignee=self.member, reviewer=self.owner)
+        BoardChange.objects.all().delete()
+
+        response = self.client.patch('/api/tasks/bulk/', [
+            {'id': task.pk, 'status': 'done'}, {'id': other.pk, 'priority': 'high'},
+        ], format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.stats(), (2, 1, 1))
+        self.assertEqual(set(BoardChange.objects.values_list('object_id', flat=True)), {task.pk, other.pk})
+
+    def test_update_of_a_task_of_a_deleted_board_is_rejected(self):
+        task = create_task(self.board, assignee=self.member, reviewer=self.owner)
+
+        with mock.patch('kanban_app.api.serializer.get_board_access', return_value=None):
+            response = self.client.patch('/api/tasks/bulk/', [{'id': task.pk, 'title': 'Gone'}], format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), [{'id': ['Task not found.']}])
+
+
+class UserChangeSignalTests(IsolatedTestCase):
+    """Only changes of listed user fields bump the versions of the responses showing the user."""
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_user('member')
+        self.colleague = create_user('colleague')
+        self.board = Board.objects.create(title='Board', owner=self.user)
+        self.board.members.add(self.user, self.colleague)
+        create_task(self.board, assignee=self.colleague, reviewer=self.user)
+        self.outsider = create_user('outsider')
+        self.other_board = Board.objects.create(title='Other', owner=self.outsider)
+        create_task(self.other_board, assignee=self.outsider, reviewer=self.outsider)
+
+    def versions(self, board, user):
+        return get_versions([board_version(board.pk), user_version(user.pk)])
+
+    def test_login_keeps_the_versions(self):
+        before = self.versions(self.board, self.user)
+        changes = BoardChange.objects.count()
+
+        self.client.login(username='member', password='pw')
+        self.user.refresh_from_db()
+        self.user.save()
+
+        self.assertEqual(self.versions(self.board, self.user), before)
+        self.assertEqual(BoardChange.objects.count(), changes)
+
+    def test_changed_name_bumps_the_versions_showing_the_user(self):
+        before = self.versions(self.board, self.colleague)
+        unrelated = self.versions(self.other_board, self.outsider)
+
+        self.user.first_name = 'Renamed'
+        self.user.save()
+
+        self.assertNotEqual(self.versions(self.board, self.colleague), before)
+        self.assertEqual(self.versions(self.other_board, self.outsider), unrelated)
+        self.assertTrue(BoardChange.objects.filter(kind='member', object_id=self.user.pk, deleted=False).exists())
+
+
+class SharedCacheCheckTests(IsolatedTestCase):
+    """Version stamps need caches that every worker process sees, cached responses may be per process."""
+
+    def test_process_local_version_cache_is_reported(self):
+        local = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+        with override_settings(CACHES={'default': local, 'versions': local, 'responses': local, 'shared': local}):
+            errors = check_shared_caches(None)
+            expected = ['core.E001'] * len(shared_cache_aliases())
+        self.assertEqual([error.id for error in errors], expected)
+
+    def test_shared_caches_pass(self):
+        local = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+        shared = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': '/nonexistent'}
+        with override_settings(CACHES={'default': local, 'versions': shared, 'responses': local, 'shared': shared}):
+            self.assertEqual(check_shared_caches(None), [])
+
+    def test_responses_are_cached_per_process_without_cache_url(self):
+        with mock.patch.dict(os.environ, {}, clear=True):
+            config = local_cache_settings('responses')
+        self.assertEqual(config['BACKEND'], 'django.core.cache.backends.locmem.LocMemCache')
+
+        with mock.patch.dict(os.environ, {'CACHE_URL': 'memcached://localhost'}, clear=True):
+            with self.assertRaises(ImproperlyConfigured):
+                local_cache_settings('responses')
+
+
+class DatabaseSettingsTests(IsolatedTestCase):
+    """Databases are configured by environment variables."""
+
+    def settings_for(self, **environ):
+        with mock.patch.dict(os.environ, environ, clear=True):
+            return database_settings(default_name='db.sqlite3')
+
+    def test_sqlite_is_persistent_and_starts_writers_immediately(self):
+        config = self.settings_for()
+
+        self.assertEqual((config['ENGINE'], config['NAME']), ('django.db.backends.sqlite3', 'db.sqlite3'))
+        self.assertEqual((config['CONN_MAX_AGE'], config['CONN_HEALTH_CHECKS']), (600, True))
+        self.assertEqual(config['OPTIONS'], {'transaction_mode': 'IMMEDIATE'})
+
+    def test_postgresql_without_pool_keeps_checked_connections(self):
+        config = self.settings_for(DB_ENGINE='postgresql', DB_NAME='kanban', DB_POOL='false', DB_CONN_MAX_AGE='60')
+
+        self.assertEqual((config['ENGINE'], config['NAME']), ('django.db.backends.postgresql', 'kanban'))
+        self.assertEqual((config['CONN_MAX_AGE'], config['CONN_HEALTH_CHECKS']), (60, True))
+        self.assertNotIn('pool', config['OPTIONS'])
+
+    def test_unknown_engine_is_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            self.settings_for(DB_ENGINE='mysql')
+
+    def test_sqlite_replica_needs_a_name(self):
+        with mock.patch.dict(os.environ, {'DB_REPLICAS': '1'}, clear=True):
+            with self.assertRaises(ImproperlyConfigured):
+                replica_settings()
+        with mock.patch.dict(os.environ, {'DB_REPLICAS': '1', 'DB_REPLICA1_NAME': 'replica.sqlite3'}, clear=True):
+            self.assertEqual(replica_settings()['replica1']['NAME'], 'replica.sqlite3')
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite pragmas')
+    def test_sqlite_pragmas_are_applied_to_new_connections(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], settings.SQLITE_PRAGMAS['busy_timeout'])
+
+
+@skipUnless(connection.vendor == 'sqlite', 'FTS5 triggers only exist on SQLite')
+class SearchTriggerCheckTests(IsolatedTestCase):
+    """Table rebuilds on SQLite drop the triggers keeping the search index current."""
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_user('owner')
+        self.board = Board.objects.create(title='Board', owner=self.user)
+
+    def test_missing_trigger_is_reported_and_restored(self):
+        self.assertEqual(check_search_triggers(None, databases=['default']), [])
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER kanban_app_task_fts_au')
+
+        errors = check_search_triggers(None, databases=['default'])
+
+        self.assertEqual([error.id for error in errors], ['kanban_app.W001'])
+        install_index(connection)
+        self.assertEqual(check_search_triggers(None, databases=['default']), [])
+
+    def test_renamed_task_is_found(self):
+        task = create_task(self.board, title='Draft', assignee=self.user, reviewer=self.user)
+        task.title = 'Release notes'
+        task.save()
+
+        self.assertEqual([found.pk for found in search_tasks(self.user, 'release')], [task.pk])
+        self.assertEqual(search_tasks(self.user, 'draft'), [])
+
+
+class FastSerializerTests(IsolatedTestCase):
+    """The fast serializers return the same JSON as the DRF serializers they replace."""
+
+    def test_fast_serializers_match_drf(self):
+        command = check_fast_serializers.Command()
+        command.seed(task_count=300, comment_count=300)
+
+        for label, fast, queryset, instances in command.get_checks():
+            with self.subTest(label):
+                expected = JSONRenderer().render(fast.serializes(instances.all(), many=True).data)
+                self.assertEqual(JSONRenderer().render(fast.serialize(fast.values(queryset))), expected)
+
+
+@override_settings(AUTH_THROTTLES={})
+class QueryBudgetTests(IsolatedTestCase):
+    """Every endpoint stays within the query budget of kanban_app.benchmark."""
+
+    def test_endpoints_stay_within_their_query_budgets(self):
+        context = BenchmarkContext(seed(users=20, boards=4, tasks=300, comments=600))
+
+        for endpoint in get_endpoints():
+            with self.subTest(endpoint.name):
+                _, queries, errors = run(endpoint, context, iterations=2)
+                self.assertEqual(errors, [])
+                self.assertLessEqual(max(queries), endpoint.max_queries)
+
+    def test_percentile_uses_the_nearest_rank(self):
+        self.assertEqual(percentile([5, 1, 4, 2, 3], 50), 3)
+        self.assertEqual(percentile([5, 1, 4, 2, 3], 95), 5)
+        self.assertEqual(percentile([7], 1), 7)
+
+
+@skipUnless(connection.vendor in ('sqlite', 'postgresql'), 'EXPLAIN output is only parsed for SQLite and PostgreSQL')
+class QueryPlanTests(IsolatedTestCase):
+    """The main query of every endpoint reads the task and comment tables through an index."""
+
+    def test_main_queries_use_an_index(self):
+        command = check_query_plans.Command()
+        user, board, task = command.seed(task_count=2000, comment_count=2000)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        for label, queryset, table in command.get_checks(user, board, task):
+            with self.subTest(label):
+                plan = queryset.explain()
+                self.assertTrue(command.uses_index(plan, table), plan)
+
+
+class ReplicaRoutingTests(IsolatedTestCase):
+    """Versioned responses are built from the primary."""
+
+    def setUp(self):
+        super().setUp()
+        self.request = RequestFactory().get('/api/tasks/assigned-to-me/')
+        self.request.user = create_user('member')
+        self.routing = RequestRouting(self.request, ['replica1'])
+        self.token = replicas._current.set(self.routing)
+        self.addCleanup(replicas._current.reset, self.token)
+
+    def test_reads_go_to_the_replica_by_default(self):
+        self.assertEqual(ReplicaRouter().db_for_read(Task), 'replica1')
+
+    def test_versioned_responses_read_from_the_primary(self):
+        databases = []
+
+        def build_response():
+            databases.append(ReplicaRouter().db_for_read(Task))
+            return HttpResponse()
+
+        conditional_get(self.request, [user_version(self.request.user.id)], build_response)
+        self.assertEqual(databases, ['default'])
+
+
+class StreamingTests(IsolatedTestCase):
+    """Task lists are streamed by a sync iterator under WSGI and an async one under ASGI."""
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_user('member')
+        board = Board.objects.create(title='Board', owner=self.user)
+        for number in range(3):
+            create_task(board, title=f'Task {number}', assignee=self.user, reviewer=self.user)
+        self.token = Token.objects.create(user=self.user)
+        self.headers = {'Authorization': f'Token {self.token.key}'}
+
+    def test_wsgi_streams_synchronously(self):
+        response = self.client.get('/api/tasks/assigned-to-me/', headers=self.headers)
+
+        self.assertTrue(response.streaming)
+        self.assertFalse(response.is_async)
+        self.assertEqual([task['title'] for task in json.loads(b''.join(response.streaming_content))],
+                         ['Task 0', 'Task 1', 'Task 2'])
+
+    async def test_asgi_streams_asynchronously(self):
+        response = await AsyncClient().get('/api/tasks/assigned-to-me/', headers=self.headers)
+
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(json.loads(body)), 3)
+
+
+class TaskListPaginationTests(IsolatedTestCase):
+    """Task lists are paged by keyset cursors on request and bounded without."""
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_user('member')
+        board = Board.objects.create(title='Board', owner=self.user)
+        for day in (3, 1, 2):
+            create_task(board, title=f'Day {day}', due_date=datetime.date(2026, 1, day), assignee=self.user, reviewer=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.create(user=self.user).key)
+
+    def test_pages_follow_the_cursor(self):
+        first = self.client.get('/api/tasks/assigned-to-me/', {'page_size': 2}).json()
+        second = self.client.get(first['next']).json()
+
+        self.assertEqual([task['title'] for task in first['results']], ['Day 1', 'Day 2'])
+        self.assertEqual([task['title'] for task in second['results']], ['Day 3'])
+        self.assertIsNone(second['next'])
+
+    def test_unpaginated_list_is_bounded(self):
+        with mock.patch.object(TaskKeysetPagination, 'max_unpaginated', 2):
+            streamed = self.client.get('/api/tasks/assigned-to-me/')
+            rendered = self.client.get('/api/tasks/assigned-to-me/', {'format': 'json'})
+
+        self.assertEqual(len(json.loads(b''.join(streamed.streaming_content))), 2)
+        self.assertEqual(len(rendered.json()), 2)
+
+
+class CommentPaginationTests(IsolatedTestCase):
+    """Comment threads are paged by (created_at, id) in both directions with their authors."""
+
+    def setUp(self):
+        super().setUp()
+        self.user = create_user('member')
+        board = Board.objects.create(title='Board', owner=self.user)
+        board.members.add(self.user)
+        self.task = create_task(board, assignee=self.user, reviewer=self.user)
+        start = timezone.now()
+        for number in range(5):
+            comment = Comment.objects.create(task=self.task, author=self.user, content=f'Comment {number}')
+            Comment.objects.filter(pk=comment.pk).update(created_at=start + datetime.timedelta(seconds=number))
+        self.path = f'/api/tasks/{self.task.pk}/comments/'
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.create(user=self.user).key)
+
+    def contents(self, page):
+        return [comment['content'] for comment in page['results']]
+
+    def test_pages_follow_the_cursors_in_both_directions(self):
+        first = self.client.get(self.path, {'page_size': 2, 'format': 'json'}).json()
+        second = self.client.get(first['next']).json()
+        back = self.client.get(second['previous']).json()
+
+        self.assertEqual(self.contents(first), ['Comment 0', 'Comment 1'])
+        self.assertIsNone(first['previous'])
+        self.assertEqual(self.contents(second), ['Comment 2', 'Comment 3'])
+        self.assertEqual(back, first)
+
+    def test_latest_page_ends_the_thread(self):
+        latest = self.client.get(self.path, {'latest': '', 'page_size': 2, 'format': 'json'}).json()
+        before = self.client.get(latest['previous']).json()
+
+        self.assertEqual(self.contents(latest), ['Comment 3', 'Comment 4'])
+        self.assertIsNone(latest['next'])
+        self.assertEqual(self.contents(before), ['Comment 1', 'Comment 2'])
+
+    def test_page_queries_do_not_grow_with_the_authors(self):
+        self.client.get(self.path, {'format': 'json'})
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(self.path, {'page_size': 2, 'format': 'json'})
+        for number in range(3):
+            Comment.objects.create(task=self.task, author=create_user(f'author{number}'), content='Hi')
+        with CaptureQueriesContext(connection) as large:
+            page = self.client.get(self.path, {'page_size': 8, 'format': 'json'}).json()
+
+        self.assertEqual(len(large), len(small))
+        self.assertEqual({comment['author'] for comment in page['results']}, {'Member', 'Author0', 'Author1', 'Author2'})
+
+    def test_created_comment_is_returned_with_its_author(self):
+        response = self.client.post(self.path, {'content': 'New'}, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.json()['content'], response.json()['author']), ('New', 'Member'))
+
+
+class AsyncViewTests(IsolatedTestCase):
+    """The async read views answer like the DRF views they replace for GET."""
+
+    def setUp(self):
+        super().setUp()
+        self.owner = create_user('owner')
+        self.member = create_user('member')
+        self.board = Board.objects.create(title='Board', owner=self.owner)
+        self.board.members.add(self.member)
+        self.task = create_task(self.board, assignee=self.member, reviewer=self.owner)
+        Comment.objects.create(task=self.task, author=self.member, content='Hi')
+        self.token = Token.objects.create(user=self.owner)
+
+    async def get(self, path, token=None, **params):
+        headers = {'Authorization': f'Token {(token or self.token).key}'}
+        response = await AsyncClient().get(path, params, headers=headers)
+        if response.streaming:
+            return response.status_code, json.loads(b''.join([chunk async for chunk in response.streaming_content]))
+        return response.status_code, json.loads(response.content)
+
+    async def test_responses_match_the_sync_views(self):
+        for path in ['/api/boards/', f'/api/boards/{self.board.pk}/', '/api/tasks/reviewing/',
+                     '/api/tasks/assigned-to-me/', f'/api/tasks/{self.task.pk}/comments/']:
+            with self.subTest(path):
+                self.assertEqual(await self.get(path), await self.get(path, format='json'))
+
+    async def test_lists_select_by_the_user_field(self):
+        self.assertEqual(len((await self.get('/api/tasks/reviewing/'))[1]), 1)
+        self.assertEqual((await self.get('/api/tasks/assigned-to-me/'))[1], [])
+
+    async def test_outsider_is_denied(self):
+        outsider = await sync_to_async(create_user)('outsider')
+        token = await Token.objects.acreate(user=outsider)
+
+        status_code, _ = await self.get(f'/api/boards/{self.board.pk}/', token=token)
+
+        self.assertEqual(status_code, 403)
+
+
+class ChangeLogCursorTests(IsolatedTestCase):
+    """Cursors do not move past recent entries, which may commit out of ID order."""
+
+    def setUp(self):
+        super().setUp()
+        self.owner = create_user('owner')
+        self.board = Board.objects.create(title='Board', owner=self.owner)
+        self.task = create_task(self.board, assignee=self.owner, reviewer=self.owner)
+
+    def age_entries(self):
+        BoardChange.objects.update(created_at=timezone.now() - datetime.timedelta(hours=1))
+
+    def test_recent_changes_are_returned_without_moving_the_cursor(self):
+        changes = get_changes(self.board, 0)
+
+        self.assertEqual([task.id for task in changes['tasks']], [self.task.id])
+        self.assertEqual(changes['cursor'], 0)
+        self.assertEqual(latest_cursor(), 0)
+
+    def test_cursor_moves_past_entries_older_than_the_window(self):
+        self.age_entries()
+        newest = BoardChange.objects.latest('id').id
+
+        self.assertEqual(get_changes(self.board, 0)['cursor'], newest)
+        self.assertEqual(latest_cursor(), newest)
+
+    def test_held_back_page_is_not_reported_as_incomplete(self):
+        create_task(self.board, title='Second', assignee=self.owner, reviewer=self.owner)
+
+        changes = get_changes(self.board, 0, limit=1)
+
+        self.assertFalse(changes['has_more'])
+
+
+class MetricsTests(IsolatedTestCase):
+    """/metrics needs a configured token, and method labels are bounded."""
+
+    def test_metrics_are_disabled_without_token(self):
+        with override_settings(REQUEST_METRICS={**settings.REQUEST_METRICS, 'TOKEN': None}):
+            self.assertEqual(self.client.get('/metrics').status_code, 403)
+
+    def test_metrics_require_the_token(self):
+        with override_settings(REQUEST_METRICS={**settings.REQUEST_METRICS, 'TOKEN': 's3cret'}):
+            self.assertEqual(self.client.get('/metrics').status_code, 401)
+            response = self.client.get('/metrics', headers={'Authorization': 'Bearer s3cret'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_unknown_methods_are_recorded_as_other(self):
+        self.client.generic('BREW', '/api/boards/')
+
+        with override_settings(REQUEST_METRICS={**settings.REQUEST_METRICS, 'TOKEN': 's3cret'}):
+            body = self.client.get('/metrics', headers={'Authorization': 'Bearer s3cret'}).content.decode()
+        self.assertIn('method="other"', body)
+        self.assertNotIn('BREW', body)
+
+    def test_serializer_time_includes_its_queries(self):
+        owner = create_user('owner')
+        Board.objects.create(title='Board', owner=owner).members.add(create_user('member'))
+        timings = RequestTimings()
+        token = instrumentation._current.set(timings)
+        try:
+            BoardSerializer(Board.objects.all(), many=True).data
+        finally:
+            instrumentation._current.reset(token)
+
+        self.assertGreater(timings.db_queries, 0)
+        self.assertGreaterEqual(timings.serialize_time, timings.db_time)
+
+
+class BoardEventStreamTests(IsolatedTestCase):
+    """Event streams use single-use tickets, resume from Last-Event-ID and end without access."""
+
+    def setUp(self):
+        super().setUp()
+        self.owner = create_user('owner')
+        self.board = Board.objects.create(title='Board', owner=self.owner)
+        self.token = Token.objects.create(user=self.owner)
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        self.url = f'/api/boards/{self.board.pk}/events/'
+
+    def ticket(self):
+        response = self.client.post(f'{self.url}ticket/')
+        self.assertEqual(response.status_code, 201)
+        return response.json()['ticket']
+
+    async def open(self, **kwargs):
+        response = await AsyncClient().get(self.url, **kwargs)
+        if response.status_code != 200:
+            return response, None
+        stream = aiter(response.streaming_content)
+        await anext(stream)  # retry
+        return response, stream
+
+    async def test_ticket_is_valid_once(self):
+        ticket = await sync_to_async(self.ticket)()
+
+        response, stream = await self.open(data={'ticket': ticket})
+        self.assertEqual(response.status_code, 200)
+        await stream.aclose()
+        response, _ = await self.open(data={'ticket': ticket})
+        self.assertEqual(response.status_code, 401)
+
+    def test_wsgi_is_refused_without_redeeming_the_ticket(self):
+        ticket = self.ticket()
+
+        response = self.client.get(self.url, {'ticket': ticket})
+
+        self.assertEqual(response.status_code, 501)
+        self.assertEqual(redeem_ticket(ticket, self.board.pk), self.owner.pk)
+
+    async def test_token_in_query_string_is_rejected(self):
+        response, _ = await self.open(data={'token': self.token.key})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_reconnect_replays_changes_after_last_event_id(self):
+        await sync_to_async(create_task)(self.board, assignee=self.owner, reviewer=self.owner)
+        first = await BoardChange.objects.filter(board_id=self.board.pk).alatest('id')
+        second = await sync_to_async(create_task)(self.board, title='Second', assignee=self.owner, reviewer=self.owner)
+
+        response, stream = await self.open(headers={'Authorization': f'Token {self.token.key}', 'Last-Event-ID': str(first.id)})
+
+        event = await anext(stream)
+        await stream.aclose()
+        data = json.loads(event.decode().split('data: ')[1])
+        self.assertEqual((data['kind'], data['id']), ('task', second.id))
+        self.assertGreater(data['cursor'], first.id)
+
+    @override_settings(BOARD_EVENTS_HEARTBEAT=0.01)
+    async def test_stream_ends_when_the_board_is_deleted(self):
+        response, stream = await self.open(headers={'Authorization': f'Token {self.token.key}'})
+
+        await self.board.adelete()
+
+        with self.assertRaises(StopAsyncIteration):
+            while True:
+                await anext(stream)
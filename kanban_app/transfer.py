@@ -0,0 +1,320 @@
+import datetime
+import json
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.utils.dateparse import parse_datetime
+
+from kanban_app.models import Board, BoardStats, Comment, Task
+from kanban_app.ranking import assign_ranks
+from kanban_app.versioning import bump_task_versions
+
+# Version of the export format, written into the board record.
+FORMAT_VERSION = 1
+
+# Rows read from or written to the database at a time.
+BATCH_SIZE = 1000
+
+TASK_FIELDS = ['id', 'title', 'description', 'priority', 'status', 'due_date', 'assignee_id', 'reviewer_id', 'owner_id', 'rank']
+COMMENT_FIELDS = ['id', 'task_id', 'author_id', 'content', 'created_at']
+
+
+class InvalidExport(Exception):
+    """
+    Raised if an export cannot be imported, e.g. because it is malformed
+    or references users that do not exist in this installation.
+    """
+
+
+class ExportTooLarge(InvalidExport):
+    """Raised by limit_size() if an export exceeds the allowed size."""
+
+
+def export_board(board):
+    """
+    Yields a board with its members, tasks and comments as NDJSON lines:
+    first the board, then the referenced users, the members, the tasks
+    and the comments, each as one JSON object with a 'type'. Rows are
+    read in batches, so memory use does not grow with the board size.
+    Users are referenced by ID and exported with their email, by which
+    they are matched on import.
+    """
+    tasks = Task.objects.filter(board=board)
+    comments = Comment.objects.filter(task__board=board)
+
+    user_ids = {board.owner_id}
+    user_ids.update(board.members.values_list('id', flat=True))
+    for row in tasks.order_by().values_list('assignee_id', 'reviewer_id', 'owner_id').distinct():
+        user_ids.update(row)
+    user_ids.update(comments.order_by().values_list('author_id', flat=True).distinct())
+    user_ids.discard(None)
+
+    yield _line({'type': 'board', 'format': FORMAT_VERSION, 'id': board.id, 'title': board.title, 'owner': board.owner_id})
+    for user in User.objects.filter(id__in=user_ids).order_by('id').values('id', 'email').iterator(chunk_size=BATCH_SIZE):
+        yield _line({'type': 'user', **user})
+    for user_id in board.members.order_by('id').values_list('id', flat=True):
+        yield _line({'type': 'member', 'user': user_id})
+    for task in tasks.order_by('id').values(*TASK_FIELDS).iterator(chunk_size=BATCH_SIZE):
+        task['due_date'] = task['due_date'].isoformat()
+        yield _line({'type': 'task', **task})
+    for comment in comments.order_by('id').values(*COMMENT_FIELDS).iterator(chunk_size=BATCH_SIZE):
+        comment['created_at'] = comment['created_at'].isoformat()
+        yield _line({'type': 'comment', **comment})
+
+
+def _line(record):
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+def limit_size(lines, max_bytes):
+    """
+    Yields the lines and raises ExportTooLarge once they add up to more
+    than max_bytes, so an oversized upload is never read completely.
+    """
+    size = 0
+    for line in lines:
+        size += len(line)
+        if size > max_bytes:
+            raise ExportTooLarge(f'The export is larger than {max_bytes} bytes.')
+        yield line
+
+
+def import_board(lines, owner=None, trusted=True):
+    """
+    Creates a new board from the NDJSON lines of export_board() in one
+    transaction and returns the new board ID and the numbers of imported
+    members, tasks and comments. Tasks and comments are written with
+    batched bulk_create and get new IDs; references between them are
+    remapped. Users are matched by email, ignoring case. Without 'owner'
+    the exported owner becomes the owner of the new board.
+
+    Untrusted imports (trusted=False, through the API) cannot act in the
+    name of other users: all tasks and comments are credited to 'owner',
+    comments get the time of the import, and assignees and reviewers
+    have to be the owner or members of the new board.
+    Raises InvalidExport if the export is malformed or incomplete.
+    """
+    if not trusted and owner is None:
+        raise ValueError('Untrusted imports need an owner.')
+    with transaction.atomic():
+        importer = BoardImporter(owner, trusted)
+        for number, line in enumerate(lines, start=1):
+            if isinstance(line, bytes):
+                line = line.decode()
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                raise InvalidExport(f'Line {number} is not valid JSON.')
+            if not isinstance(record, dict):
+                raise InvalidExport(f'Line {number} is not a JSON object.')
+            try:
+                importer.add(record)
+            except InvalidExport as exc:
+                raise InvalidExport(f'Line {number}: {exc}')
+            except (KeyError, TypeError, ValueError) as exc:
+                raise InvalidExport(f'Line {number}: invalid {record.get("type")} record ({exc!r}).')
+        return importer.finish()
+
+
+class BoardImporter:
+    """
+    Imports the records of one export in their exported order.
+    Tasks and comments are buffered and written per BATCH_SIZE rows.
+    Signal handlers do not run for bulk created rows, so the board
+    stats and task list versions are updated once at the end.
+    The change log only gets the creation of the board; clients
+    load a new board in full anyway.
+    """
+    STAGES = ['board', 'user', 'member', 'task', 'comment']
+
+    def __init__(self, owner=None, trusted=True):
+        self.owner = owner
+        self.trusted = trusted
+        self.board = None
+        self.exported_owner = None
+        self.stage = 0
+        self.exported_users = {}
+        self.users = None
+        self.task_ids = {}
+        self.tasks = []
+        self.comments = []
+        self.member_ids = []
+        self.user_ids = set()
+        self.task_count = 0
+        self.comment_count = 0
+
+    def add(self, record):
+        kind = record.get('type')
+        if kind not in self.STAGES:
+            raise InvalidExport(f'Unknown record type {kind!r}.')
+        stage = self.STAGES.index(kind)
+        if stage < self.stage or (stage == 0 and self.board is not None):
+            raise InvalidExport(f'Unexpected {kind} record.')
+        if stage > 0 and self.board is None:
+            raise InvalidExport('The export has to start with the board.')
+        if stage > 1 and self.users is None:
+            self.resolve_users()
+        if stage > 2 and self.stage <= 2:
+            self.board.members.add(*self.member_ids)
+        if stage > 3 and self.stage <= 3:
+            self.flush_tasks()
+        self.stage = stage
+        getattr(self, f'add_{kind}')(record)
+
+    def add_board(self, record):
+        if record.get('format') != FORMAT_VERSION:
+            raise InvalidExport(f'Unsupported export format {record.get("format")!r}.')
+        self.exported_owner = record['owner']
+        self.board = Board(title=_text(record, 'title', Board), owner=self.owner)
+
+    def add_user(self, record):
+        self.exported_users[int(record['id'])] = record['email']
+
+    def add_member(self, record):
+        self.member_ids.append(self.user(record['user']))
+
+    def add_task(self, record):
+        status, priority = record['status'], record['priority']
+        if status not in Task.STATUS_CHOICES or priority not in Task.PRIORITY_CHOICES:
+            raise InvalidExport(f'Invalid status {status!r} or priority {priority!r}.')
+        task = Task(
+            board_id=self.board.pk,
+            title=_text(record, 'title', Task),
+            description=_text(record, 'description', Task),
+            priority=priority,
+            status=status,
+            due_date=datetime.date.fromisoformat(record['due_date']),
+            assignee_id=self.member(record['assignee_id']),
+            reviewer_id=self.member(record['reviewer_id']),
+            owner_id=self.task_owner(record.get('owner_id')),
+            rank=int(record['rank']) if record.get('rank') is not None else None,
+        )
+        task.exported_id = int(record['id'])
+        self.tasks.append(task)
+        self.user_ids.update((task.assignee_id, task.reviewer_id))
+        if len(self.tasks) >= BATCH_SIZE:
+            self.flush_tasks()
+
+    def add_comment(self, record):
+        task_id = self.task_ids.get(record['task_id'])
+        if task_id is None:
+            raise InvalidExport(f'Comment of unknown task {record["task_id"]!r}.')
+        if self.trusted:
+            author_id = self.user(record['author_id'])
+            created_at = parse_datetime(record['created_at'])
+            if created_at is None:
+                raise InvalidExport(f'Invalid created_at {record["created_at"]!r}.')
+        else:
+            author_id, created_at = self.owner.pk, None
+        self.comments.append(Comment(
+            task_id=task_id,
+            author_id=author_id,
+            content=_text(record, 'content', Comment),
+            created_at=created_at,
+        ))
+        if len(self.comments) >= BATCH_SIZE:
+            self.flush_comments()
+
+    def resolve_users(self):
+        """
+        Maps the exported user IDs to the local users with the same
+        email and saves the board, whose owner is one of them.
+        """
+        emails = {email.lower() for email in self.exported_users.values()}
+        local = dict(
+            User.objects.alias(email_lower=Lower('email')).filter(email_lower__in=emails)
+            .values_list(Lower('email'), 'id')
+        )
+        missing = sorted(emails - set(local))
+        if missing:
+            raise InvalidExport(f'Unknown users: {", ".join(missing)}.')
+        self.users = {user_id: local[email.lower()] for user_id, email in self.exported_users.items()}
+        if self.board.owner_id is None:
+            self.board.owner_id = self.user(self.exported_owner)
+        self.board.save()
+
+    def user(self, exported_id):
+        try:
+            return self.users[int(exported_id)]
+        except KeyError:
+            raise InvalidExport(f'Reference to user {exported_id!r}, who is not in the export.')
+
+    def member(self, exported_id):
+        """
+        Returns the local ID of an assignee or reviewer, who has to be
+        the owner or a member of the new board in untrusted imports.
+        """
+        user_id = self.user(exported_id)
+        if not self.trusted and user_id != self.board.owner_id and user_id not in self.member_ids:
+            raise InvalidExport(f'User {exported_id!r} is not a member of the board.')
+        return user_id
+
+    def task_owner(self, exported_id):
+        """Returns the local ID of the creator of a task."""
+        if not self.trusted:
+            return self.owner.pk
+        return self.user(exported_id) if exported_id is not None else None
+
+    def flush_tasks(self):
+        """Writes the buffered tasks and remembers their new IDs."""
+        if not self.tasks:
+            return
+        unranked = [task for task in self.tasks if task.rank is None]
+        if unranked:
+            assign_ranks(unranked)
+        Task.objects.bulk_create(self.tasks, batch_size=BATCH_SIZE)
+        for task in self.tasks:
+            self.task_ids[task.exported_id] = task.pk
+        self.task_count += len(self.tasks)
+        self.tasks = []
+
+    def flush_comments(self):
+        """
+        Writes the buffered comments. created_at is set automatically on
+        insert, so the exported timestamps of trusted imports are written
+        afterwards.
+        """
+        if not self.comments:
+            return
+        created_at = [comment.created_at for comment in self.comments]
+        Comment.objects.bulk_create(self.comments, batch_size=BATCH_SIZE)
+        if self.trusted:
+            for comment, value in zip(self.comments, created_at):
+                comment.created_at = value
+            Comment.objects.bulk_update(self.comments, ['created_at'], batch_size=BATCH_SIZE)
+        self.comment_count += len(self.comments)
+        self.comments = []
+
+    def finish(self):
+        """Writes the remaining rows and returns the import summary."""
+        if self.board is None:
+            raise InvalidExport('The export is empty.')
+        if self.users is None:
+            self.resolve_users()
+        if self.stage <= 2:
+            self.board.members.add(*self.member_ids)
+        self.flush_tasks()
+        self.flush_comments()
+
+        BoardStats.rebuild(Board.objects.filter(pk=self.board.pk))
+        bump_task_versions(board_ids=[self.board.pk], user_ids=self.user_ids)
+        return {
+            'id': self.board.pk,
+            'members': len(self.member_ids),
+            'tasks': self.task_count,
+            'comments': self.comment_count,
+        }
+
+
+def _text(record, name, model):
+    """Returns a text field of a record, checked against the model's max_length."""
+    value = record[name]
+    if not isinstance(value, str):
+        raise InvalidExport(f"'{name}' must be a string.")
+    max_length = model._meta.get_field(name).max_length
+    if max_length is not None and len(value) > max_length:
+        raise InvalidExport(f"'{name}' is longer than {max_length} characters.")
+    return value
@@ -0,0 +1,159 @@
+import hashlib
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from core.replicas import read_from_primary
+
+def board_version(board_id):
+    """Returns the version key of a board's detail response."""
+    return f'content_version:board:{board_id}'
+
+
+def user_version(user_id):
+    """Returns the version key of a user's task lists."""
+    return f'content_version:user:{user_id}'
+
+
+def get_version_cache():
+    return caches[getattr(settings, 'CONTENT_VERSION_CACHE_ALIAS', 'default')]
+
+
+def _ttl():
+    return getattr(settings, 'CONTENT_VERSION_TTL', 24 * 60 * 60)
+
+
+def get_versions(keys):
+    """
+    Returns the current (stamp, timestamp) of each version key.
+    Keys without a version (never written, expired or evicted) get a new one,
+    which only makes clients download the response once more.
+    """
+    cache = get_version_cache()
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _new_version(), _ttl())
+            versions[key] = cache.get(key) or _new_version()
+    return versions
+
+
+async def aget_versions(keys):
+    """Async version of get_versions()."""
+    cache = get_version_cache()
+    versions = await cache.aget_many(keys)
+    for key in keys:
+        if key not in versions:
+            await cache.aadd(key, _new_version(), _ttl())
+            versions[key] = await cache.aget(key) or _new_version()
+    return versions
+
+
+def bump_versions(keys):
+    """
+    Gives the keys new versions, so that all ETags built from them change.
+    The versions are bumped right away and again after the surrounding
+    transaction commits, so a response built from uncommitted state
+    never keeps the final version.
+    """
+    keys = list(keys)
+    if not keys:
+        return
+
+    def bump():
+        get_version_cache().set_many({key: _new_version() for key in keys}, _ttl())
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def bump_task_versions(board_ids=(), user_ids=()):
+    """Bumps the versions of the given boards and users."""
+    bump_versions(
+        [board_version(board_id) for board_id in set(board_ids) if board_id is not None]
+        + [user_version(user_id) for user_id in set(user_ids) if user_id is not None]
+    )
+
+
+def conditional_get(request, keys, build_response, response_cache=None):
+    """
+    Answers a GET with '304 Not Modified' if the client's If-None-Match
+    (or If-Modified-Since) header matches the current versions of the
+    keys, without calling build_response. Otherwise the response is
+    built and gets ETag and Last-Modified headers.
+    The ETag also covers the path and query string of the request.
+
+    Last-Modified only has a resolution of seconds, so it is left out
+    while the latest change is from the current second: a later change
+    within the same second would otherwise keep the same Last-Modified.
+
+    With a response_cache (see kanban_app.response_cache) the body is
+    taken from the cache entry of the ETag if there is one.
+
+    The versions are bumped on the primary, so the response is built
+    from the primary as well: content read from a lagging replica would
+    otherwise be sent, and cached, under the ETag of newer versions.
+    """
+    versions = get_versions(keys)
+    etag, last_modified = _validators(request, keys, versions)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        return response
+
+    read_from_primary()
+    if response_cache is not None:
+        response = response_cache.get_response(request, etag, build_response)
+    else:
+        response = build_response()
+    return _set_validators(response, etag, last_modified)
+
+
+async def aconditional_get(request, keys, build_response, response_cache=None):
+    """
+    Async version of conditional_get(); build_response is a coroutine
+    function.
+    """
+    versions = await aget_versions(keys)
+    etag, last_modified = _validators(request, keys, versions)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        return response
+
+    read_from_primary()
+    if response_cache is not None:
+        response = await response_cache.aget_response(request, etag, build_response)
+    else:
+        response = await build_response()
+    return _set_validators(response, etag, last_modified)
+
+
+def _validators(request, keys, versions):
+    """Returns the ETag and Last-Modified timestamp (or None) of a response."""
+    digest = hashlib.sha1(request.get_full_path().encode())
+    for key in keys:
+        digest.update(versions[key][0].encode())
+    etag = f'"{digest.hexdigest()}"'
+    last_modified = max(timestamp for _, timestamp in versions.values())
+    if last_modified >= int(time.time()):
+        last_modified = None
+    return etag, last_modified
+
+
+def _set_validators(response, etag, last_modified):
+    if response.status_code == 200:
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def _new_version():
+    """Returns a new (stamp, timestamp) version."""
+    return uuid.uuid4().hex, int(time.time())